@@ -15,6 +15,10 @@ Analytic Hierarchy Process (AHP) Calculator
 2. Розрахунок власного вектора (Principal Eigenvector)
 3. Обчислення ваг критеріїв
 4. Перевірку узгодженості (Consistency Index, Consistency Ratio)
+
+Пакетний розрахунок (evaluate_matrices) обробляє стек N матриць n×n
+(наприклад, судження багатьох експертів) кількома викликами NumPy:
+метод геометричного середнього або головного власного вектора.
 """
 
 import numpy as np
@@ -99,27 +103,9 @@ class AHPCalculator:
         Returns:
             Dict з вагами кожного критерію (сума = 1.0)
         """
-        n = len(self.pairwise_matrix)
-        
-        # 1. Обчислюємо геометричне середнє кожного рядка
-        geometric_means = []
-        for i in range(n):
-            # Добуток всіх елементів рядка
-            row_product = np.prod(self.pairwise_matrix[i, :])
-            # n-й корінь з добутку
-            geometric_mean = row_product ** (1.0 / n)
-            geometric_means.append(geometric_mean)
-        
-        # 2. Нормалізуємо (щоб сума = 1.0)
-        total = sum(geometric_means)
-        normalized_weights = [gm / total for gm in geometric_means]
-        
-        # 3. Створюємо словник з результатами
-        weights = {}
-        for i, name in enumerate(self.criteria_names):
-            weights[name] = round(normalized_weights[i], 4)
-        
-        return weights
+        # Геометричне середнє кожного рядка, нормалізоване (сума = 1.0)
+        normalized_weights = batch_weights(self.pairwise_matrix, 'geometric')[0]
+        return {name: round(float(weight), 4) for name, weight in zip(self.criteria_names, normalized_weights)}
     
     def calculate_max_eigenvalue(self, weights: List[float]) -> float:
         """
@@ -132,10 +118,9 @@ class AHPCalculator:
         Returns:
             λmax (lambda max)
         """
-        n = len(weights)
+        weights = np.asarray(weights, dtype=np.float64)
         weighted_sum = np.dot(self.pairwise_matrix, weights)
-        lambda_max = sum(weighted_sum[i] / weights[i] for i in range(n)) / n
-        return lambda_max
+        return float(np.mean(weighted_sum / weights))
     
     def calculate_consistency(self, weights: List[float]) -> Tuple[float, float, bool]:
         """
@@ -281,6 +266,103 @@ class AHPCalculator:
         return "\n".join(report)
 
 
+# ===== ПАКЕТНИЙ РОЗРАХУНОК ДЛЯ СТЕКУ МАТРИЦЬ =====
+
+AHP_METHODS = ('geometric', 'eigenvector')
+
+# Збіжність степеневого методу для головного власного вектора
+POWER_ITERATION_TOL = 1e-12
+POWER_ITERATION_MAX_ITER = 100
+
+
+def _as_matrix_stack(matrices) -> np.ndarray:
+    """Перевірити і привести до масиву (N, n, n) додатних float64"""
+    try:
+        stack = np.asarray(matrices, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError("Matrices must be numeric arrays of the same shape")
+    if stack.ndim == 2:
+        stack = stack[np.newaxis]
+    if stack.ndim != 3 or stack.shape[1] != stack.shape[2]:
+        raise ValueError(f"Expected a stack of square matrices (N, n, n), got shape {stack.shape}")
+    if stack.shape[2] not in RANDOM_INDEX:
+        raise ValueError(f"Matrix size must be between 1 and {max(RANDOM_INDEX)}, got {stack.shape[2]}")
+    if not np.all(np.isfinite(stack)) or np.any(stack <= 0):
+        raise ValueError("Pairwise comparisons must be positive finite numbers")
+    return stack
+
+
+def batch_weights(matrices, method: str = 'geometric') -> np.ndarray:
+    """
+    Ваги критеріїв для кожної матриці стеку
+
+    Args:
+        matrices: Масив (N, n, n) або одна матриця (n, n)
+        method: 'geometric' - геометричне середнє рядків;
+                'eigenvector' - головний власний вектор (степеневий метод)
+
+    Returns:
+        Масив (N, n), сума кожного рядка = 1.0
+    """
+    stack = _as_matrix_stack(matrices)
+    n = stack.shape[2]
+    if method == 'geometric':
+        weights = np.prod(stack, axis=2) ** (1.0 / n)
+    elif method == 'eigenvector':
+        weights = np.full(stack.shape[:2], 1.0 / n)
+        for _ in range(POWER_ITERATION_MAX_ITER):
+            updated = np.matmul(stack, weights[..., np.newaxis])[..., 0]
+            updated /= updated.sum(axis=1, keepdims=True)
+            converged = np.max(np.abs(updated - weights)) < POWER_ITERATION_TOL
+            weights = updated
+            if converged:
+                break
+    else:
+        raise ValueError(f"Unknown AHP method: {method}. Use one of: {', '.join(AHP_METHODS)}")
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def batch_consistency(matrices, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    λmax, CI і CR для кожної матриці стеку (як AHPCalculator.calculate_consistency)
+
+    Args:
+        matrices: Масив (N, n, n)
+        weights: Ваги (N, n)
+
+    Returns:
+        Tuple масивів (λmax, CI, CR) довжини N
+    """
+    stack = _as_matrix_stack(matrices)
+    n = stack.shape[2]
+    weighted_sum = np.matmul(stack, weights[..., np.newaxis])[..., 0]
+    lambda_max = np.mean(weighted_sum / weights, axis=1)
+    ci = (lambda_max - n) / (n - 1) if n > 1 else np.zeros(len(stack))
+    ri = RANDOM_INDEX[n]
+    cr = ci / ri if ri > 0 else np.zeros(len(stack))
+    return lambda_max, ci, cr
+
+
+def evaluate_matrices(matrices, method: str = 'geometric') -> Dict[str, np.ndarray]:
+    """
+    Повний AHP розрахунок для стеку матриць
+
+    Returns:
+        {"weights": (N, n), "lambda_max": (N,), "ci": (N,), "cr": (N,),
+         "is_consistent": (N,) bool - CR < 0.1}
+    """
+    stack = _as_matrix_stack(matrices)
+    weights = batch_weights(stack, method)
+    lambda_max, ci, cr = batch_consistency(stack, weights)
+    return {
+        "weights": weights,
+        "lambda_max": lambda_max,
+        "ci": ci,
+        "cr": cr,
+        "is_consistent": cr < 0.1,
+    }
+
+
 # Глобальний екземпляр калькулятора
 ahp_calculator = AHPCalculator()
 
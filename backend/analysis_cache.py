@@ -0,0 +1,276 @@
+"""
+Versioned in-process cache for analysis results
+Each entry remembers the versions (content hashes) of the datasets it was
+computed from - an entry is served only while those versions are current,
+and an import drops exactly the entries that depend on the changed dataset
+
+Optionally backed by a persistent store shared by all workers (SQLite file or
+MongoDB collection): entries are keyed by a hash of the cache key, dataset
+versions and methodology namespace, so a freshly started worker serves results
+computed by another one; the store evicts by TTL and by entry count
+"""
+import abc
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(abc.ABC):
+    """
+    Постійне сховище записів кешу (спільне для процесів)
+
+    Значення зберігаються як JSON (кортежі повертаються списками).
+    Помилки сховища не ламають аналіз: get повертає None, put нічого
+    не робить, а помилка рахується в stats().
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.errors = 0
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Значення незастарілого запису або None"""
+
+    @abc.abstractmethod
+    def put(self, key: str, value: Any):
+        """Зберегти запис (з витісненням за TTL і кількістю записів)"""
+
+    def _failed(self, operation: str, error: Exception):
+        self.errors += 1
+        logger.warning(f"Analysis cache {operation} failed: {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries, "errors": self.errors}
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Записи в SQLite файлі (WAL - читання з кількох процесів не блокуються записом)
+
+    Args:
+        path: Шлях до файлу бази
+        ttl_seconds: Час життя запису
+        max_entries: Максимум записів (найстаріші видаляються)
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, max_entries: int):
+        super().__init__(ttl_seconds, max_entries)
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS entries_created_at ON entries (created_at)')
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    'SELECT value FROM entries WHERE key = ? AND expires_at > ?', (key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            self._failed('get', e)
+            return None
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value: Any):
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    connection.execute(
+                        'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                        (key, json.dumps(value, ensure_ascii=False), now, now + self.ttl_seconds)
+                    )
+                    connection.execute('DELETE FROM entries WHERE expires_at <= ?', (now,))
+                    connection.execute(
+                        'DELETE FROM entries WHERE key IN '
+                        '(SELECT key FROM entries ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+                        (self.max_entries,)
+                    )
+        except sqlite3.Error as e:
+            self._failed('put', e)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        try:
+            with self._lock:
+                stats["entries"] = self._connect().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        except sqlite3.Error as e:
+            self._failed('stats', e)
+        return stats
+
+
+class MongoCacheBackend(CacheBackend):
+    """
+    Записи в колекції MongoDB (TTL індекс по expires_at)
+
+    Викликається з потоків COMPUTE_POOL, тому працює через синхронну
+    колекцію PyMongo (для Motor - AsyncIOMotorDatabase.delegate[name]).
+
+    Args:
+        collection: Колекція pymongo
+        ttl_seconds: Час життя запису
+        max_entries: Максимум записів (найстаріші видаляються)
+    """
+
+    def __init__(self, collection, ttl_seconds: float, max_entries: int):
+        super().__init__(ttl_seconds, max_entries)
+        self.collection = collection
+        self._indexes_created = False
+
+    def _ensure_indexes(self):
+        if not self._indexes_created:
+            self.collection.create_index([('expires_at', ASCENDING)], expireAfterSeconds=0)
+            self.collection.create_index([('created_at', ASCENDING)])
+            self._indexes_created = True
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            doc = self.collection.find_one({'_id': key, 'expires_at': {'$gt': datetime.now(timezone.utc)}})
+        except PyMongoError as e:
+            self._failed('get', e)
+            return None
+        return json.loads(doc['value']) if doc else None
+
+    def put(self, key: str, value: Any):
+        now = datetime.now(timezone.utc)
+        try:
+            self._ensure_indexes()
+            self.collection.replace_one({'_id': key}, {
+                'value': json.dumps(value, ensure_ascii=False),
+                'created_at': now,
+                'expires_at': now + timedelta(seconds=self.ttl_seconds),
+            }, upsert=True)
+            excess = self.collection.count_documents({}) - self.max_entries
+            if excess > 0:
+                oldest = self.collection.find({}, {'_id': 1}).sort('created_at', ASCENDING).limit(excess)
+                self.collection.delete_many({'_id': {'$in': [doc['_id'] for doc in oldest]}})
+        except PyMongoError as e:
+            self._failed('put', e)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        try:
+            stats["entries"] = self.collection.estimated_document_count()
+        except PyMongoError as e:
+            self._failed('stats', e)
+        return stats
+
+
+class VersionedCache:
+    """
+    Кеш результатів, прив'язаних до версій датасетів
+
+    Ключ запису - довільний hashable (наприклад ('analyze', region_name)),
+    versions - словник {назва датасету: версія} тих даних, від яких
+    залежить результат.
+
+    Args:
+        backend: Постійне сховище (None - лише пам'ять процесу); ключі
+                 записів у ньому мають бути JSON-серіалізовними
+        namespace: Параметри методики, що входять у ключ постійного запису
+                   (зміна методики не віддає старі результати)
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, namespace: Optional[Dict[str, Any]] = None):
+        self._entries: Dict[Hashable, Tuple[Dict[str, Optional[str]], Any]] = {}
+        # put() викликається з потоків COMPUTE_POOL, invalidate() - з циклу подій
+        self._lock = threading.Lock()
+        self.backend = backend
+        self.namespace = dict(namespace or {})
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, versions: Dict[str, Optional[str]]) -> Optional[Any]:
+        """
+        Отримати результат, якщо він обчислений з тих самих версій даних
+
+        Returns:
+            Збережене значення або None (промах кешу)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self.hits += 1
+                return entry[1]
+        if self.backend is not None:
+            value = self.backend.get(self._persistent_key(key, versions))
+            if value is not None:
+                with self._lock:
+                    self.persistent_hits += 1
+                    self._entries[key] = (dict(versions), value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: Hashable, versions: Dict[str, Optional[str]], value: Any) -> Any:
+        """Зберегти результат разом з версіями даних, з яких він обчислений"""
+        with self._lock:
+            self._entries[key] = (dict(versions), value)
+        if self.backend is not None:
+            self.backend.put(self._persistent_key(key, versions), value)
+        return value
+
+    def _persistent_key(self, key: Hashable, versions: Dict[str, Optional[str]]) -> str:
+        """sha1 ключа, версій датасетів і параметрів методики"""
+        material = json.dumps([self.namespace, key, versions], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+    def invalidate(self, dataset: str) -> int:
+        """
+        Видалити всі записи, що залежать від датасету (у пам'яті; постійні
+        записи старих версій більше не запитуються і видаляються за TTL / розміром)
+
+        Returns:
+            Кількість видалених записів
+        """
+        with self._lock:
+            stale = [key for key, (versions, _) in self._entries.items() if dataset in versions]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+        if self.backend is not None:
+            stats["persistent_hits"] = self.persistent_hits
+            stats["persistent"] = self.backend.stats()
+        return stats
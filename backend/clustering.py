@@ -0,0 +1,70 @@
+"""
+Clustering engine for point layers (human-caused fire clusters)
+Seed-neighbourhood clustering on top of GridIndex - every neighbour lookup
+touches only nearby grid cells, so clustering is near-linear in point count
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from geodesic import GeoPoints
+from spatial_index import GridIndex
+
+
+def cluster_points(
+    points: GeoPoints,
+    radius_km: float = 10.0,
+    min_cluster_size: int = 3,
+    index: Optional[GridIndex] = None
+) -> List[Dict]:
+    """
+    Знайти кластери точок (детерміновано, у порядку вхідного набору)
+
+    Точки перебираються по черзі; для кожної ще не призначеної точки
+    збираються всі не призначені сусіди в радіусі radius_km. Якщо разом
+    із самою точкою їх >= min_cluster_size - це кластер, і всі його члени
+    позначаються як оброблені.
+
+    Args:
+        points: Набір точок (GeoPoints)
+        radius_km: Радіус сусідства (км)
+        min_cluster_size: Мінімум точок для кластера
+        index: Готовий GridIndex над тими ж точками (опційно)
+
+    Returns:
+        List of dicts: {'center': [lat, lng], 'members': [індекси точок]}
+    """
+    if len(points) < min_cluster_size:
+        return []
+
+    if index is None:
+        index = GridIndex(points)
+
+    lat_deg = points.lat_deg.tolist()
+    lng_deg = points.lng_deg.tolist()
+    assigned = np.zeros(len(points), dtype=bool)
+    clusters = []
+
+    for i in range(len(points)):
+        if assigned[i]:
+            continue
+
+        neighbours = index.query_radius(lat_deg[i], lng_deg[i], radius_km)
+        neighbours = neighbours[(neighbours != i) & ~assigned[neighbours]]
+
+        if len(neighbours) + 1 < min_cluster_size:
+            continue
+
+        members = [i] + neighbours.tolist()
+
+        # Центр кластера - середнє координат членів
+        avg_lat = sum(lat_deg[j] for j in members) / len(members)
+        avg_lng = sum(lng_deg[j] for j in members) / len(members)
+
+        clusters.append({
+            'center': [avg_lat, avg_lng],
+            'members': members
+        })
+        assigned[members] = True
+
+    return clusters
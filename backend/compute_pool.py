@@ -0,0 +1,111 @@
+"""
+Worker pool for CPU-bound analysis (scoring, fire clustering, zone generation)
+Keeps the event loop responsive: heavy functions run in a thread pool,
+the number of concurrently running jobs is limited by a semaphore and the
+queue depth / latency of jobs is tracked for the /api/metrics endpoint
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class ComputePool:
+    """
+    Пул потоків для важких обчислень з обмеженням паралельності
+
+    Args:
+        max_workers: Кількість потоків пулу
+        max_concurrency: Максимум задач, що виконуються одночасно;
+                         решта чекають у черзі (queue depth)
+    """
+
+    def __init__(self, max_workers: int, max_concurrency: int):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.queued = 0
+        self.active = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis")
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Виконати fn(*args, **kwargs) у пулі та дочекатися результату
+        (з копією contextvars викликача - як asyncio.to_thread)
+        """
+        self._ensure_started()
+
+        enqueued_at = time.perf_counter()
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        started_at = time.perf_counter()
+        self.total_wait_seconds += started_at - enqueued_at
+        self.active += 1
+        try:
+            context = contextvars.copy_context()
+            result = await self._loop.run_in_executor(
+                self._executor, functools.partial(context.run, fn, *args, **kwargs)
+            )
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.active -= 1
+            self.total_run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    def shutdown(self):
+        """Зупинити потоки пулу (пул перезапуститься при наступному run)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.total_wait_seconds / finished * 1000, 2) if finished else 0,
+            "avg_run_ms": round(self.total_run_seconds / finished * 1000, 2) if finished else 0,
+        }
+
+
+def create_compute_pool() -> ComputePool:
+    """
+    Створити пул з налаштувань оточення:
+    ANALYSIS_WORKERS (default: min(4, CPU count)),
+    ANALYSIS_MAX_CONCURRENCY (default: ANALYSIS_WORKERS)
+    """
+    workers = int(os.environ.get('ANALYSIS_WORKERS', min(4, os.cpu_count() or 1)))
+    concurrency = int(os.environ.get('ANALYSIS_MAX_CONCURRENCY', workers))
+    return ComputePool(max_workers=max(1, workers), max_concurrency=max(1, concurrency))
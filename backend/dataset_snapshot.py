@@ -0,0 +1,172 @@
+"""
+Immutable snapshot of the loaded datasets and of everything derived from them
+(spatial indexes, parsed columns, region tables, dataset versions)
+
+A reload builds a new DatasetSnapshot off the event loop and publishes it
+with a single reference swap. Every request is pinned to the snapshot that
+was published when it started (contextvar, also seen by COMPUTE_POOL jobs),
+so it never combines datasets from two different loads.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from region_polygons import RegionAssignment, RegionPolygons
+from region_tables import RegionTables
+from scoring_engine import RegionScores, empty_scores
+from spatial_index import GridIndex
+from vector_tiles import PolygonTileSource
+
+
+class DatasetSnapshot:
+    """
+    Незмінний знімок усіх датасетів
+
+    Поля не змінюються після створення; оновлення - replace(), що
+    повертає новий знімок (незмінені поля спільні з попереднім).
+    """
+
+    __slots__ = (
+        'population', 'infrastructure', 'protected_areas', 'recommended_locations', 'region_boundaries',
+        'recreational_points', 'forest_fires', 'recreational_index', 'fires_index', 'fires_human',
+        'point_numeric', 'point_parse_failures', 'region_tables', 'region_tile_source',
+        'region_polygons', 'point_regions', 'fire_regions', 'fire_stats', 'region_scores', 'versions',
+        'region_versions'
+    )
+
+    def __init__(
+        self,
+        population: Optional[dict] = None,
+        infrastructure: Optional[dict] = None,
+        protected_areas: Optional[dict] = None,
+        recommended_locations: Optional[dict] = None,
+        region_boundaries: Optional[dict] = None,
+        recreational_points=None,
+        forest_fires=None,
+        recreational_index: Optional[GridIndex] = None,
+        fires_index: Optional[GridIndex] = None,
+        fires_human: Optional[np.ndarray] = None,
+        point_numeric: Optional[Dict[str, np.ndarray]] = None,
+        point_parse_failures: Optional[Dict[str, dict]] = None,
+        region_tables: Optional[RegionTables] = None,
+        region_tile_source: Optional[PolygonTileSource] = None,
+        region_polygons: Optional[RegionPolygons] = None,
+        point_regions: Optional[RegionAssignment] = None,
+        fire_regions: Optional[RegionAssignment] = None,
+        fire_stats: Optional[Dict[str, dict]] = None,
+        region_scores: Optional[RegionScores] = None,
+        versions: Optional[Dict[str, Optional[str]]] = None,
+        region_versions: Optional[Dict[str, Tuple[Optional[str], Dict[str, str]]]] = None
+    ):
+        """
+        recreational_points, forest_fires - колонкові шари (snapshot_store.ColumnarLayer) або None
+        fires_human[i] - пожежа i має cause_type == "людський фактор"
+        point_numeric - розібрані числові властивості пунктів (capacity, visitors_per_day)
+        region_polygons - полігони регіонів (point-in-polygon)
+        point_regions, fire_regions - регіон кожного пункту / пожежі за полігонами
+                                      і розбіжності з properties.region
+        fire_stats - регіон -> агрегати пожеж (region_tables.region_fire_stats)
+        region_scores - бали 7 факторів усіх регіонів (scoring_engine.score_indicators)
+        versions - версія кожного датасету (sha1 вмісту файлу)
+        region_versions - датасет -> (версія при повному завантаженні, {регіон: версія
+                          останнього delta-імпорту, що його зачепив})
+        """
+        fields = {
+            'population': population,
+            'infrastructure': infrastructure,
+            'protected_areas': protected_areas,
+            'recommended_locations': recommended_locations,
+            'region_boundaries': region_boundaries,
+            'recreational_points': recreational_points,
+            'forest_fires': forest_fires,
+            'recreational_index': recreational_index or GridIndex.from_coordinates([]),
+            'fires_index': fires_index or GridIndex.from_coordinates([]),
+            'fires_human': fires_human if fires_human is not None else np.zeros(0, dtype=bool),
+            'point_numeric': point_numeric or {},
+            'point_parse_failures': point_parse_failures or {},
+            'region_tables': region_tables or RegionTables(),
+            'region_tile_source': region_tile_source or PolygonTileSource('regions', None, ()),
+            'region_polygons': region_polygons or RegionPolygons(None),
+            'point_regions': point_regions or RegionAssignment.empty(),
+            'fire_regions': fire_regions or RegionAssignment.empty(),
+            'fire_stats': fire_stats or {},
+            'region_scores': region_scores or empty_scores(),
+            'versions': versions or {},
+            'region_versions': region_versions or {},
+        }
+        for key, value in fields.items():
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, key: str, value: Any):
+        raise AttributeError("DatasetSnapshot is immutable; use replace()")
+
+    def replace(self, **changes) -> "DatasetSnapshot":
+        """Новий знімок з заміненими полями"""
+        fields = {key: getattr(self, key) for key in self.__slots__}
+        fields.update(changes)
+        return DatasetSnapshot(**fields)
+
+    def dataset_versions(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Версії датасетів (компонент ключа кешу)"""
+        return {name: self.versions.get(name) for name in names}
+
+    def region_dataset_versions(self, region_name: str, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Версії датасетів для аналізу регіону: delta-імпорти змінюють версію лише зачеплених регіонів"""
+        versions = self.dataset_versions(names)
+        for name, (base_version, affected) in self.region_versions.items():
+            if name in versions:
+                versions[name] = affected.get(region_name, base_version)
+        return versions
+
+
+_PINNED_SNAPSHOT: ContextVar[Optional[DatasetSnapshot]] = ContextVar('dataset_snapshot', default=None)
+
+
+class PublishedSnapshot:
+    """
+    Посилання на опублікований DatasetSnapshot
+
+    current() - знімок, закріплений за поточним запитом (або опублікований);
+    latest() - опублікований зараз (для оновлень, що будують наступний знімок).
+    """
+
+    def __init__(self, snapshot: Optional[DatasetSnapshot] = None):
+        self._snapshot = snapshot or DatasetSnapshot()
+
+    def current(self) -> DatasetSnapshot:
+        pinned = _PINNED_SNAPSHOT.get()
+        return pinned if pinned is not None else self._snapshot
+
+    def latest(self) -> DatasetSnapshot:
+        return self._snapshot
+
+    def publish(self, snapshot: DatasetSnapshot) -> DatasetSnapshot:
+        """Опублікувати знімок (одна заміна посилання); повертає попередній"""
+        previous, self._snapshot = self._snapshot, snapshot
+        return previous
+
+    @contextmanager
+    def pinned(self, snapshot: Optional[DatasetSnapshot] = None):
+        """Закріпити знімок (default - опублікований) за поточним контекстом"""
+        token = _PINNED_SNAPSHOT.set(snapshot or self._snapshot)
+        try:
+            yield
+        finally:
+            _PINNED_SNAPSHOT.reset(token)
+
+
+class SnapshotPinningMiddleware:
+    """ASGI middleware: кожен HTTP запит працює з одним знімком від початку до кінця"""
+
+    def __init__(self, app, published: PublishedSnapshot):
+        self.app = app
+        self.published = published
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] not in ('http', 'websocket'):
+            await self.app(scope, receive, send)
+            return
+        with self.published.pinned():
+            await self.app(scope, receive, send)
@@ -0,0 +1,219 @@
+"""
+Viewport queries for point layers (forest fires, recreational points)
+Filters by bbox / region / cause type / date range through the spatial index
+and region tables, and aggregates points into grid clusters at low zoom
+"""
+import math
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from spatial_index import GridIndex
+
+
+# До цього зуму включно точки віддаються кластерами
+CLUSTER_MAX_ZOOM = 7
+
+# Розмір клітинки кластера - частка тайла 256px
+CLUSTER_CELL_PX = 64
+
+HUMAN_CAUSE = "людський фактор"
+NATURAL_CAUSE = "природні причини"
+CAUSE_TYPE_ALIASES = {
+    "human": HUMAN_CAUSE,
+    "natural": NATURAL_CAUSE,
+}
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Розібрати bbox у форматі "minLng,minLat,maxLng,maxLat"
+
+    Raises:
+        ValueError: якщо формат або значення некоректні
+    """
+    parts = bbox.split(',')
+    if len(parts) != 4:
+        raise ValueError("bbox must be 'minLng,minLat,maxLng,maxLat'")
+    min_lng, min_lat, max_lng, max_lat = (float(p) for p in parts)
+    if not all(math.isfinite(v) for v in (min_lng, min_lat, max_lng, max_lat)):
+        raise ValueError("bbox values must be finite numbers")
+    if min_lng > max_lng or min_lat > max_lat:
+        raise ValueError("bbox min values must not exceed max values")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def parse_date(value: str) -> date:
+    """
+    Розібрати дату у форматі YYYY-MM-DD або DD.MM.YYYY (формат у даних пожеж)
+
+    Raises:
+        ValueError: якщо дата некоректна
+    """
+    value = value.strip()
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value}")
+
+
+def normalize_cause_type(cause_type: str) -> str:
+    """Повна назва причини пожежі ('human' / 'natural' або назва з даних)"""
+    return CAUSE_TYPE_ALIASES.get(cause_type.strip().lower(), cause_type.strip())
+
+
+def fire_predicate(cause_type: Optional[str] = None, date_from: Optional[date] = None,
+                   date_to: Optional[date] = None) -> Optional[Callable[[dict], bool]]:
+    """
+    Фільтр властивостей пожежі за причиною та діапазоном дат
+
+    Returns:
+        Функція properties -> bool або None, якщо фільтрів немає
+    """
+    if cause_type is None and date_from is None and date_to is None:
+        return None
+
+    def predicate(properties: dict) -> bool:
+        if cause_type is not None and properties.get('cause_type') != cause_type:
+            return False
+        if date_from is not None or date_to is not None:
+            try:
+                fire_date = parse_date(str(properties.get('date', '')))
+            except ValueError:
+                return False
+            if date_from is not None and fire_date < date_from:
+                return False
+            if date_to is not None and fire_date > date_to:
+                return False
+        return True
+
+    return predicate
+
+
+def select_features(
+    layer,
+    index: GridIndex,
+    region_indices: Optional[np.ndarray] = None,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    predicate: Optional[Callable[[dict], bool]] = None
+) -> List[int]:
+    """
+    Індекси features, що проходять усі фільтри (у вихідному порядку)
+
+    Args:
+        layer: Колонковий шар (snapshot_store.ColumnarLayer) або None
+        index: GridIndex цього шару
+        region_indices: Індекси features регіону (з RegionTables) або None
+        bbox: (minLng, minLat, maxLng, maxLat) або None
+        predicate: Фільтр за properties або None
+    """
+    if layer is None or len(layer) == 0:
+        return []
+
+    if bbox is not None:
+        min_lng, min_lat, max_lng, max_lat = bbox
+        candidates = index.query_bbox(min_lat, min_lng, max_lat, max_lng)
+        if region_indices is not None:
+            candidates = np.intersect1d(candidates, region_indices, assume_unique=True)
+    elif region_indices is not None:
+        candidates = region_indices
+    else:
+        candidates = np.arange(len(layer))
+
+    selected = candidates.tolist()
+    if predicate is not None:
+        selected = [idx for idx in selected if predicate(layer.properties(idx) or {})]
+    return selected
+
+
+def feature_collection(layer, indices: List[int], limit: Optional[int] = None) -> Dict:
+    """
+    FeatureCollection з вибраних features з метаданими вибірки
+
+    metadata містить метадані шару та matched/returned/truncated;
+    features відновлюються з колонок шару лише для повернутих індексів
+    """
+    returned = indices if limit is None else indices[:limit]
+    metadata = dict(layer.metadata) if layer is not None else {}
+    metadata.update({
+        "matched": len(indices),
+        "returned": len(returned),
+        "truncated": len(returned) < len(indices),
+    })
+    return {
+        "type": "FeatureCollection",
+        "metadata": metadata,
+        "features": [layer.feature(idx) for idx in returned],
+    }
+
+
+def cluster_cell_size_deg(zoom: int) -> float:
+    """Розмір клітинки кластера в градусах для рівня зуму"""
+    return 360.0 / (2 ** zoom) * CLUSTER_CELL_PX / 256
+
+
+def aggregate_clusters(
+    layer,
+    index: GridIndex,
+    indices: List[int],
+    zoom: int,
+    count_property: Optional[Tuple[str, str, object]] = None
+) -> Dict:
+    """
+    Агрегувати точки в кластери по сітці, що залежить від зуму
+
+    Args:
+        layer: Колонковий шар (snapshot_store.ColumnarLayer) або None
+        index: GridIndex шару (координати точок)
+        indices: Індекси вибраних features
+        zoom: Рівень зуму карти
+        count_property: (назва поля результату, property, значення) - додатково
+                        рахувати точки з properties[property] == значення
+
+    Returns:
+        FeatureCollection точок-кластерів з properties cluster/point_count
+    """
+    idx = np.asarray(indices, dtype=np.int64)
+    if len(idx):
+        idx = idx[index.points.valid[idx]]
+
+    metadata = dict(layer.metadata) if layer is not None else {}
+    metadata.update({"matched": int(len(idx)), "clustered": True, "zoom": zoom})
+
+    if len(idx) == 0:
+        return {"type": "FeatureCollection", "metadata": metadata, "features": []}
+
+    cell = cluster_cell_size_deg(zoom)
+    lat = index.points.lat_deg[idx]
+    lng = index.points.lng_deg[idx]
+    rows = np.floor(lat / cell).astype(np.int64)
+    cols = np.floor(lng / cell).astype(np.int64)
+    keys, inverse = np.unique(np.stack([rows, cols], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    counts = np.bincount(inverse, minlength=len(keys))
+    lat_mean = np.bincount(inverse, weights=lat, minlength=len(keys)) / counts
+    lng_mean = np.bincount(inverse, weights=lng, minlength=len(keys)) / counts
+
+    extra = None
+    if count_property is not None:
+        _, prop, value = count_property
+        flags = layer.equals_mask(prop, value)[idx].astype(np.float64)
+        extra = np.bincount(inverse, weights=flags, minlength=len(keys))
+
+    clusters = []
+    for k in range(len(keys)):
+        properties = {"cluster": True, "point_count": int(counts[k])}
+        if extra is not None:
+            properties[count_property[0]] = int(extra[k])
+        clusters.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(lng_mean[k]), float(lat_mean[k])]},
+            "properties": properties,
+        })
+
+    metadata["returned"] = len(clusters)
+    return {"type": "FeatureCollection", "metadata": metadata, "features": clusters}
@@ -0,0 +1,76 @@
+"""
+Geodesic distance kernel (Haversine)
+Single implementation shared by the spatial index and clustering.
+Coordinates are held as contiguous float64 arrays in radians with cos(lat)
+precomputed, so a one-to-many query is one NumPy call.
+"""
+import math
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class GeoPoints:
+    """
+    Набір точок у вигляді масивів float64 (радіани) з передобчисленим cos(lat)
+
+    Точки без координат зберігаються як NaN і ніколи не потрапляють
+    у результати запитів за радіусом (порівняння з NaN завжди False).
+    """
+
+    def __init__(self, lat_deg, lng_deg):
+        """
+        Args:
+            lat_deg, lng_deg: Масиви широт/довгот у градусах однакової довжини
+        """
+        self.lat_deg = np.ascontiguousarray(lat_deg, dtype=np.float64)
+        self.lng_deg = np.ascontiguousarray(lng_deg, dtype=np.float64)
+        self.lat = np.radians(self.lat_deg)
+        self.lng = np.radians(self.lng_deg)
+        self.cos_lat = np.cos(self.lat)
+
+    @classmethod
+    def from_coordinates(cls, coordinates: Sequence[Optional[Tuple[float, float]]]) -> "GeoPoints":
+        """Створити з послідовності (lat, lng) або None"""
+        lat = np.full(len(coordinates), np.nan)
+        lng = np.full(len(coordinates), np.nan)
+        for idx, coords in enumerate(coordinates):
+            if coords is not None:
+                lat[idx], lng[idx] = coords
+        return cls(lat, lng)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """Маска точок з координатами"""
+        return ~np.isnan(self.lat)
+
+
+def haversine_one_to_many(lat: float, lng: float, points: GeoPoints, subset: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Відстані (км) від однієї точки до набору точок
+
+    Args:
+        lat, lng: Точка запиту в градусах
+        points: Набір точок
+        subset: Індекси точок, до яких рахувати відстань (за замовчуванням - всі)
+
+    Returns:
+        Масив відстаней у км (NaN для точок без координат)
+    """
+    lat_rad = math.radians(lat)
+    lng_rad = math.radians(lng)
+
+    if subset is None:
+        p_lat, p_lng, p_cos = points.lat, points.lng, points.cos_lat
+    else:
+        p_lat, p_lng, p_cos = points.lat[subset], points.lng[subset], points.cos_lat[subset]
+
+    a = np.sin((p_lat - lat_rad) / 2) ** 2 + math.cos(lat_rad) * p_cos * np.sin((p_lng - lng_rad) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
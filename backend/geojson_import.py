@@ -0,0 +1,389 @@
+"""
+Streaming import of GeoJSON FeatureCollection uploads
+Features are parsed one at a time from the upload stream, validated
+individually (errors carry feature number and line), written to the data
+file and compiled into the columnar snapshot without ever holding the
+whole document - or its Pydantic tree - in memory
+"""
+import codecs
+import hashlib
+import itertools
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from snapshot_store import ColumnarLayer, ColumnarLayerBuilder, source_fingerprint, write_snapshot
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Максимальний розмір одного значення (feature, metadata) у символах
+MAX_VALUE_CHARS = 16 * 1024 * 1024
+
+# Скільки помилок валідації features повертати в повідомленні
+MAX_REPORTED_ERRORS = 10
+
+WHITESPACE = ' \t\n\r'
+
+# Символи, якими може продовжуватись число, обрізане на кінці буфера ("-6." + "0e+10")
+NUMBER_CHARS = '0123456789+-.eE'
+
+# Місце масиву features у шаблоні документа (_document_parts)
+FEATURES_PLACEHOLDER = "\0features\0"
+
+
+class StreamParseError(ValueError):
+    """Некоректний JSON у потоці (з номером рядка)"""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"{message}: line {line}")
+        self.line = line
+
+
+class FeatureValidationError(ValueError):
+    """
+    Помилки валідації окремих features
+
+    errors - список {"feature": номер, "line": рядок, "error": текст}
+    (не більше MAX_REPORTED_ERRORS), error_count - загальна кількість
+    """
+
+    def __init__(self, errors: List[Dict[str, Any]], error_count: int):
+        details = "; ".join(
+            f"feature {e['feature']} (line {e['line']}): {e['error']}" for e in errors
+        )
+        more = f"; ... and {error_count - len(errors)} more" if error_count > len(errors) else ""
+        super().__init__(f"{error_count} invalid feature(s): {details}{more}")
+        self.errors = errors
+        self.error_count = error_count
+
+
+class _StreamReader:
+    """Буфер тексту над ітератором фрагментів з підрахунком рядків"""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        # Номер рядка позиції _line_pos буфера (рахується інкрементно)
+        self._line_pos = 0
+        self._line = 1
+
+    def fill(self) -> bool:
+        """Дочитати наступний фрагмент (False - потік закінчився)"""
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            return False
+        self._line = self.line(self.pos)
+        self._line_pos = 0
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def line(self, pos: Optional[int] = None) -> int:
+        pos = self.pos if pos is None else pos
+        if pos >= self._line_pos:
+            self._line += self.buf.count('\n', self._line_pos, pos)
+        else:
+            self._line -= self.buf.count('\n', pos, self._line_pos)
+        self._line_pos = pos
+        return self._line
+
+    def error(self, message: str, pos: Optional[int] = None) -> StreamParseError:
+        return StreamParseError(message, self.line(pos))
+
+    def peek(self) -> str:
+        """Наступний не пробільний символ ('' в кінці потоку)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def value(self) -> Tuple[Any, int]:
+        """
+        Розібрати наступне JSON-значення
+
+        Returns:
+            (значення, номер рядка початку значення)
+        """
+        self.peek()
+        while True:
+            if len(self.buf) - self.pos > MAX_VALUE_CHARS:
+                # Кінець значення не знайдено в межах ліміту (незалежно від того, чи воно коректне)
+                raise self.error(f"Value exceeds {MAX_VALUE_CHARS} characters")
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Помилка може означати лише, що значення ще не дочитане
+                if self.fill():
+                    continue
+                raise self.error(e.msg, e.pos)
+
+            # Значення в кінці буфера могло бути обрізане (число: "12" з "12345",
+            # "-6" з "-6.0e+10") - воно завершене лише якщо після нього вже є роздільник
+            tail = end
+            while tail < len(self.buf) and self.buf[tail] in NUMBER_CHARS + WHITESPACE:
+                tail += 1
+            if tail == len(self.buf) and self.fill():
+                continue
+
+            line = self.line()
+            self.pos = end
+            return value, line
+
+
+def iter_feature_collection(chunks: Iterable[str], top_level: Dict[str, Any]) -> Iterator[Tuple[int, Any]]:
+    """
+    Потоковий розбір FeatureCollection
+
+    Args:
+        chunks: Фрагменти тексту документа
+        top_level: Словник, який заповнюється ключами верхнього рівня
+                   (крім елементів features) у порядку появи
+
+    Yields:
+        (номер рядка, feature) для кожного елемента масиву features
+
+    Raises:
+        StreamParseError: якщо документ не є коректним JSON-об'єктом
+    """
+    reader = _StreamReader(chunks)
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.pos += 1
+    else:
+        while True:
+            key, _ = reader.value()
+            if not isinstance(key, str):
+                raise reader.error("Expecting property name enclosed in double quotes")
+            reader.expect(':')
+
+            if key == 'features':
+                top_level['features'] = None
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        feature, line = reader.value()
+                        yield line, feature
+                        char = reader.peek()
+                        reader.pos += 1
+                        if char == ']':
+                            break
+                        if char != ',':
+                            raise reader.error("Expecting ',' delimiter", reader.pos - 1)
+            else:
+                top_level[key], _ = reader.value()
+
+            char = reader.peek()
+            reader.pos += 1
+            if char == '}':
+                break
+            if char != ',':
+                raise reader.error("Expecting ',' delimiter", reader.pos - 1)
+
+    if reader.peek() != '':
+        raise reader.error("Extra data")
+
+
+def iter_text_chunks(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Фрагменти тексту з бінарного потоку (UTF-8, багатобайтові символи на межах коректні)"""
+    return codecs.iterdecode(iter(lambda: stream.read(chunk_size), b''), 'utf-8')
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return ", ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _indented_json(value: Any, indent: str) -> str:
+    """json.dumps(indent=2) з відступом кожного рядка - як у json.dump всього документа"""
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return "\n".join(indent + line for line in text.split("\n"))
+
+
+def _document_parts(top_level: Iterable[Tuple[str, Any]]) -> Tuple[str, str]:
+    """
+    Текст документа json.dump(indent=2) до та після масиву features
+    (features - на своєму місці серед ключів верхнього рівня)
+    """
+    text = json.dumps(
+        {key: (FEATURES_PLACEHOLDER if key == 'features' else value) for key, value in top_level},
+        ensure_ascii=False, indent=2
+    )
+    head, tail = text.split(json.dumps(FEATURES_PLACEHOLDER))
+    return head, tail
+
+
+def dump_feature(feature: BaseModel) -> dict:
+    """model_dump() feature; поле id пропускається, якщо його немає у вхідних даних"""
+    return feature.model_dump(exclude={'id'} if getattr(feature, 'id', None) is None else None)
+
+
+def iter_validated_features(stream: BinaryIO, feature_model: Type[BaseModel],
+                            top_level: Dict[str, Any]) -> Iterator[dict]:
+    """
+    Розібрати потік і валідувати кожну feature окремо
+
+    Yields:
+        model_dump() валідних features (після першої помилки - нічого)
+
+    Raises:
+        StreamParseError: некоректний JSON
+        FeatureValidationError: після розбору всього потоку, якщо були некоректні features
+        ValueError: немає features або список порожній
+    """
+    errors: List[Dict[str, Any]] = []
+    error_count = 0
+    count = 0
+    for line, feature in iter_feature_collection(iter_text_chunks(stream), top_level):
+        count += 1
+        try:
+            validated = dump_feature(feature_model.model_validate(feature))
+        except ValidationError as e:
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"feature": count, "line": line, "error": _format_validation_error(e)})
+            continue
+        if not error_count:
+            yield validated
+
+    if error_count:
+        raise FeatureValidationError(errors, error_count)
+    if 'features' not in top_level:
+        raise ValueError("Field required: features")
+    if count == 0:
+        raise ValueError("Features list cannot be empty")
+
+
+def read_feature_delta(stream: BinaryIO, feature_model: Type[BaseModel],
+                       header_model: Type[BaseModel]) -> ColumnarLayer:
+    """Розібрати й валідувати FeatureCollection з оновленнями (delta-імпорт) у колонковий шар"""
+    builder = ColumnarLayerBuilder()
+    top_level: Dict[str, Any] = {}
+    for feature in iter_validated_features(stream, feature_model, top_level):
+        builder.add(feature)
+    header_model.model_validate({k: v for k, v in top_level.items() if k != 'features'})
+    return builder.build({"type": "FeatureCollection", "features": None})
+
+
+def _write_atomically(output_path: Path, parts: Iterable[bytes]) -> str:
+    """Записати файл через тимчасовий і os.replace; повертає sha1 вмісту"""
+    tmp_output = output_path.with_name(f".{output_path.name}.tmp-{os.getpid()}")
+    digest = hashlib.sha1()
+    try:
+        with open(tmp_output, 'wb') as out:
+            for part in parts:
+                digest.update(part)
+                out.write(part)
+        os.replace(tmp_output, output_path)
+    finally:
+        if tmp_output.exists():
+            tmp_output.unlink()
+    return digest.hexdigest()
+
+
+def write_layer(layer: ColumnarLayer, output_path: Path, snapshot_dir: Path) -> ColumnarLayer:
+    """
+    Записати шар у файл даних (формат json.dump(indent=2), по одній feature)
+    та його snapshot
+
+    Returns:
+        Шар з version = sha1 записаного файлу
+    """
+    output_path = Path(output_path)
+    head, tail = _document_parts(layer.top_level)
+
+    def parts():
+        yield (head + "[").encode('utf-8')
+        for idx in range(len(layer)):
+            yield (("," if idx else "") + "\n" + _indented_json(layer.feature(idx), "    ")).encode('utf-8')
+        yield (("\n  ]" if len(layer) else "]") + tail).encode('utf-8')
+
+    layer.version = _write_atomically(output_path, parts())
+    _write_snapshot_for(layer, output_path, snapshot_dir)
+    return layer
+
+
+def _write_snapshot_for(layer: ColumnarLayer, output_path: Path, snapshot_dir: Path):
+    try:
+        write_snapshot(layer, snapshot_dir, source_fingerprint(output_path))
+    except OSError:
+        # Snapshot буде скомпільовано з файлу при наступному завантаженні
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+
+def import_feature_collection(
+    stream: BinaryIO,
+    output_path: Path,
+    snapshot_dir: Path,
+    feature_model: Type[BaseModel],
+    header_model: Type[BaseModel]
+) -> Tuple[BaseModel, ColumnarLayer]:
+    """
+    Потоково імпортувати FeatureCollection у файл даних і columnar snapshot
+
+    Кожна feature валідується feature_model окремо; ключі верхнього рівня
+    (крім features) - header_model. Файл записується у форматі
+    json.dump(schema.model_dump(), indent=2), як раніше, але по одній feature;
+    snapshot компілюється з тих самих features і відповідає файлу.
+
+    Returns:
+        (валідований header, скомпільований шар)
+
+    Raises:
+        StreamParseError: некоректний JSON
+        FeatureValidationError: некоректні features
+        ValidationError: некоректні поля верхнього рівня
+        ValueError: порожній список features
+    """
+    output_path = Path(output_path)
+    tmp_features = output_path.with_name(f".{output_path.name}.features-{os.getpid()}")
+
+    builder = ColumnarLayerBuilder()
+    top_level: Dict[str, Any] = {}
+    try:
+        with open(tmp_features, 'w', encoding='utf-8', newline='') as features_file:
+            for feature in iter_validated_features(stream, feature_model, top_level):
+                features_file.write(("," if builder.count else "") + "\n" + _indented_json(feature, "    "))
+                builder.add(feature)
+
+        header = header_model.model_validate({k: v for k, v in top_level.items() if k != 'features'})
+
+        # Документ: поля header у порядку схеми, features - останнім полем
+        document = header.model_dump()
+        document['features'] = None
+        head, tail = _document_parts(document.items())
+
+        with open(tmp_features, 'rb') as features_file:
+            version = _write_atomically(output_path, itertools.chain(
+                [(head + "[").encode('utf-8')],
+                iter(lambda: features_file.read(CHUNK_SIZE), b''),
+                [("\n  ]" + tail).encode('utf-8')]
+            ))
+    finally:
+        if tmp_features.exists():
+            tmp_features.unlink()
+
+    layer = builder.build(document, version=version)
+    _write_snapshot_for(layer, output_path, snapshot_dir)
+    return header, layer
@@ -0,0 +1,221 @@
+"""
+MongoDB access layer over Motor: one pooled client configured from the
+environment (pool size, server selection / socket timeouts), timed
+operations with per-operation latency histograms, batched bulk writes,
+connection pool monitoring and a ping probe for the readiness endpoint
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Mapping, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+
+# Кількість операцій в одному bulk_write
+BULK_BATCH_SIZE = 1000
+
+# Верхні межі кошиків гістограми затримок, мс (останній кошик - все, що більше)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class StorageError(RuntimeError):
+    """Помилка MongoDB при читанні / записі"""
+
+
+class LatencyHistogram:
+    """Гістограма затримок однієї операції (кількість у кожному кошику LATENCY_BUCKETS_MS)"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float, failed: bool = False):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.errors += int(failed)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0,
+            "max_ms": round(self.max_ms, 2),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Лічильники пулу з'єднань (CMAP події PyMongo)
+
+    Події приходять з потоків драйвера - лічильники під локом.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.created = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def _update(self, **deltas):
+        with self._lock:
+            for key, delta in deltas.items():
+                setattr(self, key, getattr(self, key) + delta)
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._update(pool_clears=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._update(open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(open=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._update(checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._update(checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._update(checked_out=-1)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "created": self.created,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+            }
+
+
+class MongoAccess:
+    """
+    Клієнт MongoDB з метриками
+
+    Args:
+        url: Рядок підключення
+        db_name: Назва бази даних
+        settings: Опції AsyncIOMotorClient (maxPoolSize, serverSelectionTimeoutMS, ...)
+    """
+
+    def __init__(self, url: str, db_name: str, settings: Optional[Dict[str, Any]] = None):
+        self.settings = dict(settings or {})
+        self.pool_monitor = PoolMonitor()
+        self.client = AsyncIOMotorClient(url, event_listeners=[self.pool_monitor], **self.settings)
+        self.db = self.client[db_name]
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    @asynccontextmanager
+    async def timed(self, operation: str):
+        """
+        Виміряти операцію (записується в гістограму operation);
+        помилки PyMongo перетворюються на StorageError
+        """
+        histogram = self.histograms.setdefault(operation, LatencyHistogram())
+        started_at = time.perf_counter()
+        try:
+            yield
+        except PyMongoError as e:
+            histogram.observe((time.perf_counter() - started_at) * 1000, failed=True)
+            raise StorageError(f"Storage error ({operation}): {e}") from e
+        histogram.observe((time.perf_counter() - started_at) * 1000)
+
+    async def bulk_write(self, collection, requests: List[Any], ordered: bool = True) -> int:
+        """
+        Виконати операції пакетами по BULK_BATCH_SIZE (bulk_write)
+
+        Returns:
+            Кількість виконаних операцій
+        """
+        for start in range(0, len(requests), BULK_BATCH_SIZE):
+            async with self.timed('bulk_write'):
+                await collection.bulk_write(requests[start:start + BULK_BATCH_SIZE], ordered=ordered)
+        return len(requests)
+
+    async def ping(self) -> float:
+        """
+        Перевірити доступність сервера (команда ping)
+
+        Returns:
+            Затримка в мс
+
+        Raises:
+            StorageError: сервер недоступний (не довше serverSelectionTimeoutMS)
+        """
+        started_at = time.perf_counter()
+        async with self.timed('ping'):
+            await self.client.admin.command('ping')
+        return round((time.perf_counter() - started_at) * 1000, 2)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pool": {
+                "max_pool_size": self.settings.get('maxPoolSize'),
+                "min_pool_size": self.settings.get('minPoolSize'),
+                **self.pool_monitor.stats()
+            },
+            "operations": {name: histogram.stats() for name, histogram in sorted(self.histograms.items())},
+        }
+
+    def close(self):
+        self.client.close()
+
+
+# Змінна оточення -> (опція AsyncIOMotorClient, значення за замовчуванням)
+CLIENT_SETTINGS = {
+    'MONGO_MAX_POOL_SIZE': ('maxPoolSize', 50),
+    'MONGO_MIN_POOL_SIZE': ('minPoolSize', 0),
+    'MONGO_MAX_IDLE_TIME_MS': ('maxIdleTimeMS', 60000),
+    'MONGO_WAIT_QUEUE_TIMEOUT_MS': ('waitQueueTimeoutMS', 5000),
+    'MONGO_SERVER_SELECTION_TIMEOUT_MS': ('serverSelectionTimeoutMS', 5000),
+    'MONGO_CONNECT_TIMEOUT_MS': ('connectTimeoutMS', 5000),
+    'MONGO_SOCKET_TIMEOUT_MS': ('socketTimeoutMS', 30000),
+}
+
+
+def create_mongo_access(environ: Mapping[str, str] = os.environ) -> MongoAccess:
+    """
+    Створити клієнт з налаштувань оточення: MONGO_URL, DB_NAME і
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS (див. CLIENT_SETTINGS)
+    """
+    settings = {
+        option: int(environ.get(variable, default))
+        for variable, (option, default) in CLIENT_SETTINGS.items()
+    }
+    return MongoAccess(environ['MONGO_URL'], environ['DB_NAME'], settings)
@@ -0,0 +1,219 @@
+"""
+Optional MongoDB storage for the datasets (DATA_STORAGE=mongo)
+Point layers are stored one document per feature with a GeoJSON location
+(2dsphere index), so radius queries and region aggregations can run in the
+database; the small JSON datasets are stored as whole documents. Several API
+replicas share one copy of the data and reload when a dataset version changes.
+
+Collections:
+    datasets     - {_id: dataset name, version, data} for JSON datasets,
+                   {_id, version, top_level, next_seq} for point layers
+    <dataset>    - per feature: {fid, seq, region, declared_region, location, feature}
+                   fid = stable ID (ColumnarLayer.stable_ids), seq = order in the layer,
+                   region = region of the feature in the per-region aggregations of the API
+                   (the same key as RegionTables), declared_region = properties.region
+"""
+import math
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import ASCENDING, GEOSPHERE, DeleteMany, InsertOne
+
+from geodesic import EARTH_RADIUS_KM
+from mongo_access import MongoAccess
+
+
+DATASETS_COLLECTION = 'datasets'
+
+
+def feature_document(feature: dict, fid: str, seq: int, region: Optional[str]) -> dict:
+    """Документ колекції шару для однієї feature (region - регіон feature в агрегаціях)"""
+    document = {
+        'fid': fid,
+        'seq': seq,
+        'region': region,
+        'declared_region': (feature.get('properties') or {}).get('region'),
+        'feature': feature,
+    }
+    geometry = feature.get('geometry') or {}
+    coordinates = geometry.get('coordinates') or []
+    if geometry.get('type') == 'Point' and len(coordinates) >= 2:
+        lng, lat = float(coordinates[0]), float(coordinates[1])
+        if math.isfinite(lng) and math.isfinite(lat):
+            document['location'] = {'type': 'Point', 'coordinates': [lng, lat]}
+    return document
+
+
+def layer_documents(layer, fids: List[str], start: int = 0, stop: Optional[int] = None,
+                    regions: Optional[Sequence[Optional[str]]] = None) -> List[dict]:
+    """
+    Документи features layer[start:stop] (seq = позиція в шарі)
+
+    Args:
+        regions: Регіон кожної feature шару в агрегаціях (None - properties.region)
+    """
+    stop = len(layer) if stop is None else stop
+    documents = []
+    for idx in range(start, stop):
+        feature = layer.feature(idx)
+        region = regions[idx] if regions is not None else (feature.get('properties') or {}).get('region')
+        documents.append(feature_document(feature, fids[idx], idx, region))
+    return documents
+
+
+class MongoFeatureStore:
+    """
+    Датасети в MongoDB
+
+    Усі операції йдуть через MongoAccess.timed (гістограми затримок,
+    помилки PyMongo -> StorageError).
+
+    Args:
+        access: Клієнт MongoDB (mongo_access.MongoAccess)
+        layers: Назви точкових шарів (окрема колекція на шар)
+    """
+
+    def __init__(self, access: MongoAccess, layers: Iterable[str]):
+        self.access = access
+        self.db = access.db
+        self.layers = tuple(layers)
+
+    @property
+    def datasets(self):
+        return self.db[DATASETS_COLLECTION]
+
+    async def ensure_indexes(self):
+        """Створити індекси колекцій шарів (2dsphere по location, region, fid, seq)"""
+        async with self.access.timed('ensure_indexes'):
+            for name in self.layers:
+                await self._create_layer_indexes(self.db[name])
+
+    @staticmethod
+    async def _create_layer_indexes(collection):
+        await collection.create_index([('location', GEOSPHERE)])
+        await collection.create_index([('region', ASCENDING)])
+        await collection.create_index([('fid', ASCENDING)])
+        await collection.create_index([('seq', ASCENDING)])
+
+    async def versions(self) -> Dict[str, Optional[str]]:
+        """Версії датасетів, збережених у MongoDB"""
+        async with self.access.timed('versions'):
+            return {doc['_id']: doc.get('version') async for doc in self.datasets.find({}, {'version': 1})}
+
+    async def load_document(self, name: str) -> Tuple[Optional[dict], Optional[str]]:
+        """JSON датасет і його версія ((None, None), якщо не збережений)"""
+        async with self.access.timed('load_document'):
+            doc = await self.datasets.find_one({'_id': name})
+        if doc is None:
+            return None, None
+        return doc['data'], doc['version']
+
+    async def save_document(self, name: str, data: dict, version: str):
+        """Зберегти JSON датасет цілим документом"""
+        async with self.access.timed('save_document'):
+            await self.datasets.replace_one({'_id': name}, {'data': data, 'version': version}, upsert=True)
+
+    async def load_layer(self, name: str) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        FeatureCollection точкового шару (features у збереженому порядку) і версія
+
+        Returns:
+            (geojson, version), (None, None) якщо шар не збережений
+        """
+        async with self.access.timed('load_layer'):
+            info = await self.datasets.find_one({'_id': name})
+            if info is None:
+                return None, None
+            cursor = self.db[name].find({}, {'feature': 1, '_id': 0}).sort('seq', ASCENDING)
+            features = [doc['feature'] async for doc in cursor]
+        geojson = {key: (features if key == 'features' else value) for key, value in info['top_level']}
+        return geojson, info['version']
+
+    async def replace_layer(self, name: str, top_level: List[List[Any]], version: str,
+                            batches: AsyncIterator[List[dict]]):
+        """
+        Замінити шар: features пишуться (bulk_write пакетами) у тимчасову колекцію,
+        яка потім перейменовується на місце шару - читачі не бачать частково
+        записаного шару
+
+        Args:
+            top_level: Ключі верхнього рівня ([[key, value], ...], 'features' без значення)
+            batches: Пакети документів (feature_document)
+        """
+        staging = self.db[f"{name}__staging"]
+        count = 0
+        async with self.access.timed('drop'):
+            await staging.drop()
+        async for batch in batches:
+            count += await self.access.bulk_write(staging, [InsertOne(document) for document in batch], ordered=False)
+        async with self.access.timed('replace_layer'):
+            await self._create_layer_indexes(staging)
+            await staging.rename(name, dropTarget=True)
+            await self.datasets.replace_one(
+                {'_id': name}, {'top_level': top_level, 'version': version, 'next_seq': count}, upsert=True
+            )
+
+    async def apply_delta(self, name: str, removed_fids: List[str], added: List[dict],
+                          top_level: List[List[Any]], version: str):
+        """
+        Delta-імпорт одним bulk_write: видалення features за fid, нові документи -
+        в кінець шару (seq продовжує нумерацію)
+
+        Args:
+            removed_fids: Стабільні ID features, що видаляються / замінюються
+            added: Документи нових features (seq призначається тут)
+        """
+        async with self.access.timed('find_one'):
+            info = await self.datasets.find_one({'_id': name}, {'next_seq': 1})
+        next_seq = (info or {}).get('next_seq', 0)
+        for offset, document in enumerate(added):
+            document['seq'] = next_seq + offset
+
+        requests = [DeleteMany({'fid': {'$in': removed_fids}})] if removed_fids else []
+        requests.extend(InsertOne(document) for document in added)
+        await self.access.bulk_write(self.db[name], requests, ordered=True)
+
+        async with self.access.timed('update_one'):
+            await self.datasets.update_one(
+                {'_id': name},
+                {'$set': {'top_level': top_level, 'version': version}, '$inc': {'next_seq': len(added)}},
+                upsert=True
+            )
+
+    async def query_radius(self, name: str, lat: float, lng: float, radius_km: float,
+                           limit: int) -> List[dict]:
+        """Features у радіусі radius_km, від найближчої ($nearSphere по 2dsphere індексу)"""
+        query = {'location': {'$nearSphere': {
+            '$geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+            '$maxDistance': radius_km * 1000.0
+        }}}
+        async with self.access.timed('query_radius'):
+            cursor = self.db[name].find(query, {'feature': 1, '_id': 0}).limit(limit)
+            return [doc['feature'] async for doc in cursor]
+
+    async def count_radius(self, name: str, lat: float, lng: float, radius_km: float) -> int:
+        """Кількість features у радіусі ($geoWithin / $centerSphere - count_documents не приймає $nearSphere)"""
+        query = {'location': {'$geoWithin': {'$centerSphere': [[lng, lat], radius_km / EARTH_RADIUS_KM]}}}
+        async with self.access.timed('count_radius'):
+            return await self.db[name].count_documents(query)
+
+    async def region_summary(self, name: str,
+                             count_property: Optional[Tuple[str, str, Any]] = None) -> List[dict]:
+        """
+        Агрегація шару по регіонах у базі ($group за полем region - тим самим
+        регіоном, що й в агрегаціях API)
+
+        Args:
+            count_property: (назва лічильника, властивість, значення) - додатково
+                            рахувати features з properties[властивість] == значення
+
+        Returns:
+            [{"region": ..., "count": ..., <лічильник>: ...}, ...] за назвою регіону
+        """
+        group = {'_id': '$region', 'count': {'$sum': 1}}
+        if count_property is not None:
+            counter, key, value = count_property
+            group[counter] = {'$sum': {'$cond': [{'$eq': [f'$feature.properties.{key}', value]}, 1, 0]}}
+        pipeline = [{'$group': group}, {'$sort': {'_id': ASCENDING}}]
+        async with self.access.timed('region_summary'):
+            rows = [row async for row in self.db[name].aggregate(pipeline)]
+        return [{'region': row.pop('_id'), **row} for row in rows]
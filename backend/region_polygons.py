@@ -0,0 +1,271 @@
+"""
+Point-in-polygon engine over the region boundaries (ukraine_regions_boundaries.geojson)
+Every region keeps its bounding box and arrays of polygon edges; a batch of
+points is tested with one vectorized ray-casting pass per region, only for the
+points inside its bounding box. RegionAssignment checks every feature of a
+point layer against the polygons when the layer is loaded or imported and flags
+features whose declared properties.region disagrees with them
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from geodesic import EARTH_RADIUS_KM, GeoPoints
+
+
+# Код точки поза всіма полігонами (і невідомого регіону)
+NO_REGION = -1
+
+# Кількість точок в одному блоці перевірки (масив блок x ребра в пам'яті)
+CHUNK_SIZE = 4096
+
+# Кілометрів в одному градусі дуги великого кола
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180.0
+
+
+def _polygon_rings(geometry: Optional[dict]) -> List[list]:
+    """Кільця (зовнішні і отвори) Polygon / MultiPolygon"""
+    if not geometry:
+        return []
+    if geometry.get('type') == 'Polygon':
+        return list(geometry.get('coordinates') or [])
+    if geometry.get('type') == 'MultiPolygon':
+        return [ring for polygon in geometry.get('coordinates') or [] for ring in polygon]
+    return []
+
+
+def _ring_edges(ring: list) -> np.ndarray:
+    """Ребра кільця [[x1, y1, x2, y2], ...] (кільце замикається, якщо не замкнене)"""
+    vertices = np.asarray([coords[:2] for coords in ring], dtype=np.float64).reshape(-1, 2)
+    if len(vertices) < 3:
+        return np.empty((0, 4))
+    if not np.array_equal(vertices[0], vertices[-1]):
+        vertices = np.vstack([vertices, vertices[:1]])
+    return np.hstack([vertices[:-1], vertices[1:]])
+
+
+class RegionPolygons:
+    """
+    Полігони регіонів для визначення регіону точки
+
+    Точка всередині полігона, якщо промінь від неї на схід перетинає ребра
+    непарну кількість разів (even-odd: отвори і частини MultiPolygon
+    обробляються тим самим правилом).
+    """
+
+    def __init__(self, geojson: Optional[dict], name_key: str = 'name'):
+        """
+        Args:
+            geojson: FeatureCollection полігонів регіонів (None - порожній набір)
+            name_key: Властивість з назвою регіону
+        """
+        self.names: List[str] = []
+        self.edges: List[np.ndarray] = []
+        # dx/dy кожного ребра (горизонтальні ребра - inf, промінь їх не перетинає)
+        self.slopes: List[np.ndarray] = []
+        bboxes = []
+        for feature in (geojson or {}).get('features', []):
+            name = (feature.get('properties') or {}).get(name_key)
+            rings = [_ring_edges(ring) for ring in _polygon_rings(feature.get('geometry'))]
+            edges = np.vstack(rings) if rings else np.empty((0, 4))
+            if name is None or len(edges) == 0:
+                continue
+            self.names.append(name)
+            self.edges.append(edges)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.slopes.append((edges[:, 2] - edges[:, 0]) / (edges[:, 3] - edges[:, 1]))
+            xs, ys = edges[:, [0, 2]], edges[:, [1, 3]]
+            bboxes.append((xs.min(), ys.min(), xs.max(), ys.max()))
+        # [min_lng, min_lat, max_lng, max_lat] кожного регіону
+        self.bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        self._codes = {name: code for code, name in reversed(list(enumerate(self.names)))}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def code(self, name: Optional[str]) -> int:
+        """Код регіону за назвою (NO_REGION, якщо полігона немає)"""
+        return self._codes.get(name, NO_REGION)
+
+    def codes(self, names: Sequence[Optional[str]]) -> np.ndarray:
+        """Коди регіонів для послідовності назв"""
+        return np.fromiter((self.code(name) for name in names), dtype=np.int64, count=len(names))
+
+    def contains(self, code: int, points: GeoPoints) -> np.ndarray:
+        """Булева маска точок всередині полігона регіону code (точки без координат - False)"""
+        inside = np.zeros(len(points), dtype=bool)
+        min_lng, min_lat, max_lng, max_lat = self.bboxes[code]
+        lng, lat = points.lng_deg, points.lat_deg
+        candidates = np.flatnonzero((lng >= min_lng) & (lng <= max_lng) & (lat >= min_lat) & (lat <= max_lat))
+        x1, y1, _, y2 = (column[np.newaxis, :] for column in self.edges[code].T)
+        slopes = self.slopes[code][np.newaxis, :]
+        for start in range(0, len(candidates), CHUNK_SIZE):
+            chunk = candidates[start:start + CHUNK_SIZE]
+            x, y = lng[chunk, np.newaxis], lat[chunk, np.newaxis]
+            straddles = (y1 > y) != (y2 > y)
+            with np.errstate(invalid='ignore'):
+                crossing_x = x1 + (y - y1) * slopes
+            crossings = np.count_nonzero(straddles & (x < crossing_x), axis=1)
+            inside[chunk] = (crossings % 2) == 1
+        return inside
+
+    def boundary_distance_km(self, code: int, points: GeoPoints) -> np.ndarray:
+        """
+        Відстань (км) від кожної точки до найближчого ребра полігона регіону code
+        (рівнопроміжна проєкція навколо точки - достатньо точно на десятках км;
+        точки без координат - NaN)
+        """
+        distances = np.full(len(points), np.nan)
+        x1, y1, x2, y2 = (column[np.newaxis, :] for column in self.edges[code].T)
+        for start in range(0, len(points), CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            lng, lat = points.lng_deg[chunk, np.newaxis], points.lat_deg[chunk, np.newaxis]
+            scale = np.cos(np.radians(lat))
+            ax, ay = (x1 - lng) * scale, y1 - lat
+            dx, dy = (x2 - lng) * scale - ax, y2 - lat - ay
+            length2 = dx * dx + dy * dy
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = np.where(length2 > 0, np.clip(-(ax * dx + ay * dy) / length2, 0.0, 1.0), 0.0)
+            distances[chunk] = np.hypot(ax + t * dx, ay + t * dy).min(axis=1) * KM_PER_DEGREE
+        return distances
+
+    def membership(self, points: GeoPoints) -> np.ndarray:
+        """Матриця (точки x регіони): точка всередині полігона регіону"""
+        matrix = np.zeros((len(points), len(self)), dtype=bool)
+        for code in range(len(self)):
+            matrix[:, code] = self.contains(code, points)
+        return matrix
+
+    def assign(self, points: GeoPoints, declared: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Регіон кожної точки (рівно один - сусідні полігони можуть перекриватися)
+
+        Args:
+            points: Точки
+            declared: Коди регіонів, вказаних у даних (NO_REGION - невідомий);
+                      заявлений регіон обирається, якщо його полігон містить точку
+
+        Returns:
+            Масив кодів регіонів (індекси в names); точки поза всіма
+            полігонами - NO_REGION
+        """
+        matrix = self.membership(points)
+        assigned = np.where(matrix.any(axis=1), matrix.argmax(axis=1), NO_REGION)
+        if declared is not None and len(self):
+            declared = np.asarray(declared, dtype=np.int64)
+            rows = np.flatnonzero(declared != NO_REGION)
+            keep_declared = rows[matrix[rows, declared[rows]]]
+            assigned[keep_declared] = declared[keep_declared]
+        return assigned
+
+
+def declared_region_codes(polygons: RegionPolygons, layer) -> np.ndarray:
+    """Коди регіонів з properties.region колонкового шару (snapshot_store.ColumnarLayer)"""
+    if layer is None or len(layer) == 0:
+        return np.empty(0, dtype=np.int64)
+    column = layer.columns.get('region')
+    if column is None or column.kind != 'values':
+        return polygons.codes([layer.property_value('region', idx) for idx in range(len(layer))])
+    table = np.append(polygons.codes(column.values), NO_REGION)
+    # MISSING_CODE (-1) колонки потрапляє на останній елемент таблиці - NO_REGION
+    return table[np.asarray(column.data, dtype=np.int64)]
+
+
+class RegionAssignment:
+    """
+    Регіон кожної feature точкового шару для агрегацій по регіонах і
+    прапорці розбіжностей заявленого properties.region з полігонами
+
+    codes[i] - регіон feature i для всіх агрегацій по регіонах. За
+    замовчуванням це заявлений регіон: межі в ukraine_regions_boundaries.geojson
+    грубі (8-9 вершин на область), тож полігон лише діагностує розбіжності.
+    З use_polygons (точні межі) - полігон, що містить точку (заявлений, якщо
+    його полігон її містить - сусідні полігони перекриваються); точка поза
+    всіма полігонами залишається в заявленому регіоні.
+    """
+
+    __slots__ = ('codes', 'declared', 'spatial', 'boundary_km')
+
+    def __init__(self, codes: np.ndarray, declared: np.ndarray, spatial: np.ndarray, boundary_km: np.ndarray):
+        """
+        Args:
+            codes: Коди регіонів для агрегацій (NO_REGION - регіон невідомий)
+            declared: Коди заявлених регіонів (NO_REGION - немає або не збігається з назвою полігона)
+            spatial: Коди регіонів за полігонами (NO_REGION - точка поза всіма полігонами)
+            boundary_km: Відстань від точки до полігона заявленого регіону, км
+                         (0 - всередині, NaN - заявлений регіон невідомий)
+        """
+        self.codes = codes
+        self.declared = declared
+        self.spatial = spatial
+        self.boundary_km = boundary_km
+
+    @classmethod
+    def empty(cls) -> "RegionAssignment":
+        return cls(*(np.empty(0, dtype=np.int64) for _ in range(3)), np.empty(0))
+
+    @classmethod
+    def compute(cls, polygons: RegionPolygons, layer, points: GeoPoints,
+                use_polygons: bool = False) -> "RegionAssignment":
+        """
+        Призначити регіони features колонкового шару
+
+        Args:
+            points: Координати features
+            use_polygons: Агрегувати за полігоном, що містить точку, а не за заявленим регіоном
+        """
+        if layer is None:
+            return cls.empty()
+        declared = declared_region_codes(polygons, layer)
+        spatial = polygons.assign(points, declared)
+        codes = np.where(spatial == NO_REGION, declared, spatial) if use_polygons else declared
+
+        # Полігон заявленого регіону не містить точку - відстань до нього
+        boundary_km = np.where(declared != NO_REGION, 0.0, np.nan)
+        off = np.flatnonzero((declared != NO_REGION) & (spatial != declared))
+        for code in np.unique(declared[off]).tolist():
+            rows = off[declared[off] == code]
+            boundary_km[rows] = polygons.boundary_distance_km(
+                code, GeoPoints(points.lat_deg[rows], points.lng_deg[rows])
+            )
+        return cls(codes, declared, spatial, boundary_km)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def updated(self, keep: np.ndarray, added: "RegionAssignment") -> "RegionAssignment":
+        """Призначення після видалення features (keep[i] == False) і додавання added у кінець"""
+        return RegionAssignment(*(
+            np.concatenate([getattr(self, slot)[keep], getattr(added, slot)]) for slot in self.__slots__
+        ))
+
+    @property
+    def outside(self) -> np.ndarray:
+        """Маска точок поза всіма полігонами"""
+        return self.spatial == NO_REGION
+
+    def mismatched(self, tolerance_km: float = 0.0) -> np.ndarray:
+        """
+        Маска features, заявлений регіон яких не містить точку, а інший полігон - містить
+
+        Args:
+            tolerance_km: Точки ближче до полігона заявленого регіону не позначаються
+                          (грубі межі зсувають точки біля кордону в сусідній полігон)
+        """
+        return ~self.outside & (self.boundary_km > tolerance_km)
+
+    def flagged(self, tolerance_km: float = 0.0) -> np.ndarray:
+        """Маска features для перевірки: розбіжності і точки поза всіма полігонами далі tolerance_km"""
+        return self.mismatched(tolerance_km) | (self.outside & ~(self.boundary_km <= tolerance_km))
+
+    def summary(self, tolerance_km: float = 0.0) -> dict:
+        """Лічильники призначення для відповідей API"""
+        return {
+            "features": len(self),
+            "assigned": int(np.count_nonzero(self.codes != NO_REGION)),
+            "mismatched": int(np.count_nonzero(self.mismatched(tolerance_km))),
+            "near_boundary": int(np.count_nonzero((self.boundary_km > 0) & (self.boundary_km <= tolerance_km))),
+            "outside_boundaries": int(np.count_nonzero(self.outside)),
+            "unknown_declared_region": int(np.count_nonzero(self.declared == NO_REGION)),
+            "mismatch_tolerance_km": tolerance_km,
+        }
@@ -0,0 +1,153 @@
+"""
+Region lookup tables
+Normalized in-memory view of the loaded datasets keyed by region name:
+population / infrastructure / PFZ records plus per-region arrays of
+recreational point and fire indices (by the region assigned from the region
+polygons, see region_polygons.RegionAssignment). Built once per (re)load, so
+every per-region lookup in the API is O(1) instead of a scan over the lists
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+EMPTY_INDICES = np.empty(0, dtype=np.int64)
+
+
+def index_records(records: List[dict], key: str) -> Dict[str, dict]:
+    """
+    Словник {назва регіону: запис}
+
+    Якщо регіон повторюється - залишається перший запис (як при лінійному пошуку)
+    """
+    table = {}
+    for record in records:
+        table.setdefault(record.get(key), record)
+    return table
+
+
+def group_layer_by_region(layer) -> Dict[str, np.ndarray]:
+    """
+    Словник {назва регіону: масив індексів} для колонкового шару
+    (snapshot_store.ColumnarLayer) - групування за кодами колонки region
+    """
+    if layer is None or len(layer) == 0:
+        return {}
+
+    column = layer.columns.get('region')
+    if column is None or column.kind != 'values':
+        groups: Dict[str, List[int]] = {}
+        for idx in range(len(layer)):
+            groups.setdefault(layer.property_value('region', idx), []).append(idx)
+        return {region: np.array(indices, dtype=np.int64) for region, indices in groups.items()}
+
+    codes = np.asarray(column.data, dtype=np.int64)
+    order = np.argsort(codes, kind='stable')
+    region_codes, starts = np.unique(codes[order], return_index=True)
+    return {
+        column.values[code]: indices
+        for code, indices in zip(region_codes.tolist(), np.split(order, starts[1:]))
+    }
+
+
+def region_fire_stats(region_codes: np.ndarray, region_names: List[str], human: np.ndarray,
+                      area_ha: np.ndarray) -> Dict[str, dict]:
+    """
+    Агрегати пожеж по регіонах (кожна пожежа - рівно в одному регіоні)
+
+    Args:
+        region_codes: Код регіону кожної пожежі (індекс у region_names, -1 - поза регіонами)
+        region_names: Назви регіонів
+        human: Маска пожеж з людським фактором
+        area_ha: Площа кожної пожежі, га
+
+    Returns:
+        {регіон: {"total_fires", "human_caused", "other_causes", "area_ha", "human_area_ha"}}
+        для всіх регіонів (без пожеж - нулі)
+    """
+    assigned = region_codes >= 0
+    codes = region_codes[assigned]
+    human, area_ha = human[assigned], area_ha[assigned]
+    size = len(region_names)
+    totals = np.bincount(codes, minlength=size)
+    human_totals = np.bincount(codes, weights=human, minlength=size)
+    areas = np.bincount(codes, weights=area_ha, minlength=size)
+    human_areas = np.bincount(codes, weights=np.where(human, area_ha, 0.0), minlength=size)
+    return {
+        name: {
+            "total_fires": int(totals[code]),
+            "human_caused": int(human_totals[code]),
+            "other_causes": int(totals[code] - human_totals[code]),
+            "area_ha": round(float(areas[code]), 2),
+            "human_area_ha": round(float(human_areas[code]), 2),
+        }
+        for code, name in enumerate(region_names)
+    }
+
+
+def group_by_region_codes(codes: np.ndarray, region_names: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Словник {назва регіону: масив індексів} за кодами регіонів
+    (індекси в region_names; features з кодом -1 не потрапляють у жоден регіон)
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    order = np.argsort(codes, kind='stable')
+    order = order[codes[order] >= 0]
+    region_codes, starts = np.unique(codes[order], return_index=True)
+    return {
+        region_names[code]: indices
+        for code, indices in zip(region_codes.tolist(), np.split(order, starts[1:]))
+    }
+
+
+class RegionTables:
+    """
+    Таблиці пошуку по регіонах для всіх завантажених датасетів
+    """
+
+    def __init__(self, population_data: Optional[dict] = None, infrastructure_data: Optional[dict] = None,
+                 protected_areas_data: Optional[dict] = None, recreational_points=None, forest_fires=None,
+                 point_capacity: Optional[np.ndarray] = None, region_names: Optional[List[str]] = None,
+                 point_regions: Optional[np.ndarray] = None, fire_regions: Optional[np.ndarray] = None):
+        """
+        recreational_points, forest_fires - колонкові шари (ColumnarLayer) або None
+        point_capacity - розібрана місткість кожного рекреаційного пункту (float64)
+        region_names, point_regions, fire_regions - назви регіонів і призначений код
+        регіону кожного пункту / пожежі; без них - групування за properties.region
+        """
+        self.population = index_records(
+            (population_data or {}).get('ukraine_regions_data', []), 'name'
+        )
+        self.infrastructure = index_records(
+            (infrastructure_data or {}).get('ukraine_infrastructure', {}).get('regions', []), 'region'
+        )
+        self.protected_areas = index_records(
+            (protected_areas_data or {}).get('ukraine_protected_areas', {}).get('regions', []), 'region'
+        )
+        if region_names is not None and point_regions is not None and recreational_points is not None:
+            self.points = group_by_region_codes(point_regions, region_names)
+        else:
+            self.points = group_layer_by_region(recreational_points)
+        if region_names is not None and fire_regions is not None and forest_fires is not None:
+            self.fires = group_by_region_codes(fire_regions, region_names)
+        else:
+            self.fires = group_layer_by_region(forest_fires)
+
+        # Сумарна місткість пунктів регіону (сума в порядку пунктів, як при обході списку)
+        self.capacity: Dict[str, float] = {}
+        if point_capacity is not None:
+            self.capacity = {
+                region: sum(point_capacity[indices].tolist()) for region, indices in self.points.items()
+            }
+
+    def point_indices(self, region_name: str) -> np.ndarray:
+        """Індекси рекреаційних пунктів регіону"""
+        return self.points.get(region_name, EMPTY_INDICES)
+
+    def total_capacity(self, region_name: str) -> float:
+        """Сумарна місткість рекреаційних пунктів регіону"""
+        return self.capacity.get(region_name, 0)
+
+    def fire_indices(self, region_name: str) -> np.ndarray:
+        """Індекси пожеж регіону"""
+        return self.fires.get(region_name, EMPTY_INDICES)
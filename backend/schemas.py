@@ -2,7 +2,7 @@
 Pydantic schemas for data validation
 """
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 
 
 # ===== Population Data Schemas =====
@@ -125,12 +125,13 @@ class RecreationalPointProperties(BaseModel):
 
 class RecreationalPointFeature(BaseModel):
     type: str
+    id: Optional[Union[str, int]] = None  # Stable ID for delta imports (GeoJSON feature id)
     geometry: RecreationalPointGeometry
     properties: RecreationalPointProperties
 
-class RecreationalPointsSchema(BaseModel):
+class FeatureCollectionHeaderSchema(BaseModel):
+    """Top-level fields except features (validated separately when streaming)"""
     type: str
-    features: List[RecreationalPointFeature]
     
     @field_validator('type')
     @classmethod
@@ -138,6 +139,12 @@ class RecreationalPointsSchema(BaseModel):
         if v != "FeatureCollection":
             raise ValueError(f"Expected type 'FeatureCollection', got '{v}'")
         return v
+
+class RecreationalPointsHeaderSchema(FeatureCollectionHeaderSchema):
+    pass
+
+class RecreationalPointsSchema(RecreationalPointsHeaderSchema):
+    features: List[RecreationalPointFeature]
     
     @field_validator('features')
     @classmethod
@@ -182,6 +189,7 @@ class FireProperties(BaseModel):
 
 class FireFeature(BaseModel):
     type: str
+    id: Optional[Union[str, int]] = None  # Stable ID for delta imports (GeoJSON feature id)
     geometry: FireGeometry
     properties: FireProperties
 
@@ -193,21 +201,46 @@ class FireMetadata(BaseModel):
     regions: List[str]
     note: str
 
-class ForestFiresSchema(BaseModel):
-    type: str
+class ForestFiresHeaderSchema(FeatureCollectionHeaderSchema):
     metadata: FireMetadata
+
+class ForestFiresSchema(ForestFiresHeaderSchema):
     features: List[FireFeature]
     
-    @field_validator('type')
-    @classmethod
-    def validate_type(cls, v):
-        if v != "FeatureCollection":
-            raise ValueError(f"Expected type 'FeatureCollection', got '{v}'")
-        return v
-    
     @field_validator('features')
     @classmethod
     def validate_features_count(cls, v):
         if len(v) == 0:
             raise ValueError("Features list cannot be empty")
         return v
+
+
+# ===== Delta import =====
+class DeleteFeaturesRequest(BaseModel):
+    """Stable IDs of features to remove (GeoJSON id or "name@lng,lat")"""
+    ids: List[Union[str, int]]
+
+
+# ===== AHP batch evaluation =====
+class AHPBatchRequest(BaseModel):
+    """Stack of pairwise comparison matrices (e.g. one per expert) evaluated in one call"""
+    matrices: List[List[List[float]]] = Field(..., min_length=1, max_length=100000)
+    method: str = "geometric"  # 'geometric' or 'eigenvector'
+
+
+# ===== What-if scenarios =====
+class ScenarioPoint(BaseModel):
+    """Hypothetical recreational point(s) at one location"""
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    capacity: float = Field(0, ge=0)  # capacity of each point
+    count: int = Field(1, ge=1, le=1000)  # number of identical points at this location
+    region: Optional[str] = None  # used if the location is outside all region polygons
+
+class ScenarioRequest(BaseModel):
+    """Delta against the current data; nothing is written"""
+    added_points: List[ScenarioPoint] = Field(default_factory=list, max_length=10000)
+    removed_point_ids: List[Union[str, int]] = Field(default_factory=list, max_length=10000)
+    # region -> {indicator: new value}, see scoring_engine.SCENARIO_INDICATORS
+    indicators: Dict[str, Dict[str, Union[bool, float, str]]] = Field(default_factory=dict)
+    include_zones: bool = True
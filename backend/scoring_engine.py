@@ -0,0 +1,373 @@
+"""
+Vectorized 7-factor scoring of all regions
+The indicators of every region (population, PFZ, nature, transport,
+infrastructure, saturation, fires) are loaded into one column-per-indicator
+matrix; the methodology thresholds are np.digitize / np.select tables, so the
+seven factor columns, totals and categories of all regions come out of one
+pass. The per-region analysis dict (server.calculate_full_potential) is a
+view over one row of the result
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Фактори у порядку критеріїв AHP (ahp_calculator.criteria_names)
+FACTOR_KEYS = (
+    'demand_score', 'pfz_score', 'nature_score', 'accessibility_score',
+    'infrastructure_score', 'fire_score', 'saturation_penalty'
+)
+
+# Максимальні бали факторів; насиченість - штраф
+FACTOR_MAXIMA = np.array([25.0, 20.0, 15.0, 15.0, 10.0, 5.0, -15.0])
+
+# Фактори з цілими балами (порогові шкали без дробових значень)
+INTEGER_FACTORS = ('demand_score', 'fire_score', 'saturation_penalty')
+
+# Бали, що в покроковій формулі цілі лише за умови (обмежені цілим максимумом
+# або складені з цілих доданків); колонка '<ключ>_is_int' зберігає цю умову,
+# щоб тип значення у відповіді API не залежав від векторизації
+CONDITIONALLY_INTEGER_SCORES = ('pfz_score', 'nature_score', 'accessibility_score', 'infrastructure_score',
+                                'total_score')
+
+# Значення за замовчуванням, якщо для регіону немає запису в датасеті
+DEFAULT_POPULATION_DATA = {'population': 1000000, 'area_km2': 20000, 'forest_coverage_percent': 10, 'has_water_bodies': False}
+DEFAULT_PFZ_DATA = {
+    'protected_areas': {'national_parks': 0, 'nature_reserves': 0, 'regional_landscape_parks': 0, 'zakazniks': 0, 'monuments_of_nature': 0, 'percent_of_region': 0},
+    'pfz_score': 5.0, 'notable_objects': [], 'recreational_value': 'medium'
+}
+DEFAULT_INFRA_DATA = {
+    'transport_accessibility': {'accessibility_score': 5.0, 'highway_density_km_per_1000km2': 200, 'main_roads': [], 'railway_stations': 20, 'airports': 0, 'average_travel_time_to_major_city_minutes': 60},
+    'anthropogenic_infrastructure': {'hospitals_per_100k': 4.0, 'gas_stations_per_100km2': 0.5, 'mobile_coverage_percent': 90, 'internet_coverage_percent': 85, 'hotels_total': 100, 'electricity_reliability': 'середня'}
+}
+
+# Колонка індикатора -> (розділ запису регіону, ключ, значення за замовчуванням)
+INDICATOR_COLUMNS = {
+    'population': ('population', 'population', 1000000),
+    'area_km2': ('population', 'area_km2', 20000),
+    'forest_coverage_percent': ('population', 'forest_coverage_percent', 10),
+    'has_water_bodies': ('population', 'has_water_bodies', False),
+    'national_parks': ('protected_areas', 'national_parks', 0),
+    'nature_reserves': ('protected_areas', 'nature_reserves', 0),
+    'regional_landscape_parks': ('protected_areas', 'regional_landscape_parks', 0),
+    'zakazniks': ('protected_areas', 'zakazniks', 0),
+    'monuments_of_nature': ('protected_areas', 'monuments_of_nature', 0),
+    'percent_of_region': ('protected_areas', 'percent_of_region', 0),
+    'accessibility_score': ('transport', 'accessibility_score', 5.0),
+    'airports': ('transport', 'airports', 0),
+    'highway_density_km_per_1000km2': ('transport', 'highway_density_km_per_1000km2', 0),
+    'hospitals_per_100k': ('anthropogenic', 'hospitals_per_100k', 0),
+    'gas_stations_per_100km2': ('anthropogenic', 'gas_stations_per_100km2', 0),
+    'mobile_coverage_percent': ('anthropogenic', 'mobile_coverage_percent', 0),
+    'internet_coverage_percent': ('anthropogenic', 'internet_coverage_percent', 0),
+    'hotels_total': ('anthropogenic', 'hotels_total', 0),
+}
+
+# Індикатори, які можна змінити у what-if сценарії (server /api/scenarios)
+SCENARIO_INDICATORS = tuple(INDICATOR_COLUMNS) + ('international_roads', 'electricity_reliability')
+
+
+class Thresholds:
+    """
+    Порогова шкала: значення за інтервалом, у який потрапляє показник (np.digitize)
+
+    Args:
+        bounds: Зростаючі межі інтервалів
+        values: Значення для кожного інтервалу (len(bounds) + 1)
+        inclusive: True - межа належить верхньому інтервалу (x >= межа),
+                   False - нижньому (x > межа)
+    """
+
+    def __init__(self, bounds: Sequence[float], values: Sequence[Any], inclusive: bool = True):
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.values = np.asarray(values, dtype=object if isinstance(values[0], str) else np.float64)
+        self.inclusive = inclusive
+
+    def __call__(self, x) -> np.ndarray:
+        return self.values[np.digitize(x, self.bounds, right=not self.inclusive)]
+
+
+# 1. Попит: співвідношення пропозиції до попиту (дефіцит >40% ... надлишок >50%)
+DEMAND_SCORE = Thresholds((0.6, 0.8, 1.0, 1.5), (25, 20, 15, 10, 0))
+# 2. ПЗФ: (множник, максимум) за кількість об'єктів кожної категорії і бонус за частку площі
+PFZ_OBJECT_WEIGHTS = {
+    'national_parks': (2.0, 8),
+    'nature_reserves': (1.5, 6),
+    'regional_landscape_parks': (1.0, 4),
+    'zakazniks': (0.1, 1.5),
+    'monuments_of_nature': (0.05, 0.5),
+}
+PFZ_SHARE_BONUS = Thresholds((5, 7, 10), (0, 1, 1.5, 2), inclusive=False)
+# 5. Інфраструктура
+HOSPITALS_SCORE = Thresholds((4.0, 5.0), (1, 2, 3))
+GAS_STATIONS_SCORE = Thresholds((0.7, 1.0), (1, 1.5, 2))
+MOBILE_COVERAGE_SCORE = Thresholds((93, 96), (1, 1.5, 2))
+INTERNET_COVERAGE_SCORE = Thresholds((85, 90), (0, 0.5, 1))
+HOTELS_SCORE = Thresholds((100, 200), (0, 0.5, 1), inclusive=False)
+ELECTRICITY_SCORES = {'висока': 1, 'середня': 0.5}
+# 6. Насиченість: пунктів на 1000 км²
+SATURATION_PENALTY = Thresholds((2, 3, 4, 6), (0, -3, -6, -10, -15), inclusive=False)
+DENSITY_STATUS = Thresholds(
+    (2, 4, 6), ("Низька конкуренція", "Помірна насиченість", "Висока насиченість", "Критична насиченість"),
+    inclusive=False
+)
+# 7. Пожежі: людських пожеж у регіоні (більше пожеж - вища потреба в облаштованих пунктах)
+FIRE_PREVENTION_SCORE = Thresholds((5, 10, 15), (0, 1, 3, 5))
+
+# Категорія, ризик і масштаб інвестицій за загальним балом
+CATEGORY = Thresholds((40, 55, 70, 85), ("НИЗЬКИЙ", "СЕРЕДНІЙ", "ВИСОКИЙ", "ДУЖЕ ВИСОКИЙ", "ВИНЯТКОВИЙ"))
+RECOMMENDATION = Thresholds((40, 55, 70, 85), (
+    "Низький попит або перенасичений ринок. Будівництво ризиковане.",
+    "Обмежений потенціал. Можливе точкове будівництво.",
+    "Хороший потенціал. Рекомендується детальний аналіз локацій.",
+    "Дуже привабливо для інвесторів. Будівництво настійно рекомендується.",
+    "Найвища пріоритетність! Термінове будівництво рекомендується."
+))
+RISK_LEVEL = Thresholds((50, 65, 80), ("ВИСОКИЙ", "ПІДВИЩЕНИЙ", "ПОМІРНИЙ", "НИЗЬКИЙ"))
+# (мінімальний бал, мінімальний дефіцит відвідувань, масштаб) - перша виконана умова
+INVESTMENT_SCALES = (
+    (80, 200000, "ВЕЛИКИЙ (5+ об'єктів, $1M+)"),
+    (70, 100000, "СЕРЕДНІЙ (3-5 об'єктів, $500K-1M)"),
+    (55, 50000, "МАЛИЙ (1-2 об'єкти, $200K-500K)"),
+    (40, None, "ТОЧКОВИЙ (1 унікальний об'єкт)"),
+)
+NOT_RECOMMENDED = "НЕ РЕКОМЕНДОВАНО"
+
+
+def region_sections(population_data: Optional[dict], pfz_data: Optional[dict],
+                    infra_data: Optional[dict]) -> Dict[str, dict]:
+    """Розділи записів регіону (з значеннями за замовчуванням для відсутніх записів)"""
+    population_data = population_data or DEFAULT_POPULATION_DATA
+    pfz_data = pfz_data or DEFAULT_PFZ_DATA
+    infra_data = infra_data or DEFAULT_INFRA_DATA
+    return {
+        'population': population_data,
+        'pfz': pfz_data,
+        'infra': infra_data,
+        'protected_areas': pfz_data.get('protected_areas', {}),
+        'transport': infra_data.get('transport_accessibility', {}),
+        'anthropogenic': infra_data.get('anthropogenic_infrastructure', {}),
+    }
+
+
+class RegionIndicators:
+    """
+    Матриця індикаторів регіонів: колонка на індикатор, рядок на регіон
+
+    columns - INDICATOR_COLUMNS, а також international_roads, electricity_reliability,
+    points_count, total_capacity, human_fires; sections - розділи записів
+    кожного регіону (region_sections) для деталей аналізу
+    """
+
+    __slots__ = ('names', 'sections', 'columns')
+
+    def __init__(self, names: List[str], sections: List[Dict[str, dict]], columns: Dict[str, np.ndarray]):
+        self.names = names
+        self.sections = sections
+        self.columns = columns
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Optional[dict], Optional[dict], Optional[dict], int, float, int]]) -> "RegionIndicators":
+        """
+        Args:
+            records: (регіон, запис населення, запис ПЗФ, запис інфраструктури,
+                      кількість пунктів, сумарна місткість, людських пожеж) для кожного регіону
+        """
+        names, sections, counts = [], [], []
+        for name, population_data, pfz_data, infra_data, points_count, total_capacity, human_fires in records:
+            names.append(name)
+            sections.append(region_sections(population_data, pfz_data, infra_data))
+            counts.append((points_count, total_capacity, human_fires))
+
+        columns = {
+            column: np.array([region[section].get(key, default) for region in sections], dtype=np.float64)
+            for column, (section, key, default) in INDICATOR_COLUMNS.items()
+        }
+        columns['international_roads'] = np.array([
+            len([road for road in region['transport'].get('main_roads', []) if road.get('type') == 'міжнародна'])
+            for region in sections
+        ], dtype=np.float64)
+        columns['electricity_reliability'] = np.array(
+            [region['anthropogenic'].get('electricity_reliability', '') for region in sections], dtype=object
+        )
+        counts = np.array(counts, dtype=np.float64).reshape(-1, 3)
+        columns['points_count'], columns['total_capacity'], columns['human_fires'] = counts.T
+        return cls(names, sections, columns)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def subset(self, rows: Sequence[int]) -> "RegionIndicators":
+        """Матриця лише з рядками rows (у заданому порядку)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        return RegionIndicators(
+            [self.names[row] for row in rows.tolist()],
+            [self.sections[row] for row in rows.tolist()],
+            {column: values[rows] for column, values in self.columns.items()}
+        )
+
+    def with_values(self, changes: Dict[int, Dict[str, Any]]) -> "RegionIndicators":
+        """
+        Копія матриці зі зміненими значеннями індикаторів
+
+        Args:
+            changes: Рядок -> {колонка: нове значення}
+        """
+        columns = {column: values.copy() for column, values in self.columns.items()}
+        for row, values in changes.items():
+            for column, value in values.items():
+                columns[column][row] = value
+        return RegionIndicators(self.names, self.sections, columns)
+
+
+class RegionScores:
+    """
+    Результат оцінювання всіх регіонів
+
+    columns - бали факторів (FACTOR_KEYS), total_score, проміжні показники
+    (annual_demand, annual_supply, supply_demand_ratio, gap, density) і текстові
+    оцінки (category, recommendation, risk_level, investment_scale, density_status)
+    """
+
+    __slots__ = ('indicators', 'columns', '_index')
+
+    def __init__(self, indicators: RegionIndicators, columns: Dict[str, np.ndarray]):
+        self.indicators = indicators
+        self.columns = columns
+        self._index = {name: idx for idx, name in reversed(list(enumerate(indicators.names)))}
+
+    @property
+    def names(self) -> List[str]:
+        return self.indicators.names
+
+    def __len__(self) -> int:
+        return len(self.indicators)
+
+    def index(self, region_name: str) -> Optional[int]:
+        """Рядок регіону (None - регіону немає)"""
+        return self._index.get(region_name)
+
+    @property
+    def factors(self) -> np.ndarray:
+        """Бали факторів (регіони, 7) у порядку FACTOR_KEYS"""
+        return np.column_stack([self.columns[key] for key in FACTOR_KEYS]).reshape(-1, len(FACTOR_KEYS))
+
+    @property
+    def total(self) -> np.ndarray:
+        return self.columns['total_score']
+
+    def ranking(self) -> List[str]:
+        """Регіони за спаданням загального балу (рівні бали - за порядком регіонів)"""
+        return [self.names[idx] for idx in np.argsort(-self.total, kind='stable')]
+
+
+def investment_scale(total: np.ndarray, gap: np.ndarray) -> np.ndarray:
+    """Масштаб інвестицій за загальним балом і дефіцитом відвідувань (перша виконана умова)"""
+    conditions = [
+        (total >= min_score) & (gap > min_gap) if min_gap is not None else total >= min_score
+        for min_score, min_gap, _ in INVESTMENT_SCALES
+    ]
+    choices = [np.full(len(total), scale, dtype=object) for _, _, scale in INVESTMENT_SCALES]
+    return np.select(conditions, choices, default=NOT_RECOMMENDED) if len(total) else np.empty(0, dtype=object)
+
+
+def score_indicators(indicators: RegionIndicators) -> RegionScores:
+    """
+    Бали 7 факторів, загальний бал і категорії всіх регіонів за один прохід
+
+    Порядок додавання доданків збігається з покроковою формулою методології,
+    тож бали регіону не залежать від того, оцінюється він один чи разом з іншими.
+    """
+    c = indicators.columns
+
+    # 1. ПОПИТ (25): 15% населення x 3 візити на рік проти місткість x 180 днів x 2 зміни
+    annual_demand = c['population'] * 0.15 * 3
+    annual_supply = c['total_capacity'] * 180 * 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        supply_demand_ratio = np.where(annual_demand > 0, annual_supply / annual_demand, 0.0)
+    demand_score = DEMAND_SCORE(supply_demand_ratio)
+
+    # 2. ПЗФ (20)
+    pfz_score = np.zeros(len(indicators))
+    for key, (weight, cap) in PFZ_OBJECT_WEIGHTS.items():
+        pfz_score = pfz_score + np.minimum(c[key] * weight, cap)
+    pfz_score = pfz_score + PFZ_SHARE_BONUS(c['percent_of_region'])
+    pfz_is_int = pfz_score > 20
+    pfz_score = np.minimum(pfz_score, 20)
+
+    # 3. ПРИРОДА (15): 0.275 = нормалізація лісистості до 11 балів при 40%, водойми +4
+    forest_score = c['forest_coverage_percent'] * 0.275
+    nature_is_int = forest_score > 11
+    nature_score = np.minimum(forest_score, 11) + np.where(c['has_water_bodies'] != 0, 4, 0)
+
+    # 4. ТРАНСПОРТ (15)
+    accessibility_score = (c['accessibility_score'] / 10) * 10
+    accessibility_score = accessibility_score + np.minimum(c['international_roads'] * 0.8, 3)
+    accessibility_score = accessibility_score + np.where(c['airports'] > 0, 1, 0)
+    accessibility_score = accessibility_score + np.where(c['highway_density_km_per_1000km2'] > 250, 1, 0)
+    accessibility_is_int = accessibility_score > 15
+    accessibility_score = np.minimum(accessibility_score, 15)
+
+    # 5. ІНФРАСТРУКТУРА (10)
+    electricity = c['electricity_reliability']
+    infrastructure_terms = [
+        HOSPITALS_SCORE(c['hospitals_per_100k']),
+        GAS_STATIONS_SCORE(c['gas_stations_per_100km2']),
+        MOBILE_COVERAGE_SCORE(c['mobile_coverage_percent']),
+        INTERNET_COVERAGE_SCORE(c['internet_coverage_percent']),
+        HOTELS_SCORE(c['hotels_total']),
+        np.select([electricity == level for level in ELECTRICITY_SCORES], list(ELECTRICITY_SCORES.values()), 0),
+    ]
+    infrastructure_score = infrastructure_terms[0]
+    for term in infrastructure_terms[1:]:
+        infrastructure_score = infrastructure_score + term
+    infrastructure_is_int = np.logical_and.reduce([term % 1 == 0 for term in infrastructure_terms]) | (infrastructure_score > 10)
+    infrastructure_score = np.minimum(infrastructure_score, 10)
+
+    # 6. НАСИЧЕНІСТЬ (-15): пунктів на 1000 км²
+    area = c['area_km2']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        density = np.where(area > 0, c['points_count'] / area * 1000, 0.0)
+    saturation_penalty = SATURATION_PENALTY(density)
+
+    # 7. ПОЖЕЖІ (+5)
+    fire_score = FIRE_PREVENTION_SCORE(c['human_fires'])
+
+    total_score = (demand_score + pfz_score + nature_score + accessibility_score + infrastructure_score
+                   + fire_score + saturation_penalty)
+    total_is_int = ((total_score <= 0) | (total_score >= 100)
+                    | (pfz_is_int & nature_is_int & accessibility_is_int & infrastructure_is_int))
+    total_score = np.clip(total_score, 0, 100)
+    gap = annual_demand - annual_supply
+
+    columns = {
+        'demand_score': demand_score,
+        'pfz_score': pfz_score,
+        'nature_score': nature_score,
+        'accessibility_score': accessibility_score,
+        'infrastructure_score': infrastructure_score,
+        'fire_score': fire_score,
+        'saturation_penalty': saturation_penalty,
+        'total_score': total_score,
+        'annual_demand': annual_demand,
+        'annual_supply': annual_supply,
+        'supply_demand_ratio': supply_demand_ratio,
+        'gap': gap,
+        'density': density,
+        'category': CATEGORY(total_score),
+        'recommendation': RECOMMENDATION(total_score),
+        'risk_level': RISK_LEVEL(total_score),
+        'investment_scale': investment_scale(total_score, gap),
+        'density_status': DENSITY_STATUS(density),
+        'pfz_score_is_int': pfz_is_int,
+        'nature_score_is_int': nature_is_int,
+        'accessibility_score_is_int': accessibility_is_int,
+        'infrastructure_score_is_int': infrastructure_is_int,
+        'total_score_is_int': total_is_int,
+    }
+    return RegionScores(indicators, columns)
+
+
+def empty_scores() -> RegionScores:
+    """Оцінки без регіонів (знімок без даних)"""
+    return score_indicators(RegionIndicators.from_records([]))
@@ -0,0 +1,185 @@
+"""
+Monte Carlo sensitivity of the 7-factor regional ranking to the AHP weights
+Regions are reduced to factor levels (factor score / its maximum, from the
+scoring matrix of scoring_engine);
+thousands of perturbed weight vectors - from perturbed pairwise judgments or
+drawn around the target weights directly - rescore all regions with one matrix
+product, and the rank stability of every region is summarized
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ahp_calculator import batch_weights
+from scoring_engine import FACTOR_KEYS, FACTOR_MAXIMA
+
+# Межі шкали Сааті для збурених суджень
+SAATY_MIN, SAATY_MAX = 1.0 / 9.0, 9.0
+
+SENSITIVITY_MODES = ('judgments', 'weights')
+
+
+def factor_levels(factor_scores: np.ndarray) -> np.ndarray:
+    """
+    Рівні факторів регіонів: бал фактора / його максимум (0..1)
+
+    Args:
+        factor_scores: Бали факторів (регіони, 7) у порядку FACTOR_KEYS (RegionScores.factors)
+    """
+    return np.asarray(factor_scores, dtype=np.float64).reshape(-1, len(FACTOR_KEYS)) / FACTOR_MAXIMA
+
+
+def score_regions(levels: np.ndarray, maxima: np.ndarray) -> np.ndarray:
+    """
+    Загальні бали всіх регіонів для кожного набору максимумів факторів
+
+    Args:
+        levels: Рівні факторів (регіони, 7)
+        maxima: Максимальні бали факторів (вибірки, 7), штраф - від'ємний
+
+    Returns:
+        Масив (вибірки, регіони), обмежений 0..100 як загальний бал
+    """
+    return np.clip(maxima @ levels.T, 0, 100)
+
+
+def _maxima_from_weights(weights: np.ndarray, base_weights: np.ndarray) -> np.ndarray:
+    """
+    Максимуми факторів для ваг: базові максимуми масштабуються відношенням
+    ваг до базових, сума модулів залишається 105 (90 балів + 15 штрафу)
+    """
+    magnitudes = np.abs(FACTOR_MAXIMA) * (weights / base_weights)
+    magnitudes *= np.abs(FACTOR_MAXIMA).sum() / magnitudes.sum(axis=1, keepdims=True)
+    return magnitudes * np.sign(FACTOR_MAXIMA)
+
+
+def sample_maxima_from_judgments(pairwise_matrix: np.ndarray, samples: int, spread: float,
+                                 rng: np.random.Generator) -> np.ndarray:
+    """
+    Збурити судження матриці попарних порівнянь і перерахувати ваги
+
+    Кожне судження над діагоналлю множиться на log-рівномірний множник
+    з [1/spread, spread] і обмежується шкалою Сааті [1/9, 9]; під діагоналлю -
+    обернені значення. Ваги - методом геометричного середнього.
+
+    Returns:
+        Максимуми факторів (samples, 7)
+    """
+    n = len(pairwise_matrix)
+    upper = np.triu_indices(n, 1)
+    noise = np.exp(rng.uniform(-np.log(spread), np.log(spread), size=(samples, len(upper[0]))))
+    judgments = np.clip(pairwise_matrix[upper] * noise, SAATY_MIN, SAATY_MAX)
+
+    # Базові ваги - з тієї ж оберненої матриці без збурень (значення під діагоналлю
+    # заокруглені), тож spread = 1 дає рівно базові максимуми
+    base_judgments = np.clip(pairwise_matrix[upper], SAATY_MIN, SAATY_MAX)
+    matrices = np.ones((samples + 1, n, n))
+    matrices[:, upper[0], upper[1]] = np.vstack([base_judgments, judgments])
+    matrices[:, upper[1], upper[0]] = 1.0 / matrices[:, upper[0], upper[1]]
+    weights = batch_weights(matrices, 'geometric')
+    return _maxima_from_weights(weights[1:], weights[0])
+
+
+def sample_maxima_from_weights(samples: int, concentration: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Ваги напряму з розподілу Діріхле навколо цільових ваг (25/20/15/15/10/5/15);
+    більша concentration - менший розкид
+
+    Returns:
+        Максимуми факторів (samples, 7)
+    """
+    base_weights = np.abs(FACTOR_MAXIMA) / np.abs(FACTOR_MAXIMA).sum()
+    return _maxima_from_weights(rng.dirichlet(base_weights * concentration, size=samples), base_weights)
+
+
+def rank_matrix(scores: np.ndarray) -> np.ndarray:
+    """Місце кожного регіону (1 - найвищий бал) у кожній вибірці; рівні бали - за порядком регіонів"""
+    order = np.argsort(-scores, axis=1, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[1] + 1)[np.newaxis, :], axis=1)
+    return ranks
+
+
+def rank_stability(names: List[str], base_scores: np.ndarray, scores: np.ndarray, top_k: int,
+                   confidence: float) -> List[dict]:
+    """
+    Статистика стабільності рейтингу по регіонах
+
+    Args:
+        names: Назви регіонів
+        base_scores: Бали з поточними вагами
+        scores: Бали у вибірках (вибірки, регіони)
+        top_k: Розмір верхньої групи для ймовірності потрапляння
+        confidence: Рівень довірчих інтервалів (наприклад, 0.9)
+
+    Returns:
+        Список регіонів за базовим місцем
+    """
+    ranks = rank_matrix(scores)
+    base_ranks = rank_matrix(base_scores[np.newaxis, :])[0]
+    tail = (1.0 - confidence) / 2 * 100
+    score_low, score_high = np.percentile(scores, [tail, 100 - tail], axis=0)
+    rank_low, rank_high = np.percentile(ranks, [tail, 100 - tail], axis=0)
+    p_top_k = np.mean(ranks <= top_k, axis=0)
+    p_first = np.mean(ranks == 1, axis=0)
+    mean_rank = ranks.mean(axis=0)
+
+    regions = [
+        {
+            "region": name,
+            "base_score": round(float(base_scores[idx]), 1),
+            "base_rank": int(base_ranks[idx]),
+            "mean_score": round(float(scores[:, idx].mean()), 2),
+            "score_std": round(float(scores[:, idx].std()), 2),
+            "score_interval": [round(float(score_low[idx]), 2), round(float(score_high[idx]), 2)],
+            "mean_rank": round(float(mean_rank[idx]), 2),
+            "rank_interval": [int(np.floor(rank_low[idx])), int(np.ceil(rank_high[idx]))],
+            "p_top_k": round(float(p_top_k[idx]), 4),
+            "p_first": round(float(p_first[idx]), 4),
+        }
+        for idx, name in enumerate(names)
+    ]
+    regions.sort(key=lambda region: region["base_rank"])
+    return regions
+
+
+def run_sensitivity(names: List[str], factor_scores: np.ndarray, base_scores: np.ndarray,
+                    pairwise_matrix: np.ndarray, mode: str = 'judgments', samples: int = 2000, spread: float = 1.5,
+                    concentration: float = 200.0, top_k: int = 5, confidence: float = 0.9,
+                    seed: Optional[int] = None) -> Dict[str, object]:
+    """
+    Monte Carlo аналіз чутливості рейтингу регіонів до ваг
+
+    Args:
+        names: Назви регіонів
+        factor_scores: Бали факторів (регіони, 7) з поточними вагами
+        base_scores: Загальні бали з поточними вагами
+        pairwise_matrix: Базова матриця попарних порівнянь AHP
+        mode: 'judgments' - збурення суджень (spread), 'weights' - ваги з розподілу Діріхле (concentration)
+
+    Returns:
+        Статистика по регіонах і середні / інтервали максимумів факторів
+    """
+    if mode not in SENSITIVITY_MODES:
+        raise ValueError(f"Unknown sensitivity mode: {mode}. Use one of: {', '.join(SENSITIVITY_MODES)}")
+    rng = np.random.default_rng(seed)
+    if mode == 'judgments':
+        maxima = sample_maxima_from_judgments(np.asarray(pairwise_matrix, dtype=np.float64), samples, spread, rng)
+    else:
+        maxima = sample_maxima_from_weights(samples, concentration, rng)
+
+    scores = score_regions(factor_levels(factor_scores), maxima)
+
+    tail = (1.0 - confidence) / 2 * 100
+    maxima_low, maxima_high = np.percentile(maxima, [tail, 100 - tail], axis=0)
+    return {
+        "factor_maxima": {
+            key: {
+                "base": float(FACTOR_MAXIMA[idx]),
+                "mean": round(float(maxima[:, idx].mean()), 2),
+                "interval": [round(float(maxima_low[idx]), 2), round(float(maxima_high[idx]), 2)],
+            }
+            for idx, key in enumerate(FACTOR_KEYS)
+        },
+        "regions": rank_stability(names, base_scores, scores, min(top_k, len(names)), confidence),
+    }
@@ -1,30 +1,79 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Query
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 import json
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
 from datetime import datetime, timezone
 import math
 import hashlib
+import asyncio
+from collections import Counter
+from spatial_index import GridIndex, build_layer_index
+from clustering import cluster_points
+from geodesic import GeoPoints, haversine_one_to_many
+from analysis_cache import MongoCacheBackend, SQLiteCacheBackend, VersionedCache
+from mongo_access import BULK_BATCH_SIZE, StorageError, create_mongo_access
+from mongo_store import MongoFeatureStore, layer_documents
+from dataset_snapshot import DatasetSnapshot, PublishedSnapshot, SnapshotPinningMiddleware
+from region_polygons import NO_REGION, RegionAssignment, RegionPolygons
+from region_tables import RegionTables, region_fire_stats
+from scoring_engine import (
+    CONDITIONALLY_INTEGER_SCORES,
+    FACTOR_KEYS,
+    FIRE_PREVENTION_SCORE,
+    INTEGER_FACTORS,
+    SCENARIO_INDICATORS,
+    RegionIndicators,
+    RegionScores,
+    score_indicators
+)
+from compute_pool import create_compute_pool
+from schemas import AHPBatchRequest, ScenarioRequest
+from sensitivity import rank_matrix
+from static_payloads import PayloadCache, payload_response
+from snapshot_store import ColumnarLayer, ColumnarLayerBuilder, load_or_compile
+from geojson_import import StreamParseError, import_feature_collection, read_feature_delta, write_layer
+from vector_tiles import PolygonTileSource, TileCache, encode_tile, point_layer, tile_is_valid
+from feature_query import (
+    CLUSTER_MAX_ZOOM,
+    HUMAN_CAUSE,
+    aggregate_clusters,
+    feature_collection,
+    fire_predicate,
+    normalize_cause_type,
+    parse_bbox,
+    parse_date,
+    select_features
+)
+import numpy as np
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection: pooled client (MONGO_MAX_POOL_SIZE, MONGO_SERVER_SELECTION_TIMEOUT_MS, ...
+# see mongo_access.CLIENT_SETTINGS) with per-operation latency metrics
+MONGO = create_mongo_access(os.environ)
+client = MONGO.client
+db = MONGO.db
+
+# Dataset storage: 'files' (default) - JSON files under DATA_DIR; 'mongo' - datasets are
+# also kept in MongoDB (mongo_store.py) and shared by all API replicas
+DATA_STORAGE = os.environ.get('DATA_STORAGE', 'files')
+# How often a replica checks MongoDB for datasets imported by other replicas (seconds)
+DATA_SYNC_INTERVAL = float(os.environ.get('DATA_SYNC_INTERVAL', '30'))
 
 app = FastAPI(title="GIS Recreational Potential Analysis System")
 api_router = APIRouter(prefix="/api")
 
+# Thread pool for CPU-bound analysis (keeps the event loop responsive)
+COMPUTE_POOL = create_compute_pool()
+
 # Load static data
 DATA_DIR = ROOT_DIR / 'data'
 
@@ -35,26 +84,315 @@ def load_json_file(filename: str):
             return json.load(f)
     return None
 
-# Load data on startup
-INFRASTRUCTURE_DATA = None
-POPULATION_DATA = None
-PROTECTED_AREAS_DATA = None
-RECREATIONAL_POINTS = None
-RECOMMENDED_LOCATIONS = None
-FOREST_FIRES = None
-REGION_BOUNDARIES = None
+# Datasets replaced by /import/* endpoints; version = content hash of the file
+DATASET_FILES = {
+    'population': 'ukraine_population_data.json',
+    'infrastructure': 'ukraine_infrastructure.json',
+    'protected_areas': 'ukraine_protected_areas.json',
+    'recreational_points': 'recreational_points_web.geojson',
+    'forest_fires': 'forest_fires.geojson',
+}
+# Datasets kept as columnar point layers (snapshot_store.py), the rest are plain JSON
+POINT_LAYERS = ('recreational_points', 'forest_fires')
+
+MONGO_STORE = MongoFeatureStore(MONGO, POINT_LAYERS) if DATA_STORAGE == 'mongo' else None
+
+# Region analyses depend on every imported dataset
+ANALYSIS_DEPENDENCIES = tuple(DATASET_FILES)
+
+# Region key of point features in every per-region aggregation:
+# 'declared' (default) - properties.region; 'polygons' - the region polygon containing the point.
+# The shipped boundaries are coarse octagons, so the polygons only flag mismatches unless
+# precise boundaries are loaded and REGION_ASSIGNMENT=polygons is set
+REGION_ASSIGNMENT = os.environ.get('REGION_ASSIGNMENT', 'declared')
+USE_POLYGON_REGIONS = REGION_ASSIGNMENT == 'polygons'
+# Features closer than this to the polygon of their properties.region are not reported as
+# mismatched: the octagons cut tens of km off the real boundaries (0 reports every mismatch)
+REGION_MISMATCH_TOLERANCE_KM = float(os.environ.get('REGION_MISMATCH_TOLERANCE_KM', '25'))
+
+# Analysis results are shared by workers and survive restarts with a persistent cache backend:
+# ANALYSIS_CACHE_BACKEND = 'memory' (default, per process) | 'sqlite' (ANALYSIS_CACHE_PATH) | 'mongo'
+ANALYSIS_CACHE_BACKEND = os.environ.get('ANALYSIS_CACHE_BACKEND', 'memory')
+ANALYSIS_CACHE_PATH = Path(os.environ.get('ANALYSIS_CACHE_PATH', str(DATA_DIR / '.cache' / 'analysis_cache.sqlite3')))
+ANALYSIS_CACHE_TTL = float(os.environ.get('ANALYSIS_CACHE_TTL', '86400'))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', '1000'))
+# Part of every persisted cache key: bump when the analysis formulas change
+ANALYSIS_METHODOLOGY = {"version": 4, "regions": REGION_ASSIGNMENT}
+
+def create_analysis_cache_backend():
+    if ANALYSIS_CACHE_BACKEND == 'sqlite':
+        return SQLiteCacheBackend(ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_TTL, ANALYSIS_CACHE_MAX_ENTRIES)
+    if ANALYSIS_CACHE_BACKEND == 'mongo':
+        return MongoCacheBackend(MONGO.db.delegate['analysis_cache'], ANALYSIS_CACHE_TTL, ANALYSIS_CACHE_MAX_ENTRIES)
+    return None
+
+ANALYSIS_CACHE = VersionedCache(create_analysis_cache_backend(), ANALYSIS_METHODOLOGY)
+
+def load_versioned_dataset(name: str):
+    """
+    Load an importable dataset and its version (sha1 of file content)
+    
+    Returns:
+        (data, version), (None, None) if the file does not exist
+    """
+    filepath = DATA_DIR / DATASET_FILES[name]
+    if not filepath.exists():
+        return None, None
+    raw = filepath.read_bytes()
+    return json.loads(raw.decode('utf-8')), hashlib.sha1(raw).hexdigest()
+
+# Compiled columnar snapshots of the point layers live in DATA_DIR/.snapshots (see snapshot_store.py)
+SNAPSHOT_DIRNAME = '.snapshots'
+
+def load_versioned_layer(name: str):
+    """
+    Load a point layer from its columnar snapshot (memory-mapped),
+    compiling the snapshot from the GeoJSON source if it is missing or stale
+    
+    Returns:
+        (layer, version), (None, None) if the file does not exist
+    """
+    filename = DATASET_FILES[name]
+    layer = load_or_compile(DATA_DIR / filename, DATA_DIR / SNAPSHOT_DIRNAME / filename)
+    return layer, (layer.version if layer is not None else None)
+
+# Pre-serialized, pre-compressed bodies of the large GeoJSON endpoints
+PAYLOAD_CACHE = PayloadCache()
+
+async def get_static_payload(name: str, content_factory, version: Optional[str]):
+    """Encoded payload for the dataset version; serialized in COMPUTE_POOL on a miss"""
+    payload = PAYLOAD_CACHE.lookup(name, version)
+    if payload is None:
+        payload = await COMPUTE_POOL.run(PAYLOAD_CACHE.build, name, version, content_factory)
+    return payload
+
+# All loaded data lives in one immutable DatasetSnapshot (dataset_snapshot.py).
+# Reloads build a new snapshot in COMPUTE_POOL and publish it with one reference swap;
+# every request reads the snapshot pinned when it started: data = DATA.current()
+DATA = PublishedSnapshot()
+
+EMPTY_FIRES_GEOJSON = {"features": [], "metadata": {}}
+
+def fire_layer_fields(layer, index: Optional[GridIndex] = None) -> dict:
+    """Snapshot fields of the forest fires layer: layer, grid index, human-caused mask"""
+    return {
+        'forest_fires': layer,
+        'fires_index': index if index is not None else build_layer_index(layer),
+        'fires_human': (
+            layer.equals_mask('cause_type', HUMAN_CAUSE) if layer is not None else np.zeros(0, dtype=bool)
+        ),
+    }
+
+# Snapshot field with the region assignment of each point layer
+REGION_ASSIGNMENT_FIELDS = {'recreational_points': 'point_regions', 'forest_fires': 'fire_regions'}
+
+def region_assignment_fields(snapshot: DatasetSnapshot, datasets, assignments: Optional[Dict[str, RegionAssignment]] = None) -> dict:
+    """
+    Snapshot fields derived from the region polygons: region of every feature of the point
+    layers (properties.region, or the polygon with REGION_ASSIGNMENT=polygons; checked by
+    point-in-polygon when a layer is loaded / imported, mismatches with properties.region
+    are flagged) and the per-region fire table aggregated from the fires' regions
+    
+    Args:
+        datasets: Point layers to assign
+        assignments: Assignments already known (delta imports); computed here for the others
+    """
+    fields = {}
+    for name in datasets:
+        layer = getattr(snapshot, name)
+        assignment = (assignments or {}).get(name)
+        if assignment is None:
+            assignment = RegionAssignment.compute(
+                snapshot.region_polygons, layer, layer_points(layer), USE_POLYGON_REGIONS
+            )
+        mismatched = int(np.count_nonzero(assignment.mismatched(REGION_MISMATCH_TOLERANCE_KM)))
+        if mismatched:
+            logging.warning(
+                f"{name}: {mismatched} features lie more than {REGION_MISMATCH_TOLERANCE_KM:g} km "
+                f"outside the polygon of their properties.region"
+            )
+        fields[REGION_ASSIGNMENT_FIELDS[name]] = assignment
+    
+    if 'forest_fires' in datasets:
+        layer, fire_regions = snapshot.forest_fires, fields['fire_regions']
+        fields['fire_stats'] = {}
+        if layer is not None:
+            area_ha, _, _ = layer.numeric_column('area_ha', parse_numeric_value, failed_value=0.0)
+            fields['fire_stats'] = region_fire_stats(
+                fire_regions.codes, snapshot.region_polygons.names, snapshot.fires_human, area_ha
+            )
+    return fields
+
+def polygon_regions(snapshot: DatasetSnapshot) -> bool:
+    """Aggregations group point features by the region polygons (see REGION_ASSIGNMENT)"""
+    return USE_POLYGON_REGIONS and len(snapshot.region_polygons) > 0
+
+def aggregation_regions(snapshot: DatasetSnapshot, name: str) -> Optional[List[Optional[str]]]:
+    """
+    Region of every feature of a point layer in the per-region aggregations
+    (stored with the feature in MongoDB); None - the features' properties.region
+    """
+    if not polygon_regions(snapshot):
+        return None
+    names = snapshot.region_polygons.names
+    codes = getattr(snapshot, REGION_ASSIGNMENT_FIELDS[name]).codes
+    return [names[code] if code >= 0 else None for code in codes.tolist()]
+
+def layer_points(layer) -> GeoPoints:
+    """Coordinates of a columnar point layer (or of no features for None)"""
+    if layer is None:
+        return GeoPoints(np.zeros(0), np.zeros(0))
+    return GeoPoints(layer.lat, layer.lng)
+
+# Numeric point properties, parsed once per load instead of on every analysis
+POINT_NUMERIC_KEYS = ('capacity', 'visitors_per_day')
+
+def parse_numeric_value(val) -> Optional[float]:
+    """
+    Normalize a numeric property: 20 / "20.0" -> 20.0, ranges "34-36" -> 34.0
+    (first number), missing -> 0.0; returns None if the value can not be parsed
+    """
+    if val is None:
+        return 0.0
+    if isinstance(val, (int, float)):
+        return float(val)
+    try:
+        str_val = str(val).strip()
+        if '-' in str_val and not str_val.startswith('-'):
+            str_val = str_val.split('-')[0]
+        return float(str_val)
+    except (ValueError, TypeError):
+        return None
+
+def point_layer_fields(layer, index: Optional[GridIndex] = None) -> dict:
+    """
+    Snapshot fields of the recreational points layer: layer, grid index and
+    capacity / visitors_per_day parsed into float columns (failures -> 0)
+    """
+    numeric, parse_failures = {}, {}
+    for key in POINT_NUMERIC_KEYS:
+        if layer is None:
+            values, failed, failures = np.zeros(0), np.zeros(0, dtype=bool), []
+        else:
+            values, failed, failures = layer.numeric_column(key, parse_numeric_value, failed_value=0.0)
+        numeric[key] = values
+        # key -> {"features": number of points with unparseable value, "values": distinct raw values}
+        parse_failures[key] = {"features": int(np.count_nonzero(failed)), "values": failures}
+        if failures:
+            logging.warning(f"Recreational points: unparseable {key} values: {failures[:10]}")
+    return {
+        'recreational_points': layer,
+        'recreational_index': index if index is not None else build_layer_index(layer),
+        'point_numeric': numeric,
+        'point_parse_failures': parse_failures,
+    }
+
+def with_region_tables(snapshot: DatasetSnapshot) -> DatasetSnapshot:
+    """Snapshot with per-region lookup tables and the region scoring matrix rebuilt for its datasets"""
+    # Features are grouped by their properties.region unless polygon regions are enabled
+    region_names = snapshot.region_polygons.names if polygon_regions(snapshot) else None
+    snapshot = snapshot.replace(region_tables=RegionTables(
+        snapshot.population,
+        snapshot.infrastructure,
+        snapshot.protected_areas,
+        snapshot.recreational_points,
+        snapshot.forest_fires,
+        snapshot.point_numeric.get('capacity'),
+        region_names,
+        snapshot.point_regions.codes,
+        snapshot.fire_regions.codes
+    ))
+    return snapshot.replace(region_scores=score_indicators(region_indicators(snapshot)))
+
+def region_indicators(snapshot: DatasetSnapshot) -> RegionIndicators:
+    """Indicator matrix of all regions with population records (point counts, capacity and fires from the region tables)"""
+    tables = snapshot.region_tables
+    return RegionIndicators.from_records(
+        (
+            region_name,
+            population_region,
+            tables.protected_areas.get(region_name),
+            tables.infrastructure.get(region_name),
+            len(tables.point_indices(region_name)),
+            tables.total_capacity(region_name),
+            snapshot.fire_stats.get(region_name, {}).get('human_caused', 0)
+        )
+        for region_name, population_region in tables.population.items() if population_region
+    )
+
+def build_dataset_snapshot(previous: DatasetSnapshot, datasets, load_static: bool = False,
+                           sources: Optional[Dict[str, tuple]] = None) -> DatasetSnapshot:
+    """
+    Load datasets from files into a new snapshot (CPU/IO-bound, runs in COMPUTE_POOL)
+    Other datasets and their derived structures are shared with the previous snapshot
+    
+    Args:
+        previous: Currently published snapshot
+        datasets: Names from DATASET_FILES to reload
+        load_static: Also load recommended locations and region boundaries
+        sources: (data, version) per dataset read from MongoDB instead of the files;
+                 point layers as GeoJSON FeatureCollection
+    """
+    changes = {}
+    versions = dict(previous.versions)
+    region_versions = dict(previous.region_versions)
+    for name in datasets:
+        if sources is not None:
+            data, version = sources[name]
+            if name in POINT_LAYERS and data is not None:
+                data = ColumnarLayer.from_geojson(data, version)
+        elif name in POINT_LAYERS:
+            data, version = load_versioned_layer(name)
+        else:
+            data, version = load_versioned_dataset(name)
+        changes[name] = data
+        if versions.get(name) != version:
+            versions[name] = version
+            region_versions.pop(name, None)
+    
+    if 'recreational_points' in datasets:
+        changes.update(point_layer_fields(changes['recreational_points']))
+    if 'forest_fires' in datasets:
+        changes.update(fire_layer_fields(changes['forest_fires']))
+    if load_static:
+        changes['recommended_locations'] = load_json_file('recommended_locations.json')
+        changes['region_boundaries'] = load_json_file('ukraine_regions_boundaries.geojson')
+        changes['region_tile_source'] = PolygonTileSource('regions', changes['region_boundaries'], ('name', 'name_en'))
+        changes['region_polygons'] = RegionPolygons(changes['region_boundaries'])
+    
+    snapshot = previous.replace(versions=versions, region_versions=region_versions, **changes)
+    assigned = [name for name in POINT_LAYERS if name in datasets or load_static]
+    if assigned:
+        snapshot = snapshot.replace(**region_assignment_fields(snapshot, assigned))
+    return with_region_tables(snapshot)
+
+# Vector tiles: region polygons are projected once per load, tiles cached per dataset version
+TILE_CACHE = TileCache()
+
+def publish_snapshot(snapshot: DatasetSnapshot):
+    """
+    Publish a snapshot; requests already running finish on the previous one
+    Cached analyses of datasets replaced by a full load are dropped
+    (delta imports keep region-scoped versions, see DatasetSnapshot.region_versions)
+    """
+    previous = DATA.publish(snapshot)
+    for name in DATASET_FILES:
+        if previous.versions.get(name) != snapshot.versions.get(name) and name not in snapshot.region_versions:
+            ANALYSIS_CACHE.invalidate(name)
+    if previous.region_tile_source is not snapshot.region_tile_source:
+        TILE_CACHE.clear()
+
+# Reloads and imports are serialized: each one builds on the latest published snapshot
+DATASET_UPDATE_LOCK = asyncio.Lock()
 
 @app.on_event("startup")
 async def load_data():
-    global INFRASTRUCTURE_DATA, POPULATION_DATA, PROTECTED_AREAS_DATA, RECREATIONAL_POINTS, RECOMMENDED_LOCATIONS, FOREST_FIRES, REGION_BOUNDARIES
-    INFRASTRUCTURE_DATA = load_json_file('ukraine_infrastructure.json')
-    POPULATION_DATA = load_json_file('ukraine_population_data.json')
-    PROTECTED_AREAS_DATA = load_json_file('ukraine_protected_areas.json')
-    RECREATIONAL_POINTS = load_json_file('recreational_points_web.geojson')
-    RECOMMENDED_LOCATIONS = load_json_file('recommended_locations.json')
-    FOREST_FIRES = load_json_file('forest_fires.geojson')
-    REGION_BOUNDARIES = load_json_file('ukraine_regions_boundaries.geojson')
+    snapshot = await COMPUTE_POOL.run(build_dataset_snapshot, DATA.latest(), tuple(DATASET_FILES), True)
+    PAYLOAD_CACHE.clear()
+    publish_snapshot(snapshot)
     logging.info("Data loaded successfully")
+    if MONGO_STORE is not None:
+        await start_mongo_storage()
 
 # Helper functions for zone generation
 def generate_consistent_hash(text: str) -> int:
@@ -104,81 +442,34 @@ def count_competitors_nearby(coordinates: list, radius_km: float = 5.0):
     Returns:
         Number of competitors within radius
     """
-    if not RECREATIONAL_POINTS or 'features' not in RECREATIONAL_POINTS:
+    data = DATA.current()
+    if data.recreational_points is None:
         return 0
     
     lat, lng = coordinates
-    count = 0
-    
-    for feature in RECREATIONAL_POINTS['features']:
-        if 'geometry' not in feature or 'coordinates' not in feature['geometry']:
-            continue
-        
-        point_lng, point_lat = feature['geometry']['coordinates']
-        
-        # Calculate distance using Haversine formula (simplified)
-        dlat = math.radians(point_lat - lat)
-        dlng = math.radians(point_lng - lng)
-        a = math.sin(dlat/2)**2 + math.cos(math.radians(lat)) * math.cos(math.radians(point_lat)) * math.sin(dlng/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        distance = 6371 * c  # Earth radius in km
-        
-        if distance <= radius_km:
-            count += 1
-    
-    return count
+    return data.recreational_index.count_radius(lat, lng, radius_km)
 
-def count_human_fires_nearby(coordinates: list, radius_km: float = 20.0):
+def region_fire_data(region_name: str):
     """
-    Count human-caused fires near given coordinates
+    Human-caused fires of a region - lookup in the per-region fire table
+    (fires grouped by region, see region_assignment_fields)
     КРИТИЧНА ЛОГІКА: Багато людських пожеж = потреба в рекреаційних пунктах
     
-    Args:
-        coordinates: [lat, lng]
-        radius_km: Search radius in km (default 20km)
-    
     Returns:
-        dict with total fires, human fires, and fire score
+        dict with total fires, human fires, burned area and fire score
     """
-    if not FOREST_FIRES or 'features' not in FOREST_FIRES:
-        return {"total": 0, "human": 0, "score": 0}
+    stats = DATA.current().fire_stats.get(region_name)
+    if stats is None:
+        return {"total": 0, "human": 0, "area_ha": 0.0, "score": 0}
     
-    lat, lng = coordinates
-    total_fires = 0
-    human_fires = 0
-    
-    for feature in FOREST_FIRES['features']:
-        if 'geometry' not in feature or 'coordinates' not in feature['geometry']:
-            continue
-        
-        fire_lng, fire_lat = feature['geometry']['coordinates']
-        
-        # Calculate distance using Haversine formula
-        dlat = math.radians(fire_lat - lat)
-        dlng = math.radians(fire_lng - lng)
-        a = math.sin(dlat/2)**2 + math.cos(math.radians(lat)) * math.cos(math.radians(fire_lat)) * math.sin(dlng/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        distance = 6371 * c  # Earth radius in km
-        
-        if distance <= radius_km:
-            total_fires += 1
-            if feature['properties'].get('cause_type') == "людський фактор":
-                human_fires += 1
-    
-    # Calculate fire score (0-5 points) - відповідно до методології Landing Page
-    # Logic: More human fires = higher need for recreational facilities
-    if human_fires >= 15:
-        fire_score = 5  # Критична потреба
-    elif human_fires >= 10:
-        fire_score = 3  # Висока потреба
-    elif human_fires >= 5:
-        fire_score = 1  # Помірна потреба
-    else:
-        fire_score = 0  # Немає потреби
+    human_fires = stats['human_caused']
+    # Logic: More human fires = higher need for recreational facilities (0-5 points)
+    fire_score = int(FIRE_PREVENTION_SCORE(human_fires))
     
     return {
-        "total": total_fires,
+        "total": stats['total_fires'],
         "human": human_fires,
+        "area_ha": stats['area_ha'],
         "score": round(fire_score, 1)
     }
 
@@ -243,66 +534,31 @@ def find_fire_clusters(region_name: str, min_cluster_size: int = 3, radius_km: f
         radius_km: Радіус пошуку (км)
     
     Returns:
-        List of clusters with center coordinates and fire count
+        List of clusters with center coordinates, fire count and
+        fire_indices (positions of fires in the forest fires layer)
     """
-    if not FOREST_FIRES or 'features' not in FOREST_FIRES:
+    data = DATA.current()
+    if data.forest_fires is None:
         return []
     
     # Фільтруємо людські пожежі регіону
-    human_fires = [
-        f for f in FOREST_FIRES['features']
-        if f['properties']['region'] == region_name and 
-           f['properties']['cause_type'] == "людський фактор"
-    ]
+    fire_points = data.fires_index.points
+    fire_indices = data.region_tables.fire_indices(region_name)
+    fire_indices = fire_indices[data.fires_human[fire_indices] & fire_points.valid[fire_indices]]
     
-    if len(human_fires) < min_cluster_size:
+    if len(fire_indices) < min_cluster_size:
         return []
     
-    clusters = []
-    processed = set()
+    points = GeoPoints(fire_points.lat_deg[fire_indices], fire_points.lng_deg[fire_indices])
     
-    for i, fire in enumerate(human_fires):
-        if i in processed:
-            continue
-        
-        fire_lat, fire_lng = fire['geometry']['coordinates'][1], fire['geometry']['coordinates'][0]
-        cluster_fires = [fire]
-        cluster_indices = [i]
-        
-        # Знайти всі пожежі в радіусі
-        for j, other_fire in enumerate(human_fires):
-            if j == i or j in processed:
-                continue
-            
-            other_lat, other_lng = other_fire['geometry']['coordinates'][1], other_fire['geometry']['coordinates'][0]
-            
-            # Розрахувати відстань
-            dlat = math.radians(other_lat - fire_lat)
-            dlng = math.radians(other_lng - fire_lng)
-            a = math.sin(dlat/2)**2 + math.cos(math.radians(fire_lat)) * math.cos(math.radians(other_lat)) * math.sin(dlng/2)**2
-            c = 2 * math.asin(math.sqrt(a))
-            distance = 6371 * c
-            
-            if distance <= radius_km:
-                cluster_fires.append(other_fire)
-                cluster_indices.append(j)
-        
-        # Якщо кластер достатньо великий
-        if len(cluster_fires) >= min_cluster_size:
-            # Розрахувати центр кластера
-            avg_lat = sum(f['geometry']['coordinates'][1] for f in cluster_fires) / len(cluster_fires)
-            avg_lng = sum(f['geometry']['coordinates'][0] for f in cluster_fires) / len(cluster_fires)
-            
-            clusters.append({
-                'center': [avg_lat, avg_lng],
-                'fire_count': len(cluster_fires),
-                'fires': cluster_fires
-            })
-            
-            # Позначити як оброблені
-            processed.update(cluster_indices)
-    
-    return clusters
+    return [
+        {
+            'center': cluster['center'],
+            'fire_count': len(cluster['members']),
+            'fire_indices': fire_indices[cluster['members']].tolist()
+        }
+        for cluster in cluster_points(points, radius_km=radius_km, min_cluster_size=min_cluster_size)
+    ]
 
 def calculate_comprehensive_priority(
     zone_type: str,
@@ -405,6 +661,51 @@ def calculate_comprehensive_priority(
     
     return min(90, max(0, int(total_priority)))
 
+def compute_region_analysis(region_name: str):
+    """
+    Full analysis for one region (memoized per region-scoped dataset versions)
+    Caller is responsible for data validation; returns None for unknown region
+    """
+    data = DATA.current()
+    if data.region_scores.index(region_name) is None:
+        return None
+    
+    versions = data.region_dataset_versions(region_name, ANALYSIS_DEPENDENCIES)
+    cached = ANALYSIS_CACHE.get(('analyze', region_name), versions)
+    if cached is not None:
+        return cached
+    
+    # View over the region's row of the scoring matrix (computed once per snapshot)
+    analysis = calculate_full_potential(region_name, data.region_scores, region_fire_data(region_name))
+    
+    return ANALYSIS_CACHE.put(('analyze', region_name), versions, analysis)
+
+def analyze_regions_batch():
+    """
+    Analyses of all regions in one pass (order of population data)
+    Shared by /analyze-all and /recommended-zones; memoized per dataset versions
+    
+    Returns:
+        List of (region_name, analysis) pairs
+    """
+    data = DATA.current()
+    versions = data.dataset_versions(ANALYSIS_DEPENDENCIES)
+    cached = ANALYSIS_CACHE.get(('analyze-all',), versions)
+    if cached is not None:
+        return cached
+    
+    analyses = []
+    for region in data.population.get('ukraine_regions_data', []):
+        try:
+            analysis = compute_region_analysis(region['name'])
+        except Exception as e:
+            logging.error(f"Error analyzing {region['name']}: {e}")
+            continue
+        if analysis is not None:
+            analyses.append((region['name'], analysis))
+    
+    return ANALYSIS_CACHE.put(('analyze-all',), versions, analyses)
+
 # Models
 class RegionAnalysis(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -428,109 +729,277 @@ async def root():
 @api_router.get("/regions")
 async def get_regions():
     """Get list of all regions"""
-    if POPULATION_DATA:
-        regions = [r['name'] for r in POPULATION_DATA.get('ukraine_regions_data', [])]
+    population = DATA.current().population
+    if population:
+        regions = [r['name'] for r in population.get('ukraine_regions_data', [])]
         return {"regions": regions}
     return {"regions": []}
 
 @api_router.get("/population")
 async def get_population_data():
     """Get population data for all regions"""
-    return POPULATION_DATA or {}
+    return DATA.current().population or {}
 
 @api_router.get("/infrastructure")
 async def get_infrastructure_data():
     """Get infrastructure data for all regions"""
-    return INFRASTRUCTURE_DATA or {}
+    return DATA.current().infrastructure or {}
 
 @api_router.get("/protected-areas")
 async def get_protected_areas():
     """Get protected areas data"""
-    return PROTECTED_AREAS_DATA or {}
+    return DATA.current().protected_areas or {}
 
 @api_router.get("/recreational-points")
-async def get_recreational_points():
-    """Get recreational points GeoJSON"""
-    return RECREATIONAL_POINTS or {}
+async def get_recreational_points(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="minLng,minLat,maxLng,maxLat"),
+    region: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    zoom: Optional[int] = Query(None, ge=0, le=22)
+):
+    """
+    Get recreational points GeoJSON (gzip/br encoded, ETag for conditional GET)
+    With bbox/region/limit returns only matching points; at zoom <= 7 points
+    are aggregated into server-side clusters
+    """
+    if bbox is None and region is None and limit is None and (zoom is None or zoom > CLUSTER_MAX_ZOOM):
+        data = DATA.current()
+        payload = await get_static_payload(
+            'recreational_points',
+            lambda: layer_geojson(data.recreational_points, {}),
+            data.versions.get('recreational_points')
+        )
+        return payload_response(request, payload)
+    
+    try:
+        bbox_values = parse_bbox(bbox) if bbox is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return await COMPUTE_POOL.run(
+        query_point_layer, 'recreational_points', bbox_values, region, None, limit, zoom
+    )
 
 @api_router.get("/recommended-locations/{region_name}")
 async def get_recommended_locations_for_region(region_name: str):
     """Get detailed recommended locations for a specific region"""
-    if not RECOMMENDED_LOCATIONS:
+    recommended_locations = DATA.current().recommended_locations
+    if not recommended_locations:
         return {"locations": []}
     
-    locations = RECOMMENDED_LOCATIONS.get('recommended_locations', {}).get(region_name, [])
+    locations = recommended_locations.get('recommended_locations', {}).get(region_name, [])
     return {"locations": locations, "region": region_name}
 
 @api_router.get("/pfz-objects")
 async def get_pfz_objects():
     """Get all PFZ objects with coordinates"""
-    if not RECOMMENDED_LOCATIONS:
+    recommended_locations = DATA.current().recommended_locations
+    if not recommended_locations:
         return {"objects": []}
     
-    return {"objects": RECOMMENDED_LOCATIONS.get('pfz_objects', [])}
+    return {"objects": recommended_locations.get('pfz_objects', [])}
 
 @api_router.get("/forest-fires")
-async def get_forest_fires():
-    """Get all forest fire incidents with details"""
-    if not FOREST_FIRES:
-        return {"features": [], "metadata": {}}
+async def get_forest_fires(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="minLng,minLat,maxLng,maxLat"),
+    region: Optional[str] = None,
+    cause_type: Optional[str] = Query(None, description="human / natural or cause_type value"),
+    date_from: Optional[str] = Query(None, description="YYYY-MM-DD or DD.MM.YYYY"),
+    date_to: Optional[str] = Query(None, description="YYYY-MM-DD or DD.MM.YYYY"),
+    limit: Optional[int] = Query(None, ge=1),
+    zoom: Optional[int] = Query(None, ge=0, le=22)
+):
+    """
+    Get forest fire incidents (gzip/br encoded, ETag for conditional GET)
+    With bbox/region/cause_type/date range/limit returns only matching fires;
+    at zoom <= 7 fires are aggregated into server-side clusters
+    """
+    filters = [bbox, region, cause_type, date_from, date_to, limit]
+    if all(v is None for v in filters) and (zoom is None or zoom > CLUSTER_MAX_ZOOM):
+        data = DATA.current()
+        payload = await get_static_payload(
+            'forest_fires',
+            lambda: layer_geojson(data.forest_fires, EMPTY_FIRES_GEOJSON),
+            data.versions.get('forest_fires')
+        )
+        return payload_response(request, payload)
+    
+    try:
+        bbox_values = parse_bbox(bbox) if bbox is not None else None
+        predicate = fire_predicate(
+            normalize_cause_type(cause_type) if cause_type is not None else None,
+            parse_date(date_from) if date_from is not None else None,
+            parse_date(date_to) if date_to is not None else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return FOREST_FIRES
+    return await COMPUTE_POOL.run(
+        query_point_layer, 'forest_fires', bbox_values, region, predicate, limit, zoom
+    )
+
+# Tile layer -> dataset whose version keys the tile cache
+TILE_LAYERS = {
+    'fires': 'forest_fires',
+    'recreational-points': 'recreational_points',
+    'regions': None,
+}
+FIRE_TILE_PROPERTIES = ('name', 'region', 'area_ha', 'date', 'cause_type', 'cause')
+POINT_TILE_PROPERTIES = ('name', 'region', 'status', 'capacity', 'visitors_per_day')
+
+@api_router.get("/tiles/{layer}/{z}/{x}/{y}.pbf")
+async def get_vector_tile(request: Request, layer: str, z: int, x: int, y: int):
+    """
+    Mapbox Vector Tile for a layer: fires, recreational-points or regions
+    Tiles are cut from the in-memory datasets and cached per dataset version
+    """
+    if layer not in TILE_LAYERS:
+        raise HTTPException(status_code=404, detail=f"Unknown tile layer: {layer}")
+    if not tile_is_valid(z, x, y):
+        raise HTTPException(status_code=400, detail=f"Invalid tile coordinates: {z}/{x}/{y}")
+    
+    dataset = TILE_LAYERS[layer]
+    version = DATA.current().versions.get(dataset) if dataset else 'static'
+    key = (layer, z, x, y, version)
+    
+    tile = TILE_CACHE.get(key)
+    if tile is None:
+        tile = TILE_CACHE.put(key, await COMPUTE_POOL.run(build_vector_tile, layer, z, x, y))
+    
+    etag = f'"{layer}-{version}-{z}-{x}-{y}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile", headers=headers)
+
+def layer_geojson(layer, empty: Optional[dict] = None):
+    """Full GeoJSON of a point layer, rebuilt from its columns for serialization"""
+    return layer.to_geojson() if layer is not None else empty
+
+def build_vector_tile(layer: str, z: int, x: int, y: int) -> bytes:
+    """Encode one vector tile (CPU-bound, runs in COMPUTE_POOL)"""
+    data = DATA.current()
+    if layer == 'fires':
+        encoded = point_layer('fires', data.forest_fires, data.fires_index, z, x, y, FIRE_TILE_PROPERTIES)
+    elif layer == 'recreational-points':
+        encoded = point_layer(
+            'recreational-points', data.recreational_points, data.recreational_index, z, x, y, POINT_TILE_PROPERTIES
+        )
+    else:
+        encoded = data.region_tile_source.layer(z, x, y)
+    return encode_tile([encoded])
+
+def query_point_layer(layer: str, bbox, region: Optional[str], predicate, limit: Optional[int], zoom: Optional[int]):
+    """
+    Filtered / clustered view of a point layer (CPU-bound, runs in COMPUTE_POOL)
+    
+    Args:
+        layer: 'forest_fires' or 'recreational_points'
+        bbox: (minLng, minLat, maxLng, maxLat) or None
+        region: Region name (features assigned to the region, see region_assignment_fields) or None
+        predicate: Properties filter or None
+        limit: Max features returned (ignored in clustered mode)
+        zoom: Map zoom; clustered output at zoom <= CLUSTER_MAX_ZOOM
+    """
+    data = DATA.current()
+    if layer == 'forest_fires':
+        source, index = data.forest_fires, data.fires_index
+        region_indices = data.region_tables.fire_indices(region) if region is not None else None
+        count_property = ("human_caused", "cause_type", HUMAN_CAUSE)
+    else:
+        source, index = data.recreational_points, data.recreational_index
+        region_indices = data.region_tables.point_indices(region) if region is not None else None
+        count_property = None
+    
+    indices = select_features(source, index, region_indices, bbox, predicate)
+    
+    if zoom is not None and zoom <= CLUSTER_MAX_ZOOM:
+        return aggregate_clusters(source, index, indices, zoom, count_property)
+    return feature_collection(source, indices, limit)
 
 @api_router.get("/region-boundaries")
-async def get_region_boundaries():
-    """Get Ukraine region boundaries as GeoJSON"""
-    if not REGION_BOUNDARIES:
-        return {"type": "FeatureCollection", "features": []}
+async def get_region_boundaries(request: Request):
+    """Get Ukraine region boundaries as GeoJSON (gzip/br encoded, ETag for conditional GET)"""
+    payload = await get_static_payload(
+        'region_boundaries',
+        lambda: DATA.current().region_boundaries or {"type": "FeatureCollection", "features": []},
+        'static'
+    )
+    return payload_response(request, payload)
+
+@api_router.get("/fire-stats")
+async def get_fire_stats():
+    """Per-region fire table used by the analysis: counts by cause and burned area of the fires inside each region polygon"""
+    data = DATA.current()
+    if data.forest_fires is None:
+        raise HTTPException(status_code=500, detail="Data not loaded")
+    return {
+        "version": data.versions.get('forest_fires'),
+        "regions": [{"region": region, **stats} for region, stats in data.fire_stats.items()]
+    }
+
+@api_router.get("/region-assignment/{dataset}")
+async def get_region_assignment(
+    dataset: str,
+    limit: int = Query(100, ge=1, le=10000),
+    tolerance_km: float = Query(REGION_MISMATCH_TOLERANCE_KM, ge=0),
+):
+    """
+    Region check of a point layer against the region polygons: counts and the features
+    whose properties.region disagrees with the polygon they lie in (or that lie outside all polygons);
+    assigned_region is the region the feature is aggregated in (see REGION_ASSIGNMENT).
+
+    The shipped boundaries are coarse octagons (8-9 vertices per region), so most features
+    near a real boundary fall into the neighbouring polygon: such a mismatch is not a data error.
+    Only features farther than tolerance_km from the polygon of their declared region are flagged
+    (declared_boundary_km); near_boundary counts the ones within the tolerance.
+    """
+    if dataset not in REGION_ASSIGNMENT_FIELDS:
+        raise HTTPException(status_code=404, detail=f"Unknown point layer: {dataset}")
+    data = DATA.current()
+    layer = getattr(data, dataset)
+    if layer is None:
+        raise HTTPException(status_code=500, detail="Data not loaded")
     
-    return REGION_BOUNDARIES
+    assignment = getattr(data, REGION_ASSIGNMENT_FIELDS[dataset])
+    names = data.region_polygons.names
+    flagged = np.flatnonzero(assignment.flagged(tolerance_km))
+    ids = layer.stable_ids()
+    return {
+        **assignment.summary(tolerance_km),
+        "flagged": [
+            {
+                "id": ids[idx],
+                "name": layer.property_value('name', idx),
+                "declared_region": layer.property_value('region', idx),
+                "assigned_region": names[code] if code >= 0 else None,
+                "polygon_region": names[spatial] if spatial >= 0 else None,
+                "outside_boundaries": bool(assignment.outside[idx]),
+                "declared_boundary_km": round(distance, 1) if np.isfinite(distance) else None,
+            }
+            for idx, code, spatial, distance in zip(
+                flagged[:limit].tolist(), assignment.codes[flagged[:limit]].tolist(),
+                assignment.spatial[flagged[:limit]].tolist(), assignment.boundary_km[flagged[:limit]].tolist()
+            )
+        ]
+    }
+
+def analysis_data_loaded(data: DatasetSnapshot) -> bool:
+    """Datasets required by the region analysis are loaded"""
+    return all([data.population, data.infrastructure, data.protected_areas]) and data.recreational_points is not None
 
 @api_router.get("/analyze/{region_name}")
 async def analyze_region(region_name: str):
     """Perform full analysis for a specific region"""
-    if not all([POPULATION_DATA, INFRASTRUCTURE_DATA, PROTECTED_AREAS_DATA, RECREATIONAL_POINTS]):
+    if not analysis_data_loaded(DATA.current()):
         raise HTTPException(status_code=500, detail="Data not loaded")
     
-    # Find region data
-    population_region = None
-    for r in POPULATION_DATA.get('ukraine_regions_data', []):
-        if r['name'] == region_name:
-            population_region = r
-            break
-    
-    if not population_region:
+    analysis = await COMPUTE_POOL.run(compute_region_analysis, region_name)
+    if analysis is None:
         raise HTTPException(status_code=404, detail=f"Region {region_name} not found")
     
-    # Find infrastructure data
-    infra_region = None
-    for r in INFRASTRUCTURE_DATA.get('ukraine_infrastructure', {}).get('regions', []):
-        if r['region'] == region_name:
-            infra_region = r
-            break
-    
-    # Find PFZ data
-    pfz_region = None
-    for r in PROTECTED_AREAS_DATA.get('ukraine_protected_areas', {}).get('regions', []):
-        if r['region'] == region_name:
-            pfz_region = r
-            break
-    
-    # Get recreational points for region
-    region_points = []
-    for feature in RECREATIONAL_POINTS.get('features', []):
-        if feature.get('properties', {}).get('region') == region_name:
-            region_points.append(feature)
-    
-    # Calculate potential
-    analysis = calculate_full_potential(
-        region_name,
-        population_region,
-        pfz_region,
-        infra_region,
-        region_points
-    )
-    
     return analysis
 
 @api_router.get("/methodology")
@@ -584,19 +1053,80 @@ async def get_methodology():
         ]
     }
 
+@api_router.post("/methodology/ahp-batch")
+async def evaluate_ahp_batch(request: AHPBatchRequest):
+    """
+    AHP weights, λmax, CI and CR for many pairwise matrices at once (e.g. an expert panel),
+    by the geometric-mean or principal-eigenvector method
+    """
+    from ahp_calculator import evaluate_matrices
+    
+    try:
+        result = await COMPUTE_POOL.run(evaluate_matrices, request.matrices, request.method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "method": request.method,
+        "count": len(result["weights"]),
+        "weights": np.round(result["weights"], 6).tolist(),
+        "lambda_max": np.round(result["lambda_max"], 6).tolist(),
+        "ci": np.round(result["ci"], 6).tolist(),
+        "cr": np.round(result["cr"], 6).tolist(),
+        "is_consistent": result["is_consistent"].tolist(),
+        "consistent_share": float(np.mean(result["is_consistent"]))
+    }
+
+@api_router.get("/sensitivity")
+async def get_weight_sensitivity(
+    mode: str = Query("judgments", description="judgments - perturb AHP pairwise judgments, weights - Dirichlet weights"),
+    samples: int = Query(2000, ge=100, le=20000, description="Number of Monte Carlo samples"),
+    spread: float = Query(1.5, gt=1, le=9, description="Judgments are multiplied by a log-uniform factor in [1/spread, spread]"),
+    concentration: float = Query(200.0, gt=0, le=100000, description="Dirichlet concentration (mode=weights)"),
+    top_k: int = Query(5, ge=1, le=50, description="Size of the top group for p_top_k"),
+    confidence: float = Query(0.9, gt=0, lt=1, description="Level of the score / rank intervals"),
+    seed: Optional[int] = Query(None, description="Random seed for reproducible results")
+):
+    """
+    Monte Carlo sensitivity of the 7-factor region ranking to the AHP weights
+    Every sample rescales the factor maxima by perturbed weights and rescores all regions
+    from their factor levels (scoring matrix of the snapshot); returns score / rank intervals and the probability
+    of every region to stay in the top-k
+    """
+    from ahp_calculator import ahp_calculator
+    from sensitivity import run_sensitivity
+
+    if not analysis_data_loaded(DATA.current()):
+        raise HTTPException(status_code=500, detail="Data not loaded")
+
+    started_at = datetime.now(timezone.utc)
+    scores = DATA.current().region_scores
+    try:
+        result = await COMPUTE_POOL.run(
+            run_sensitivity, scores.names, scores.factors, scores.total, ahp_calculator.pairwise_matrix,
+            mode, samples, spread, concentration, top_k, confidence, seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "mode": mode,
+        "samples": samples,
+        "top_k": min(top_k, len(scores)),
+        "confidence": confidence,
+        "seed": seed,
+        **result,
+        "elapsed_ms": round((datetime.now(timezone.utc) - started_at).total_seconds() * 1000, 1)
+    }
+
 @api_router.get("/analyze-all")
 async def analyze_all_regions():
     """Analyze all regions and return comparison table"""
-    if not all([POPULATION_DATA, INFRASTRUCTURE_DATA, PROTECTED_AREAS_DATA, RECREATIONAL_POINTS]):
+    if not analysis_data_loaded(DATA.current()):
         raise HTTPException(status_code=500, detail="Data not loaded")
     
-    results = []
-    for region in POPULATION_DATA.get('ukraine_regions_data', []):
-        try:
-            analysis = await analyze_region(region['name'])
-            results.append(analysis)
-        except Exception as e:
-            logging.error(f"Error analyzing {region['name']}: {e}")
+    analyses = await COMPUTE_POOL.run(analyze_regions_batch)
+    results = [analysis for _, analysis in analyses]
     
     # Sort by total score
     results.sort(key=lambda x: x.get('total_score', 0), reverse=True)
@@ -616,321 +1146,347 @@ async def get_recommended_zones():
     - roadside: Along major roads (transit flow)
     - fire_prevention: Fire clusters (human-caused fire prevention)
     """
-    if not all([POPULATION_DATA, INFRASTRUCTURE_DATA, PROTECTED_AREAS_DATA, RECREATIONAL_POINTS]):
+    if not analysis_data_loaded(DATA.current()):
         raise HTTPException(status_code=500, detail="Data not loaded")
     
+    return await COMPUTE_POOL.run(build_recommended_zones)
+
+def build_recommended_zones():
+    """
+    Generate recommended zones for all regions (CPU-bound, runs in COMPUTE_POOL)
+    Memoized per dataset versions like the region analyses
+    
+    Returns:
+        {"zones": [...]} sorted by priority descending
+    """
+    data = DATA.current()
+    versions = data.dataset_versions(ANALYSIS_DEPENDENCIES)
+    cached = ANALYSIS_CACHE.get(('recommended-zones',), versions)
+    if cached is not None:
+        return cached
+    
+    # Generate recommended zones from the shared analysis of all regions
+    # (analysis contains all 7 factor scores)
     recommended_zones = []
+    for region_name, analysis in analyze_regions_batch():
+        recommended_zones.extend(region_recommended_zones(region_name, analysis))
     
-    # Region centers for coordinate generation
-    REGION_CENTERS = {
-        'Київська область': [50.45, 30.52],
-        'Львівська область': [49.84, 24.03],
-        'Закарпатська область': [48.62, 22.29],
-        'Одеська область': [46.48, 30.73],
-        'Харківська область': [49.99, 36.23],
-        'Дніпропетровська область': [48.46, 35.04],
-        'Житомирська область': [50.25, 28.66],
-        'Волинська область': [50.75, 25.32],
-        'Івано-Франківська область': [48.92, 24.71],
-        'Вінницька область': [49.23, 28.47],
-        'Чернігівська область': [51.50, 31.29],
-        'Рівненська область': [50.62, 26.23],
-        'Чернівецька область': [48.29, 25.93],
-        'Полтавська область': [49.59, 34.55],
-        'Черкаська область': [49.44, 32.06],
-        'Сумська область': [50.91, 34.80],
-        'Хмельницька область': [49.42, 26.98],
-        'Тернопільська область': [49.55, 25.59],
-        'Миколаївська область': [46.97, 32.00],
-        'Херсонська область': [46.64, 32.62],
-        'Кіровоградська область': [48.51, 32.26],
-        'Запорізька область': [47.84, 35.14],
-        'Донецька область': [48.02, 37.80],
-        'Луганська область': [48.57, 39.31],
-    }
+    # Sort by priority descending
+    recommended_zones.sort(key=lambda x: x.get('priority', 0), reverse=True)
     
-    # Analyze each region and generate recommended zones
-    for region in POPULATION_DATA.get('ukraine_regions_data', []):
-        region_name = region['name']
-        
-        # Get PFZ data for notable objects
-        pfz_region = None
-        for r in PROTECTED_AREAS_DATA.get('ukraine_protected_areas', {}).get('regions', []):
-            if r['region'] == region_name:
-                pfz_region = r
-                break
-        
-        # Get infrastructure data for region
-        infra_region = None
-        for r in INFRASTRUCTURE_DATA.get('ukraine_infrastructure', {}).get('regions', []):
-            if r['region'] == region_name:
-                infra_region = r
-                break
-        
-        # Calculate analysis for the region (contains all 7 factor scores)
-        try:
-            analysis = await analyze_region(region_name)
-        except Exception:
-            continue
-        
-        # Only recommend if total_score >= 55 (high potential)
-        if analysis.get('total_score', 0) < 55:
-            continue
-        
-        base_coords = REGION_CENTERS.get(region_name, [48.5, 31.0])
-        gap = analysis.get('details', {}).get('population', {}).get('gap', 0)
+    return ANALYSIS_CACHE.put(('recommended-zones',), versions, {"zones": recommended_zones})
+
+# Recreational points within this radius of a recommended zone are its competitors
+ZONE_COMPETITOR_RADIUS_KM = 5.0
+
+# Region centers for coordinate generation of the recommended zones
+REGION_CENTERS = {
+    'Київська область': [50.45, 30.52],
+    'Львівська область': [49.84, 24.03],
+    'Закарпатська область': [48.62, 22.29],
+    'Одеська область': [46.48, 30.73],
+    'Харківська область': [49.99, 36.23],
+    'Дніпропетровська область': [48.46, 35.04],
+    'Житомирська область': [50.25, 28.66],
+    'Волинська область': [50.75, 25.32],
+    'Івано-Франківська область': [48.92, 24.71],
+    'Вінницька область': [49.23, 28.47],
+    'Чернігівська область': [51.50, 31.29],
+    'Рівненська область': [50.62, 26.23],
+    'Чернівецька область': [48.29, 25.93],
+    'Полтавська область': [49.59, 34.55],
+    'Черкаська область': [49.44, 32.06],
+    'Сумська область': [50.91, 34.80],
+    'Хмельницька область': [49.42, 26.98],
+    'Тернопільська область': [49.55, 25.59],
+    'Миколаївська область': [46.97, 32.00],
+    'Херсонська область': [46.64, 32.62],
+    'Кіровоградська область': [48.51, 32.26],
+    'Запорізька область': [47.84, 35.14],
+    'Донецька область': [48.02, 37.80],
+    'Луганська область': [48.57, 39.31],
+}
+
+def region_recommended_zones(region_name: str, analysis: dict, count_competitors=count_competitors_nearby) -> List[dict]:
+    """
+    Recommended zones of one region: near PFZ objects, along main roads and at human-caused fire clusters
+    
+    Args:
+        analysis: Region analysis (calculate_full_potential)
+        count_competitors: Counter of recreational points near [lat, lng] (what-if scenarios
+                           count hypothetical points too)
+    """
+    recommended_zones = []
+    region_tables = DATA.current().region_tables
+    
+    # Get PFZ and infrastructure data for region
+    pfz_region = region_tables.protected_areas.get(region_name)
+    infra_region = region_tables.infrastructure.get(region_name)
+    
+    # Only recommend if total_score >= 55 (high potential)
+    if analysis.get('total_score', 0) < 55:
+        return []
+    
+    base_coords = REGION_CENTERS.get(region_name, [48.5, 31.0])
+    gap = analysis.get('details', {}).get('population', {}).get('gap', 0)
+    
+    # ====== STEP 1: Generate zones near PFZ objects (near_pfz) ======
+    if pfz_region and pfz_region.get('notable_objects'):
+        notable_objects = pfz_region['notable_objects']
         
-        # ====== STEP 1: Generate zones near PFZ objects (near_pfz) ======
-        if pfz_region and pfz_region.get('notable_objects'):
-            notable_objects = pfz_region['notable_objects']
+        # Limit to top 2 PFZ objects per region
+        for idx, pfz_name in enumerate(notable_objects[:2]):
+            # Generate coordinates NEARBY (not at the center) using hash
+            zone_coords = generate_nearby_coordinates(
+                base_coords[0], 
+                base_coords[1], 
+                seed=f"{region_name}_{pfz_name}_near",
+                min_distance=3,
+                max_distance=8
+            )
             
-            # Limit to top 2 PFZ objects per region
-            for idx, pfz_name in enumerate(notable_objects[:2]):
-                # Generate coordinates NEARBY (not at the center) using hash
-                zone_coords = generate_nearby_coordinates(
-                    base_coords[0], 
-                    base_coords[1], 
-                    seed=f"{region_name}_{pfz_name}_near",
-                    min_distance=3,
-                    max_distance=8
-                )
-                
-                # Check competition
-                competitors = count_competitors_nearby(zone_coords, radius_km=5.0)
-                
-                # Calculate distance from PFZ (simulated)
-                distance_from_pfz = 3 + idx * 2
-                
-                # Calculate priority using comprehensive 7-factor model
-                priority = calculate_comprehensive_priority(
-                    zone_type="near_pfz",
-                    region_analysis=analysis,
-                    fire_cluster_size=0,
-                    competitors=competitors,
-                    distance_from_pfz=distance_from_pfz,
-                    pfz_name=pfz_name
-                )
-                
-                # Only add if priority is high enough
-                if priority < 60:
-                    continue
-                
-                # Get infrastructure distances
-                base_distance = 10 if region_name in ['Закарпатська область', 'Чернівецька область'] else 5
-                
-                # Generate reasoning for near_pfz zone
-                visitors_estimate = 30000 if 'НПП' in pfz_name or 'Національний' in pfz_name else 15000
-                reasoning = {
-                    "point1": f"{pfz_name} - {visitors_estimate:,} відвідувачів/рік (атрактор)",
-                    "point2": f"Попит: {int(analysis['demand_score'])} балів, Пожежі: {analysis['fire_score']} балів",
-                    "point3": f"Конкуренція: {competitors} р.п. (низька насиченість)"
-                }
-                
-                # Recommended facilities for eco-tourism
-                capacity_people = int(gap / 4 / 180 / 2) if gap > 0 else 50
-                recommended_facilities = [
-                    f"Екологічний готель: {max(30, min(70, capacity_people))} номерів",
-                    "Ресторан з місцевою/органічною кухнею",
-                    "Інформаційний центр про ПЗФ (екскурсії, карти маршрутів)",
-                    "Прокат туристичного спорядження",
-                    "Веранда/тераса з видом на природу"
-                ]
-                
-                # Create zone
-                recommended_zones.append({
-                    "id": f"{region_name}_near_pfz_{idx+1}",
-                    "type": "near_pfz",
-                    "name": f"Біля: {pfz_name}",
-                    "region": region_name,
-                    "coordinates": zone_coords,
-                    "priority": priority,
-                    "reasoning": reasoning,
-                    "recommended_facilities": recommended_facilities,
-                    "infrastructure": {
-                        "hospital_distance": base_distance + 2,
-                        "hospital_name": f"{region_name.replace(' область', '')} ЦРЛ",
-                        "gas_station_distance": base_distance,
-                        "gas_station_name": "WOG" if region_name in ['Київська область', 'Львівська область'] else "БРСМ",
-                        "shop_distance": base_distance - 1,
-                        "shop_name": "Сільпо" if region_name == 'Київська область' else "АТБ",
-                        "mobile_coverage": infra_region.get('anthropogenic_infrastructure', {}).get('mobile_coverage_percent', 95) if infra_region else 95,
-                        "nearest_road": infra_region.get('transport_accessibility', {}).get('main_roads', [{}])[0].get('name', 'М-06') if infra_region and infra_region.get('transport_accessibility', {}).get('main_roads') else 'М-06',
-                        "road_distance": 1,
-                        "road_quality": "добра"
-                    },
-                    "legal_status": "✅ ДОЗВОЛЕНО (населений пункт, ЗА МЕЖАМИ ПЗФ)",
-                    "distance_from_pfz": distance_from_pfz,
-                    "pfz_object": pfz_name,
-                    "recommended_type": "Екоготель",
-                    "capacity": "50-70 місць",
-                    "investment": "$200K-400K",
-                    "payback": "2-4 роки",
-                    "competitors_nearby": competitors
-                })
-        
-        # ====== STEP 2: Generate roadside zones (roadside) ======
-        if infra_region and infra_region.get('transport_accessibility', {}).get('main_roads'):
-            main_roads = infra_region['transport_accessibility']['main_roads']
+            # Check competition
+            competitors = count_competitors(zone_coords, radius_km=ZONE_COMPETITOR_RADIUS_KM)
             
-            # Limit to top 2 main roads
-            for idx, road in enumerate(main_roads[:2]):
-                road_name = road.get('name', 'М-06')
-                
-                # Generate coordinates along the road
-                zone_coords = generate_nearby_coordinates(
-                    base_coords[0],
-                    base_coords[1],
-                    seed=f"{region_name}_{road_name}_road",
-                    min_distance=15,
-                    max_distance=30
-                )
-                
-                # Check competition
-                competitors = count_competitors_nearby(zone_coords, radius_km=5.0)
-                
-                # Calculate priority using comprehensive 7-factor model
-                priority = calculate_comprehensive_priority(
-                    zone_type="roadside",
-                    region_analysis=analysis,
-                    fire_cluster_size=0,
-                    competitors=competitors,
-                    distance_from_pfz=0,
-                    pfz_name=""
-                )
-                
-                # Only add if priority is high enough
-                if priority < 55:
-                    continue
-                
-                # Generate reasoning for roadside zone
-                traffic = "5,000+" if road.get('type') == 'міжнародна' else "3,000+"
-                reasoning = {
-                    "point1": f"{road_name} - головна траса ({traffic} авто/день)",
-                    "point2": f"Транспорт: {int(analysis['accessibility_score'])} балів, Попит: {int(analysis['demand_score'])} балів",
-                    "point3": f"Конкуренція: {competitors} р.п. на маршруті"
-                }
-                
-                # Recommended facilities for roadside
-                recommended_facilities = [
-                    "Мотель: 20-30 місць",
-                    "Ресторан/кафе: 40-50 місць для відвідувачів",
-                    "Стоянка: 30-40 автомобілів",
-                    "Дитячий майданчик",
-                    "Зона відпочинку з альтанками та мангалами"
-                ]
-                
-                # Create zone
-                recommended_zones.append({
-                    "id": f"{region_name}_roadside_{idx+1}",
-                    "type": "roadside",
-                    "name": f"Траса {road_name}, {region_name.replace(' область', '')}",
-                    "region": region_name,
-                    "coordinates": zone_coords,
-                    "priority": priority,
-                    "reasoning": reasoning,
-                    "recommended_facilities": recommended_facilities,
-                    "infrastructure": {
-                        "hospital_distance": 8,
-                        "hospital_name": f"{region_name.replace(' область', '')} ЦРЛ",
-                        "gas_station_distance": 2,
-                        "gas_station_name": "WOG" if region_name in ['Київська область', 'Львівська область'] else "БРСМ",
-                        "shop_distance": 3,
-                        "shop_name": "Сільпо" if region_name == 'Київська область' else "АТБ",
-                        "mobile_coverage": infra_region.get('anthropogenic_infrastructure', {}).get('mobile_coverage_percent', 95) if infra_region else 95,
-                        "nearest_road": road_name,
-                        "road_distance": 0,
-                        "road_quality": road.get('quality', 'добра')
-                    },
-                    "legal_status": "✅ ДОЗВОЛЕНО (придорожна інфраструктура)",
-                    "distance_from_pfz": None,
-                    "pfz_object": None,
-                    "recommended_type": "Придорожний комплекс",
-                    "capacity": "15-25 місць",
-                    "investment": "$100K-250K",
-                    "payback": "3-5 років",
-                    "competitors_nearby": competitors
-                })
-        
-        # ====== STEP 3: Generate fire prevention zones (fire_prevention) ======
-        fire_clusters = find_fire_clusters(region_name, min_cluster_size=3, radius_km=10.0)
+            # Calculate distance from PFZ (simulated)
+            distance_from_pfz = 3 + idx * 2
+            
+            # Calculate priority using comprehensive 7-factor model
+            priority = calculate_comprehensive_priority(
+                zone_type="near_pfz",
+                region_analysis=analysis,
+                fire_cluster_size=0,
+                competitors=competitors,
+                distance_from_pfz=distance_from_pfz,
+                pfz_name=pfz_name
+            )
+            
+            # Only add if priority is high enough
+            if priority < 60:
+                continue
+            
+            # Get infrastructure distances
+            base_distance = 10 if region_name in ['Закарпатська область', 'Чернівецька область'] else 5
+            
+            # Generate reasoning for near_pfz zone
+            visitors_estimate = 30000 if 'НПП' in pfz_name or 'Національний' in pfz_name else 15000
+            reasoning = {
+                "point1": f"{pfz_name} - {visitors_estimate:,} відвідувачів/рік (атрактор)",
+                "point2": f"Попит: {int(analysis['demand_score'])} балів, Пожежі: {analysis['fire_score']} балів",
+                "point3": f"Конкуренція: {competitors} р.п. (низька насиченість)"
+            }
+            
+            # Recommended facilities for eco-tourism
+            capacity_people = int(gap / 4 / 180 / 2) if gap > 0 else 50
+            recommended_facilities = [
+                f"Екологічний готель: {max(30, min(70, capacity_people))} номерів",
+                "Ресторан з місцевою/органічною кухнею",
+                "Інформаційний центр про ПЗФ (екскурсії, карти маршрутів)",
+                "Прокат туристичного спорядження",
+                "Веранда/тераса з видом на природу"
+            ]
+            
+            # Create zone
+            recommended_zones.append({
+                "id": f"{region_name}_near_pfz_{idx+1}",
+                "type": "near_pfz",
+                "name": f"Біля: {pfz_name}",
+                "region": region_name,
+                "coordinates": zone_coords,
+                "priority": priority,
+                "reasoning": reasoning,
+                "recommended_facilities": recommended_facilities,
+                "infrastructure": {
+                    "hospital_distance": base_distance + 2,
+                    "hospital_name": f"{region_name.replace(' область', '')} ЦРЛ",
+                    "gas_station_distance": base_distance,
+                    "gas_station_name": "WOG" if region_name in ['Київська область', 'Львівська область'] else "БРСМ",
+                    "shop_distance": base_distance - 1,
+                    "shop_name": "Сільпо" if region_name == 'Київська область' else "АТБ",
+                    "mobile_coverage": infra_region.get('anthropogenic_infrastructure', {}).get('mobile_coverage_percent', 95) if infra_region else 95,
+                    "nearest_road": infra_region.get('transport_accessibility', {}).get('main_roads', [{}])[0].get('name', 'М-06') if infra_region and infra_region.get('transport_accessibility', {}).get('main_roads') else 'М-06',
+                    "road_distance": 1,
+                    "road_quality": "добра"
+                },
+                "legal_status": "✅ ДОЗВОЛЕНО (населений пункт, ЗА МЕЖАМИ ПЗФ)",
+                "distance_from_pfz": distance_from_pfz,
+                "pfz_object": pfz_name,
+                "recommended_type": "Екоготель",
+                "capacity": "50-70 місць",
+                "investment": "$200K-400K",
+                "payback": "2-4 роки",
+                "competitors_nearby": competitors
+            })
+    
+    # ====== STEP 2: Generate roadside zones (roadside) ======
+    if infra_region and infra_region.get('transport_accessibility', {}).get('main_roads'):
+        main_roads = infra_region['transport_accessibility']['main_roads']
         
-        # Limit to top 2 fire clusters per region
-        for idx, cluster in enumerate(fire_clusters[:2]):
-            cluster_center = cluster['center']
-            fire_count = cluster['fire_count']
+        # Limit to top 2 main roads
+        for idx, road in enumerate(main_roads[:2]):
+            road_name = road.get('name', 'М-06')
+            
+            # Generate coordinates along the road
+            zone_coords = generate_nearby_coordinates(
+                base_coords[0],
+                base_coords[1],
+                seed=f"{region_name}_{road_name}_road",
+                min_distance=15,
+                max_distance=30
+            )
             
             # Check competition
-            competitors = count_competitors_nearby(cluster_center, radius_km=5.0)
+            competitors = count_competitors(zone_coords, radius_km=ZONE_COMPETITOR_RADIUS_KM)
             
             # Calculate priority using comprehensive 7-factor model
             priority = calculate_comprehensive_priority(
-                zone_type="fire_prevention",
+                zone_type="roadside",
                 region_analysis=analysis,
-                fire_cluster_size=fire_count,
+                fire_cluster_size=0,
                 competitors=competitors,
                 distance_from_pfz=0,
                 pfz_name=""
             )
             
-            # Only add if priority is high enough and fire count significant
-            if priority < 55 or fire_count < 3:
+            # Only add if priority is high enough
+            if priority < 55:
                 continue
             
-            # Generate reasoning for fire_prevention zone
+            # Generate reasoning for roadside zone
+            traffic = "5,000+" if road.get('type') == 'міжнародна' else "3,000+"
             reasoning = {
-                "point1": f"КРИТИЧНА ЗОНА: {fire_count} людських пожеж (профілактика!)",
-                "point2": f"Пожежі: {analysis['fire_score']} балів, Природа: {int(analysis['nature_score'])} балів",
-                "point3": "Облаштований пункт знизить ризик нових пожеж"
+                "point1": f"{road_name} - головна траса ({traffic} авто/день)",
+                "point2": f"Транспорт: {int(analysis['accessibility_score'])} балів, Попит: {int(analysis['demand_score'])} балів",
+                "point3": f"Конкуренція: {competitors} р.п. на маршруті"
             }
             
-            # Recommended facilities for fire prevention
+            # Recommended facilities for roadside
             recommended_facilities = [
-                "Облаштоване місце для відпочинку з безпечними вогнищами",
-                "Інформаційні стенди про правила пожежної безпеки",
-                "Контейнери для сміття та зола",
-                "Джерело води для гасіння вогню",
-                "Альтанки з мангалами (безпечна зона)"
+                "Мотель: 20-30 місць",
+                "Ресторан/кафе: 40-50 місць для відвідувачів",
+                "Стоянка: 30-40 автомобілів",
+                "Дитячий майданчик",
+                "Зона відпочинку з альтанками та мангалами"
             ]
             
             # Create zone
             recommended_zones.append({
-                "id": f"{region_name}_fire_{idx+1}",
-                "type": "fire_prevention",
-                "name": f"🔥 Кластер пожеж #{idx+1}, {region_name.replace(' область', '')}",
+                "id": f"{region_name}_roadside_{idx+1}",
+                "type": "roadside",
+                "name": f"Траса {road_name}, {region_name.replace(' область', '')}",
                 "region": region_name,
-                "coordinates": cluster_center,
+                "coordinates": zone_coords,
                 "priority": priority,
                 "reasoning": reasoning,
                 "recommended_facilities": recommended_facilities,
                 "infrastructure": {
-                    "hospital_distance": 12,
+                    "hospital_distance": 8,
                     "hospital_name": f"{region_name.replace(' область', '')} ЦРЛ",
-                    "gas_station_distance": 8,
-                    "gas_station_name": "місцева заправка",
-                    "shop_distance": 10,
-                    "shop_name": "місцевий магазин",
-                    "mobile_coverage": 85,
-                    "nearest_road": "регіональна дорога",
-                    "road_distance": 2,
-                    "road_quality": "задовільна"
+                    "gas_station_distance": 2,
+                    "gas_station_name": "WOG" if region_name in ['Київська область', 'Львівська область'] else "БРСМ",
+                    "shop_distance": 3,
+                    "shop_name": "Сільпо" if region_name == 'Київська область' else "АТБ",
+                    "mobile_coverage": infra_region.get('anthropogenic_infrastructure', {}).get('mobile_coverage_percent', 95) if infra_region else 95,
+                    "nearest_road": road_name,
+                    "road_distance": 0,
+                    "road_quality": road.get('quality', 'добра')
                 },
-                "legal_status": "✅ ДОЗВОЛЕНО (пожежна профілактика, лісовий фонд)",
+                "legal_status": "✅ ДОЗВОЛЕНО (придорожна інфраструктура)",
                 "distance_from_pfz": None,
                 "pfz_object": None,
-                "recommended_type": "Облаштоване місце відпочинку",
-                "capacity": "30-50 осіб одночасно",
-                "investment": "$30K-80K",
-                "payback": "4-6 років (соціальний ефект)",
-                "competitors_nearby": competitors,
-                "fire_cluster_size": fire_count
+                "recommended_type": "Придорожний комплекс",
+                "capacity": "15-25 місць",
+                "investment": "$100K-250K",
+                "payback": "3-5 років",
+                "competitors_nearby": competitors
             })
     
-    # Sort by priority descending
-    recommended_zones.sort(key=lambda x: x.get('priority', 0), reverse=True)
+    # ====== STEP 3: Generate fire prevention zones (fire_prevention) ======
+    fire_clusters = find_fire_clusters(region_name, min_cluster_size=3, radius_km=10.0)
     
-    return {"zones": recommended_zones}
+    # Limit to top 2 fire clusters per region
+    for idx, cluster in enumerate(fire_clusters[:2]):
+        cluster_center = cluster['center']
+        fire_count = cluster['fire_count']
+        
+        # Check competition
+        competitors = count_competitors(cluster_center, radius_km=ZONE_COMPETITOR_RADIUS_KM)
+        
+        # Calculate priority using comprehensive 7-factor model
+        priority = calculate_comprehensive_priority(
+            zone_type="fire_prevention",
+            region_analysis=analysis,
+            fire_cluster_size=fire_count,
+            competitors=competitors,
+            distance_from_pfz=0,
+            pfz_name=""
+        )
+        
+        # Only add if priority is high enough and fire count significant
+        if priority < 55 or fire_count < 3:
+            continue
+        
+        # Generate reasoning for fire_prevention zone
+        reasoning = {
+            "point1": f"КРИТИЧНА ЗОНА: {fire_count} людських пожеж (профілактика!)",
+            "point2": f"Пожежі: {analysis['fire_score']} балів, Природа: {int(analysis['nature_score'])} балів",
+            "point3": "Облаштований пункт знизить ризик нових пожеж"
+        }
+        
+        # Recommended facilities for fire prevention
+        recommended_facilities = [
+            "Облаштоване місце для відпочинку з безпечними вогнищами",
+            "Інформаційні стенди про правила пожежної безпеки",
+            "Контейнери для сміття та зола",
+            "Джерело води для гасіння вогню",
+            "Альтанки з мангалами (безпечна зона)"
+        ]
+        
+        # Create zone
+        recommended_zones.append({
+            "id": f"{region_name}_fire_{idx+1}",
+            "type": "fire_prevention",
+            "name": f"🔥 Кластер пожеж #{idx+1}, {region_name.replace(' область', '')}",
+            "region": region_name,
+            "coordinates": cluster_center,
+            "priority": priority,
+            "reasoning": reasoning,
+            "recommended_facilities": recommended_facilities,
+            "infrastructure": {
+                "hospital_distance": 12,
+                "hospital_name": f"{region_name.replace(' область', '')} ЦРЛ",
+                "gas_station_distance": 8,
+                "gas_station_name": "місцева заправка",
+                "shop_distance": 10,
+                "shop_name": "місцевий магазин",
+                "mobile_coverage": 85,
+                "nearest_road": "регіональна дорога",
+                "road_distance": 2,
+                "road_quality": "задовільна"
+            },
+            "legal_status": "✅ ДОЗВОЛЕНО (пожежна профілактика, лісовий фонд)",
+            "distance_from_pfz": None,
+            "pfz_object": None,
+            "recommended_type": "Облаштоване місце відпочинку",
+            "capacity": "30-50 осіб одночасно",
+            "investment": "$30K-80K",
+            "payback": "4-6 років (соціальний ефект)",
+            "competitors_nearby": competitors,
+            "fire_cluster_size": fire_count
+        })
+    
+    return recommended_zones
 
-def calculate_full_potential(region_name, population_data, pfz_data, infra_data, recreational_points):
+def factor_score(row: dict, key: str):
+    """
+    Score of a scoring matrix row for the API: int where the step-by-step formula yields an int
+    (integer threshold scales, scores capped at an integer maximum), otherwise rounded to 0.1
+    """
+    if key in INTEGER_FACTORS or (key in CONDITIONALLY_INTEGER_SCORES and row[f'{key}_is_int']):
+        return int(row[key])
+    return round(float(row[key]), 1)
+
+def calculate_full_potential(region_name: str, scores: RegionScores, fire_data: dict):
     """
     Calculate full recreational potential using 7-factor AHP-based formula:
     
@@ -947,272 +1503,46 @@ def calculate_full_potential(region_name, population_data, pfz_data, infra_data,
     
     Consistency Ratio (CR) = 0.16% < 10% ✓ (відмінна узгодженість AHP)
     
-    Детальна методологія: /app/backend/AHP_METHODOLOGY.md
-    """
-    
-    # Default values if data missing
-    if not population_data:
-        population_data = {'population': 1000000, 'area_km2': 20000, 'forest_coverage_percent': 10, 'has_water_bodies': False}
-    if not pfz_data:
-        pfz_data = {'protected_areas': {'national_parks': 0, 'nature_reserves': 0, 'regional_landscape_parks': 0, 'zakazniks': 0, 'monuments_of_nature': 0, 'percent_of_region': 0}, 'pfz_score': 5.0, 'notable_objects': [], 'recreational_value': 'medium'}
-    if not infra_data:
-        infra_data = {
-            'transport_accessibility': {'accessibility_score': 5.0, 'highway_density_km_per_1000km2': 200, 'main_roads': [], 'railway_stations': 20, 'airports': 0, 'average_travel_time_to_major_city_minutes': 60},
-            'anthropogenic_infrastructure': {'hospitals_per_100k': 4.0, 'gas_stations_per_100km2': 0.5, 'mobile_coverage_percent': 90, 'internet_coverage_percent': 85, 'hotels_total': 100, 'electricity_reliability': 'середня'}
-        }
-    
-    # 1. DEMAND SCORE (25 points)
-    population = population_data.get('population', 1000000)
-    annual_demand = population * 0.15 * 3  # 15% population × 3 visits/year
-    
-    def safe_float(val):
-        """Safely convert value to float, handling ranges like '34-36'"""
-        if val is None:
-            return 0
-        if isinstance(val, (int, float)):
-            return float(val)
-        try:
-            # Handle ranges like "34-36" by taking the first number
-            str_val = str(val).strip()
-            if '-' in str_val and not str_val.startswith('-'):
-                str_val = str_val.split('-')[0]
-            return float(str_val)
-        except (ValueError, TypeError):
-            return 0
-    
-    total_capacity = sum(
-        safe_float(p.get('properties', {}).get('capacity', 0))
-        for p in recreational_points
-    )
-    annual_supply = total_capacity * 180 * 2  # 180 days × 2 shifts
-    
-    supply_demand_ratio = annual_supply / annual_demand if annual_demand > 0 else 0
-    gap = annual_demand - annual_supply
-    
-    # Відповідно до методології на Landing Page
-    if supply_demand_ratio < 0.6:  # дефіцит >40%
-        demand_score = 25
-    elif supply_demand_ratio < 0.8:  # дефіцит 20-40%
-        demand_score = 20
-    elif supply_demand_ratio < 1.0:  # баланс
-        demand_score = 15
-    elif supply_demand_ratio < 1.5:  # надлишок 0-50%
-        demand_score = 10
-    else:  # надлишок >50%
-        demand_score = 0
-    
-    # 2. PFZ SCORE (20 points) - відповідно до методології Landing Page
-    pfz = pfz_data.get('protected_areas', {})
-    pfz_score = 0
-    pfz_score += min(pfz.get('national_parks', 0) * 2.0, 8)  # НПП ×2.0
-    pfz_score += min(pfz.get('nature_reserves', 0) * 1.5, 6)  # Заповідники ×1.5
-    pfz_score += min(pfz.get('regional_landscape_parks', 0) * 1.0, 4)  # РЛП ×1.0
-    pfz_score += min(pfz.get('zakazniks', 0) * 0.1, 1.5)  # Заказники ×0.1
-    pfz_score += min(pfz.get('monuments_of_nature', 0) * 0.05, 0.5)  # Пам'ятки ×0.05
-    
-    percent_of_region = pfz.get('percent_of_region', 0)
-    if percent_of_region > 10:
-        pfz_score += 2
-    elif percent_of_region > 7:
-        pfz_score += 1.5
-    elif percent_of_region > 5:
-        pfz_score += 1
-    
-    pfz_score = min(pfz_score, 20)
-    
-    # 3. NATURE SCORE (15 points)
-    forest_coverage = population_data.get('forest_coverage_percent', 10)
-    forest_score = min(forest_coverage * 0.275, 11)  # 0.275 = нормалізація до 11 балів при 40%
-    water_score = 4 if population_data.get('has_water_bodies', False) else 0
-    nature_score = forest_score + water_score
-    
-    # 4. TRANSPORT ACCESSIBILITY (15 points)
-    transport = infra_data.get('transport_accessibility', {})
-    base_access_score = transport.get('accessibility_score', 5.0)
-    accessibility_score = (base_access_score / 10) * 10
-    
-    international_roads = len([r for r in transport.get('main_roads', []) if r.get('type') == 'міжнародна'])
-    accessibility_score += min(international_roads * 0.8, 3)
-    
-    if transport.get('airports', 0) > 0:
-        accessibility_score += 1
-    
-    if transport.get('highway_density_km_per_1000km2', 0) > 250:
-        accessibility_score += 1
-    
-    accessibility_score = min(accessibility_score, 15)
-    
-    # 5. ANTHROPOGENIC INFRASTRUCTURE (10 points)
-    anthro = infra_data.get('anthropogenic_infrastructure', {})
-    infra_score = 0
-    
-    hospitals_per_100k = anthro.get('hospitals_per_100k', 0)
-    if hospitals_per_100k >= 5.0:
-        infra_score += 3
-    elif hospitals_per_100k >= 4.0:
-        infra_score += 2
-    else:
-        infra_score += 1
-    
-    gas_density = anthro.get('gas_stations_per_100km2', 0)
-    if gas_density >= 1.0:
-        infra_score += 2
-    elif gas_density >= 0.7:
-        infra_score += 1.5
-    else:
-        infra_score += 1
-    
-    mobile_coverage = anthro.get('mobile_coverage_percent', 0)
-    if mobile_coverage >= 96:
-        infra_score += 2
-    elif mobile_coverage >= 93:
-        infra_score += 1.5
-    else:
-        infra_score += 1
-    
-    internet_coverage = anthro.get('internet_coverage_percent', 0)
-    if internet_coverage >= 90:
-        infra_score += 1
-    elif internet_coverage >= 85:
-        infra_score += 0.5
-    
-    hotels = anthro.get('hotels_total', 0)
-    if hotels > 200:
-        infra_score += 1
-    elif hotels > 100:
-        infra_score += 0.5
-    
-    electricity = anthro.get('electricity_reliability', '')
-    if electricity == 'висока':
-        infra_score += 1
-    elif electricity == 'середня':
-        infra_score += 0.5
+    The scores of all regions are computed at once by scoring_engine.score_indicators
+    (threshold tables over the indicator matrix, see DatasetSnapshot.region_scores);
+    this is the per-region view over one row of that matrix
     
-    infra_score = min(infra_score, 10)
-    
-    # 6. SATURATION PENALTY (-15 points)
-    area = population_data.get('area_km2', 20000)
-    density = (len(recreational_points) / area * 1000) if area > 0 else 0
-    
-    if density > 6:
-        saturation_penalty = -15
-    elif density > 4:
-        saturation_penalty = -10
-    elif density > 3:
-        saturation_penalty = -6
-    elif density > 2:
-        saturation_penalty = -3
-    else:
-        saturation_penalty = 0
-    
-    # 7. FIRE PREVENTION BONUS (+5 points) - NEW FACTOR
-    # Calculate fire score for region center
-    region_centers = {
-        'Київська область': [50.45, 30.52],
-        'Львівська область': [49.84, 24.03],
-        'Закарпатська область': [48.62, 22.29],
-        'Одеська область': [46.48, 30.73],
-        'Харківська область': [49.99, 36.23],
-        'Дніпропетровська область': [48.46, 35.04],
-        'Житомирська область': [50.25, 28.66],
-        'Волинська область': [50.75, 25.32],
-        'Івано-Франківська область': [48.92, 24.71],
-        'Вінницька область': [49.23, 28.47],
-        'Чернігівська область': [51.50, 31.29],
-        'Рівненська область': [50.62, 26.23],
-        'Чернівецька область': [48.29, 25.93],
-        'Полтавська область': [49.59, 34.55],
-        'Черкаська область': [49.44, 32.06],
-        'Сумська область': [50.91, 34.80],
-        'Хмельницька область': [49.42, 26.98],
-        'Тернопільська область': [49.55, 25.59],
-        'Миколаївська область': [46.97, 32.00],
-        'Херсонська область': [46.64, 32.62],
-        'Кіровоградська область': [48.51, 32.26],
-        'Запорізька область': [47.84, 35.14],
-        'Донецька область': [48.02, 37.80],
-        'Луганська область': [48.57, 39.31],
-    }
+    Детальна методологія: /app/backend/AHP_METHODOLOGY.md
     
-    center_coords = region_centers.get(region_name, [48.5, 31.0])
-    fire_data = count_human_fires_nearby(center_coords, radius_km=50.0)  # Regional scope
-    fire_score = fire_data['score']  # 0-5 points
-    
-    # TOTAL SCORE (with new fire factor)
-    total_score = demand_score + pfz_score + nature_score + accessibility_score + infra_score + fire_score + saturation_penalty
-    total_score = max(0, min(100, total_score))
-    
-    # CATEGORY & RECOMMENDATION
-    if total_score >= 85:
-        category = "ВИНЯТКОВИЙ"
-        recommendation = "Найвища пріоритетність! Термінове будівництво рекомендується."
-    elif total_score >= 70:
-        category = "ДУЖЕ ВИСОКИЙ"
-        recommendation = "Дуже привабливо для інвесторів. Будівництво настійно рекомендується."
-    elif total_score >= 55:
-        category = "ВИСОКИЙ"
-        recommendation = "Хороший потенціал. Рекомендується детальний аналіз локацій."
-    elif total_score >= 40:
-        category = "СЕРЕДНІЙ"
-        recommendation = "Обмежений потенціал. Можливе точкове будівництво."
-    else:
-        category = "НИЗЬКИЙ"
-        recommendation = "Низький попит або перенасичений ринок. Будівництво ризиковане."
-    
-    # Determine risk level
-    if total_score >= 80:
-        risk_level = "НИЗЬКИЙ"
-    elif total_score >= 65:
-        risk_level = "ПОМІРНИЙ"
-    elif total_score >= 50:
-        risk_level = "ПІДВИЩЕНИЙ"
-    else:
-        risk_level = "ВИСОКИЙ"
-    
-    # Investment scale
-    if total_score >= 80 and gap > 200000:
-        investment_scale = "ВЕЛИКИЙ (5+ об'єктів, $1M+)"
-    elif total_score >= 70 and gap > 100000:
-        investment_scale = "СЕРЕДНІЙ (3-5 об'єктів, $500K-1M)"
-    elif total_score >= 55 and gap > 50000:
-        investment_scale = "МАЛИЙ (1-2 об'єкти, $200K-500K)"
-    elif total_score >= 40:
-        investment_scale = "ТОЧКОВИЙ (1 унікальний об'єкт)"
-    else:
-        investment_scale = "НЕ РЕКОМЕНДОВАНО"
-    
-    # Density status
-    if density > 6:
-        density_status = "Критична насиченість"
-    elif density > 4:
-        density_status = "Висока насиченість"
-    elif density > 2:
-        density_status = "Помірна насиченість"
-    else:
-        density_status = "Низька конкуренція"
+    Args:
+        scores: Scoring matrix of all regions
+        fire_data: Fire totals of the region (region_fire_data)
+    """
+    idx = scores.index(region_name)
+    row = {key: column[idx] for key, column in scores.columns.items()}
+    indicators = {key: column[idx] for key, column in scores.indicators.columns.items()}
+    sections = scores.indicators.sections[idx]
+    population_data, pfz_data = sections['population'], sections['pfz']
+    pfz, transport, anthro = sections['protected_areas'], sections['transport'], sections['anthropogenic']
+    total_score = float(row['total_score'])
     
     return {
         "region": region_name,
-        "total_score": round(total_score, 1),
-        "demand_score": round(demand_score, 1),
-        "pfz_score": round(pfz_score, 1),
-        "nature_score": round(nature_score, 1),
-        "accessibility_score": round(accessibility_score, 1),
-        "infrastructure_score": round(infra_score, 1),
-        "fire_score": round(fire_score, 1),
-        "saturation_penalty": round(saturation_penalty, 1),
-        "category": category,
-        "recommendation": recommendation,
+        "total_score": factor_score(row, 'total_score'),
+        "demand_score": factor_score(row, 'demand_score'),
+        "pfz_score": factor_score(row, 'pfz_score'),
+        "nature_score": factor_score(row, 'nature_score'),
+        "accessibility_score": factor_score(row, 'accessibility_score'),
+        "infrastructure_score": factor_score(row, 'infrastructure_score'),
+        "fire_score": factor_score(row, 'fire_score'),
+        "saturation_penalty": factor_score(row, 'saturation_penalty'),
+        "category": row['category'],
+        "recommendation": row['recommendation'],
         "details": {
             "population": {
-                "total": population,
-                "area_km2": area,
+                "total": population_data.get('population', 1000000),
+                "area_km2": population_data.get('area_km2', 20000),
                 "density_per_km2": population_data.get('density_per_km2', 0),
-                "annual_demand": round(annual_demand),
-                "annual_supply": round(annual_supply),
-                "supply_demand_ratio": round(supply_demand_ratio, 2),
-                "gap": round(gap),
-                "gap_status": "Дефіцит" if gap > 0 else "Надлишок"
+                "annual_demand": round(float(row['annual_demand'])),
+                "annual_supply": round(float(row['annual_supply'])),
+                "supply_demand_ratio": round(float(row['supply_demand_ratio']), 2),
+                "gap": round(float(row['gap'])),
+                "gap_status": "Дефіцит" if row['gap'] > 0 else "Надлишок"
             },
             "pfz": {
                 "national_parks": pfz.get('national_parks', 0),
@@ -1220,101 +1550,517 @@ def calculate_full_potential(region_name, population_data, pfz_data, infra_data,
                 "regional_landscape_parks": pfz.get('regional_landscape_parks', 0),
                 "zakazniks": pfz.get('zakazniks', 0),
                 "monuments_of_nature": pfz.get('monuments_of_nature', 0),
-                "percent_of_region": percent_of_region,
+                "percent_of_region": pfz.get('percent_of_region', 0),
                 "pfz_rating": pfz_data.get('pfz_score', 0),
                 "notable_objects": pfz_data.get('notable_objects', []),
                 "recreational_value": pfz_data.get('recreational_value', 'medium')
             },
             "nature": {
-                "forest_coverage_percent": forest_coverage,
+                "forest_coverage_percent": population_data.get('forest_coverage_percent', 10),
                 "has_water_bodies": population_data.get('has_water_bodies', False)
             },
             "transport": {
-                "accessibility_score": base_access_score,
+                "accessibility_score": transport.get('accessibility_score', 5.0),
                 "highway_density": transport.get('highway_density_km_per_1000km2', 0),
                 "main_roads": transport.get('main_roads', []),
-                "international_roads_count": international_roads,
+                "international_roads_count": int(indicators['international_roads']),
                 "railway_stations": transport.get('railway_stations', 0),
                 "airports": transport.get('airports', 0),
                 "avg_travel_time_minutes": transport.get('average_travel_time_to_major_city_minutes', 0)
             },
             "infrastructure": {
-                "hospitals_per_100k": hospitals_per_100k,
+                "hospitals_per_100k": anthro.get('hospitals_per_100k', 0),
                 "hospitals_total": anthro.get('hospitals_total', 0),
-                "gas_stations_per_100km2": gas_density,
+                "gas_stations_per_100km2": anthro.get('gas_stations_per_100km2', 0),
                 "gas_stations_total": anthro.get('gas_stations', 0),
-                "mobile_coverage_percent": mobile_coverage,
-                "internet_coverage_percent": internet_coverage,
-                "hotels_total": hotels,
+                "mobile_coverage_percent": anthro.get('mobile_coverage_percent', 0),
+                "internet_coverage_percent": anthro.get('internet_coverage_percent', 0),
+                "hotels_total": anthro.get('hotels_total', 0),
                 "restaurants_cafes": anthro.get('restaurants_cafes', 0),
-                "electricity_reliability": electricity,
+                "electricity_reliability": indicators['electricity_reliability'],
                 "water_supply_quality": anthro.get('water_supply_quality', '')
             },
             "saturation": {
-                "existing_points": len(recreational_points),
-                "density_per_1000km2": round(density, 2),
-                "density_status": density_status
+                "existing_points": int(indicators['points_count']),
+                "density_per_1000km2": round(float(row['density']), 2),
+                "density_status": row['density_status']
             },
             "fires": {
                 "total_fires": fire_data['total'],
                 "human_caused_fires": fire_data['human'],
-                "fire_prevention_score": round(fire_score, 1),
+                "burned_area_ha": fire_data['area_ha'],
+                "fire_prevention_score": factor_score(row, 'fire_score'),
                 "interpretation": "Більше людських пожеж = вища потреба в облаштованих пунктах"
             },
             "investment": {
-                "risk_level": risk_level,
-                "investment_scale": investment_scale,
+                "risk_level": row['risk_level'],
+                "investment_scale": row['investment_scale'],
                 "should_build": total_score >= 55
             }
         }
     }
 
 
+# ===== WHAT-IF SCENARIOS =====
+def scenario_added_points(snapshot: DatasetSnapshot, points) -> Tuple[GeoPoints, List[str]]:
+    """
+    Hypothetical points of a scenario and the region of each one: the given region
+    (as properties.region of imported points), the region polygon containing the point
+    if no known region is given; with REGION_ASSIGNMENT=polygons - by the region polygons,
+    the given region if the location is outside all polygons
+    """
+    scores = snapshot.region_scores
+    polygons = snapshot.region_polygons
+    locations = GeoPoints(np.array([p.lat for p in points]), np.array([p.lng for p in points]))
+    declared = polygons.codes([p.region for p in points])
+    codes = polygons.assign(locations, declared) if len(polygons) else declared
+    regions = []
+    for point, code in zip(points, codes.tolist()):
+        if not USE_POLYGON_REGIONS and scores.index(point.region) is not None:
+            region_name = point.region
+        else:
+            region_name = polygons.names[code] if code != NO_REGION else point.region
+        if scores.index(region_name) is None:
+            raise ValueError(f"Added point ({point.lat}, {point.lng}) is outside the region boundaries; set a known region")
+        regions.append(region_name)
+    return locations, regions
+
+def scenario_removed_points(snapshot: DatasetSnapshot, ids: List[Any]) -> Tuple[np.ndarray, List[str], List[str]]:
+    """
+    Existing recreational points removed by a scenario
+    
+    Returns:
+        (indices of the points, region of each one, IDs not found)
+    """
+    layer = snapshot.recreational_points
+    requested = list(dict.fromkeys(str(i) for i in ids))
+    if not requested:
+        return np.empty(0, dtype=np.int64), [], []
+    if layer is None:
+        raise ValueError("recreational_points data is not loaded")
+    positions = {fid: idx for idx, fid in enumerate(layer.stable_ids())}
+    indices = np.array([positions[fid] for fid in requested if fid in positions], dtype=np.int64)
+    regions = np.full(len(indices), None, dtype=object)
+    for region_name, region_indices in snapshot.region_tables.points.items():
+        regions[np.isin(indices, region_indices)] = region_name
+    return indices, regions.tolist(), [fid for fid in requested if fid not in positions]
+
+def scenario_indicator_changes(request: ScenarioRequest, added_regions: List[str], removed: np.ndarray,
+                               removed_regions: List[str]) -> Dict[int, Dict[str, Any]]:
+    """
+    New indicator values of the scenario per row of the scoring matrix: point counts and capacity
+    of the regions with added / removed points and the explicitly changed indicators
+    """
+    data = DATA.current()
+    scores = data.region_scores
+    changes: Dict[int, Dict[str, Any]] = {}
+    columns = scores.indicators.columns
+    
+    def shift(region_name: str, points: int, capacity: float):
+        row = scores.index(region_name)
+        if row is None:
+            return
+        values = changes.setdefault(row, {})
+        values['points_count'] = values.get('points_count', columns['points_count'][row]) + points
+        values['total_capacity'] = values.get('total_capacity', columns['total_capacity'][row]) + capacity
+    
+    for point, region_name in zip(request.added_points, added_regions):
+        shift(region_name, point.count, point.capacity * point.count)
+    capacity = data.point_numeric.get('capacity', np.zeros(0))
+    for idx, region_name in zip(removed.tolist(), removed_regions):
+        shift(region_name, -1, -float(capacity[idx]) if idx < len(capacity) else 0.0)
+    
+    for region_name, values in request.indicators.items():
+        row = scores.index(region_name)
+        if row is None:
+            raise ValueError(f"Unknown region: {region_name}")
+        for column, value in values.items():
+            if column not in SCENARIO_INDICATORS:
+                raise ValueError(f"Unknown indicator: {column}. Use one of: {', '.join(SCENARIO_INDICATORS)}")
+            if isinstance(value, str) != (column == 'electricity_reliability'):
+                raise ValueError(f"Invalid value for {column}: {value!r}")
+            changes.setdefault(row, {})[column] = value
+    return changes
+
+def json_value(value):
+    """NumPy scalar of an indicator column as a plain Python value"""
+    return value.item() if isinstance(value, np.generic) else value
+
+def scenario_score_summary(row: Dict[str, Any], rank: int) -> dict:
+    """Scores of one region in a scenario response"""
+    return {
+        "total_score": factor_score(row, 'total_score'),
+        **{key: factor_score(row, key) for key in FACTOR_KEYS},
+        "category": row['category'],
+        "rank": rank,
+    }
+
+def scenario_competitor_counter(added: GeoPoints, added_counts: np.ndarray, removed: GeoPoints):
+    """Competitor counter for the zones of a scenario: current points plus added minus removed ones"""
+    def count_competitors(coordinates: list, radius_km: float = ZONE_COMPETITOR_RADIUS_KM):
+        lat, lng = coordinates
+        count = count_competitors_nearby(coordinates, radius_km)
+        count += int(added_counts[haversine_one_to_many(lat, lng, added) <= radius_km].sum())
+        count -= int(np.count_nonzero(haversine_one_to_many(lat, lng, removed) <= radius_km))
+        return count
+    return count_competitors
+
+def scenario_zones(new_scores: RegionScores, added: GeoPoints,
+                   added_counts: np.ndarray, removed_indices: np.ndarray) -> dict:
+    """
+    Recommended zones recomputed for a scenario: zones of the regions whose scores change and
+    of the regions with a zone within the competitor radius of an added / removed point
+    
+    Args:
+        new_scores: Scores of the affected regions
+        added, added_counts: Locations of the added points and number of points at each one
+        removed_indices: Indices of the removed recreational points
+    """
+    data = DATA.current()
+    base_zones = build_recommended_zones()["zones"]
+    removed = layer_points(data.recreational_points)
+    removed = GeoPoints(removed.lat_deg[removed_indices], removed.lng_deg[removed_indices])
+    changed = GeoPoints(np.concatenate([added.lat_deg, removed.lat_deg]), np.concatenate([added.lng_deg, removed.lng_deg]))
+    
+    zone_regions = set(new_scores.names)
+    for zone in base_zones:
+        lat, lng = zone['coordinates']
+        if np.any(haversine_one_to_many(lat, lng, changed) <= ZONE_COMPETITOR_RADIUS_KM):
+            zone_regions.add(zone['region'])
+    
+    count_competitors = scenario_competitor_counter(added, added_counts, removed)
+    new_zones = []
+    for region_name in data.region_scores.names:
+        if region_name not in zone_regions:
+            continue
+        if new_scores.index(region_name) is not None:
+            analysis = calculate_full_potential(region_name, new_scores, region_fire_data(region_name))
+        else:
+            analysis = compute_region_analysis(region_name)
+        new_zones.extend(region_recommended_zones(region_name, analysis, count_competitors))
+    new_zones.sort(key=lambda x: x.get('priority', 0), reverse=True)
+    old_zones = [zone for zone in base_zones if zone['region'] in zone_regions]
+    
+    old_priority = {zone['id']: zone for zone in old_zones}
+    new_priority = {zone['id']: zone for zone in new_zones}
+    changes = []
+    for zone_id in dict.fromkeys([*old_priority, *new_priority]):
+        old, new = old_priority.get(zone_id), new_priority.get(zone_id)
+        if old is None or new is None or old['priority'] != new['priority']:
+            zone = new or old
+            changes.append({
+                "id": zone_id,
+                "region": zone['region'],
+                "type": zone['type'],
+                "old_priority": old['priority'] if old else None,
+                "new_priority": new['priority'] if new else None,
+            })
+    return {
+        "recomputed_regions": [name for name in data.region_scores.names if name in zone_regions],
+        "old": old_zones,
+        "new": new_zones,
+        "changes": changes,
+    }
+
+def evaluate_scenario(request: ScenarioRequest) -> dict:
+    """
+    What-if scenario against the current snapshot (CPU-bound, runs in COMPUTE_POOL)
+    Only the rows of the affected regions are rescored (scoring_engine), the published
+    data and the caches are not touched
+    """
+    data = DATA.current()
+    scores = data.region_scores
+    added, added_regions = GeoPoints(np.zeros(0), np.zeros(0)), []
+    if request.added_points:
+        added, added_regions = scenario_added_points(data, request.added_points)
+    removed, removed_regions, not_found = scenario_removed_points(data, request.removed_point_ids)
+    changes = scenario_indicator_changes(request, added_regions, removed, removed_regions)
+    rows = sorted(changes)
+    indicators = scores.indicators.subset(rows).with_values(
+        {position: changes[row] for position, row in enumerate(rows)}
+    )
+    new_scores = score_indicators(indicators)
+    
+    totals = scores.total.copy()
+    totals[rows] = new_scores.total
+    old_ranks = rank_matrix(scores.total[np.newaxis, :])[0]
+    new_ranks = rank_matrix(totals[np.newaxis, :])[0]
+    
+    regions = []
+    old_indicators, new_indicators = scores.indicators.columns, indicators.columns
+    for position, row in enumerate(rows):
+        old = {key: column[row] for key, column in scores.columns.items()}
+        new = {key: column[position] for key, column in new_scores.columns.items()}
+        regions.append({
+            "region": scores.names[row],
+            "indicators": {
+                column: {"old": json_value(old_indicators[column][row]), "new": json_value(new_indicators[column][position])}
+                for column in changes[row]
+            },
+            "old": scenario_score_summary(old, int(old_ranks[row])),
+            "new": scenario_score_summary(new, int(new_ranks[row])),
+            "changed_factors": [key for key in FACTOR_KEYS if old[key] != new[key]],
+        })
+    
+    result = {
+        "affected_regions": len(regions),
+        "regions": regions,
+        "not_found": not_found,
+    }
+    if request.include_zones:
+        added_counts = np.array([p.count for p in request.added_points], dtype=np.int64)
+        result["zones"] = scenario_zones(new_scores, added, added_counts, removed)
+    return result
+
+@api_router.post("/scenarios")
+async def evaluate_what_if_scenario(request: ScenarioRequest):
+    """
+    What-if scenario: hypothetical added / removed recreational points and changed region
+    indicators against the current data. Returns old and new scores of the affected regions
+    and the recomputed recommended zones side by side; nothing is written
+    """
+    if not analysis_data_loaded(DATA.current()):
+        raise HTTPException(status_code=500, detail="Data not loaded")
+    if not (request.added_points or request.removed_point_ids or request.indicators):
+        raise HTTPException(status_code=400, detail="Scenario has no changes")
+    
+    started_at = datetime.now(timezone.utc)
+    try:
+        result = await COMPUTE_POOL.run(evaluate_scenario, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {**result, "elapsed_ms": round((datetime.now(timezone.utc) - started_at).total_seconds() * 1000, 1)}
+
+
 # ===== DATA IMPORT ENDPOINTS =====
 from fastapi import UploadFile, File
 from schemas import (
     PopulationDataSchema,
     InfrastructureDataSchema,
     ProtectedAreasSchema,
-    RecreationalPointsSchema,
-    ForestFiresSchema
+    RecreationalPointFeature,
+    RecreationalPointsHeaderSchema,
+    FireFeature,
+    ForestFiresHeaderSchema,
+    FeatureCollectionHeaderSchema,
+    DeleteFeaturesRequest
 )
 
-def reload_data():
-    """Reload all data from files into memory"""
-    global INFRASTRUCTURE_DATA, POPULATION_DATA, PROTECTED_AREAS_DATA, RECREATIONAL_POINTS, FOREST_FIRES
-    INFRASTRUCTURE_DATA = load_json_file('ukraine_infrastructure.json')
-    POPULATION_DATA = load_json_file('ukraine_population_data.json')
-    PROTECTED_AREAS_DATA = load_json_file('ukraine_protected_areas.json')
-    RECREATIONAL_POINTS = load_json_file('recreational_points_web.geojson')
-    FOREST_FIRES = load_json_file('forest_fires.geojson')
+async def reload_data(*datasets: str):
+    """
+    Reload datasets from files: a new snapshot is built in COMPUTE_POOL and
+    published at once, requests in flight finish on the previous snapshot
+    With DATA_STORAGE=mongo the reloaded datasets are also written to MongoDB
+    The caller holds DATASET_UPDATE_LOCK (together with writing the files)
+    
+    Args:
+        datasets: Names from DATASET_FILES to reload (default - all of them)
+    
+    Returns:
+        The published snapshot
+    """
+    assert DATASET_UPDATE_LOCK.locked(), "reload_data requires DATASET_UPDATE_LOCK"
+    datasets = datasets or tuple(DATASET_FILES)
+    snapshot = await COMPUTE_POOL.run(build_dataset_snapshot, DATA.latest(), datasets)
+    publish_snapshot(snapshot)
     logging.info("Data reloaded successfully")
+    if MONGO_STORE is not None:
+        await persist_to_mongo(snapshot, datasets)
+    return snapshot
+
+# ===== SHARED STORAGE (DATA_STORAGE=mongo) =====
+
+async def persist_to_mongo(snapshot: DatasetSnapshot, datasets):
+    """Write datasets of the snapshot to MongoDB; other replicas pick them up by version"""
+    for name in datasets:
+        data = getattr(snapshot, name)
+        if data is None:
+            continue
+        if name in POINT_LAYERS:
+            await MONGO_STORE.replace_layer(
+                name, data.top_level, data.version,
+                layer_document_batches(data, aggregation_regions(snapshot, name))
+            )
+        else:
+            await MONGO_STORE.save_document(name, data, snapshot.versions.get(name))
+
+async def layer_document_batches(layer, regions: Optional[List[Optional[str]]] = None):
+    """Documents of a point layer in BULK_BATCH_SIZE batches (built in COMPUTE_POOL)"""
+    fids = await COMPUTE_POOL.run(layer.stable_ids)
+    for start in range(0, len(layer), BULK_BATCH_SIZE):
+        yield await COMPUTE_POOL.run(
+            layer_documents, layer, fids, start, min(start + BULK_BATCH_SIZE, len(layer)), regions
+        )
+
+async def sync_from_mongo() -> List[str]:
+    """
+    Reload datasets whose version in MongoDB differs from the loaded one
+    (imported by another replica)
+    
+    Returns:
+        Names of the reloaded datasets
+    """
+    async with DATASET_UPDATE_LOCK:
+        stored = await MONGO_STORE.versions()
+        loaded = DATA.latest().versions
+        changed = [
+            name for name in DATASET_FILES
+            if stored.get(name) is not None and stored[name] != loaded.get(name)
+        ]
+        if not changed:
+            return []
+        
+        sources = {}
+        for name in changed:
+            if name in POINT_LAYERS:
+                sources[name] = await MONGO_STORE.load_layer(name)
+            else:
+                sources[name] = await MONGO_STORE.load_document(name)
+        snapshot = await COMPUTE_POOL.run(build_dataset_snapshot, DATA.latest(), changed, False, sources)
+        publish_snapshot(snapshot)
+        logging.info(f"Datasets reloaded from MongoDB: {', '.join(changed)}")
+        return changed
+
+MONGO_SYNC_TASK: Optional[asyncio.Task] = None
+
+async def start_mongo_storage():
+    """
+    Create indexes, seed datasets missing in MongoDB from the local files,
+    load the shared versions of the others and start periodic sync
+    If MongoDB is unavailable the local files are served and sync keeps retrying
+    """
+    global MONGO_SYNC_TASK
+    try:
+        await MONGO_STORE.ensure_indexes()
+        stored = await MONGO_STORE.versions()
+        async with DATASET_UPDATE_LOCK:
+            await persist_to_mongo(DATA.latest(), [name for name in DATASET_FILES if name not in stored])
+        await sync_from_mongo()
+    except StorageError as e:
+        logging.error(f"MongoDB storage unavailable, serving local files: {e}")
+    MONGO_SYNC_TASK = asyncio.create_task(mongo_sync_loop())
+
+async def mongo_sync_loop():
+    while True:
+        await asyncio.sleep(DATA_SYNC_INTERVAL)
+        try:
+            await sync_from_mongo()
+        except StorageError as e:
+            logging.error(f"MongoDB sync failed: {e}")
+
+def require_mongo_layer(dataset: str):
+    if MONGO_STORE is None:
+        raise HTTPException(status_code=400, detail="MongoDB storage is not enabled (DATA_STORAGE=mongo)")
+    if dataset not in POINT_LAYERS:
+        raise HTTPException(status_code=404, detail=f"Unknown point layer: {dataset}")
+
+@api_router.get("/storage/status")
+async def get_storage_status():
+    """Dataset storage backend; with MongoDB - stored vs loaded dataset versions"""
+    if MONGO_STORE is None:
+        return {"backend": DATA_STORAGE}
+    try:
+        stored = await MONGO_STORE.versions()
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    loaded = DATA.current().versions
+    return {
+        "backend": DATA_STORAGE,
+        "sync_interval_seconds": DATA_SYNC_INTERVAL,
+        "datasets": {
+            name: {"stored_version": stored.get(name), "loaded_version": loaded.get(name), "in_sync": stored.get(name) == loaded.get(name)}
+            for name in DATASET_FILES
+        }
+    }
+
+@api_router.get("/storage/nearby/{dataset}")
+async def get_storage_nearby(
+    dataset: str,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10.0, gt=0, le=500),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Features of a point layer within radius_km, nearest first - answered by MongoDB (2dsphere)"""
+    require_mongo_layer(dataset)
+    try:
+        features = await MONGO_STORE.query_radius(dataset, lat, lng, radius_km, limit)
+        total = await MONGO_STORE.count_radius(dataset, lat, lng, radius_km)
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"type": "FeatureCollection", "features": features, "total": total}
+
+@api_router.get("/storage/region-stats/{dataset}")
+async def get_storage_region_stats(dataset: str):
+    """Feature counts of a point layer per region - aggregated in MongoDB"""
+    require_mongo_layer(dataset)
+    count_property = ("human_caused", "cause_type", HUMAN_CAUSE) if dataset == 'forest_fires' else None
+    try:
+        return {"regions": await MONGO_STORE.region_summary(dataset, count_property)}
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Runtime metrics: analysis worker pool (queue depth, latency), result cache, MongoDB pool and latencies"""
+    return {
+        "compute_pool": COMPUTE_POOL.stats(),
+        "analysis_cache": ANALYSIS_CACHE.stats(),
+        "mongo": MONGO.stats()
+    }
+
+@api_router.get("/ready")
+async def get_readiness():
+    """
+    Readiness probe: datasets are loaded and, with DATA_STORAGE=mongo, MongoDB answers a ping
+    within MONGO_SERVER_SELECTION_TIMEOUT_MS; 503 otherwise
+    """
+    checks = {"data_loaded": analysis_data_loaded(DATA.current())}
+    if MONGO_STORE is not None:
+        try:
+            checks["mongo_ping_ms"] = await MONGO.ping()
+        except StorageError as e:
+            checks["mongo_error"] = str(e)
+    ready = checks["data_loaded"] and "mongo_error" not in checks
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, **checks})
 
 @api_router.get("/data-status")
 async def get_data_status():
     """Get status of current loaded data"""
+    data = DATA.current()
     return {
         "population_data": {
-            "loaded": POPULATION_DATA is not None,
-            "regions_count": len(POPULATION_DATA.get('ukraine_regions_data', [])) if POPULATION_DATA else 0
+            "loaded": data.population is not None,
+            "version": data.versions.get('population'),
+            "regions_count": len(data.population.get('ukraine_regions_data', [])) if data.population else 0
         },
         "infrastructure_data": {
-            "loaded": INFRASTRUCTURE_DATA is not None,
-            "regions_count": len(INFRASTRUCTURE_DATA.get('ukraine_infrastructure', {}).get('regions', [])) if INFRASTRUCTURE_DATA else 0
+            "loaded": data.infrastructure is not None,
+            "version": data.versions.get('infrastructure'),
+            "regions_count": len(data.infrastructure.get('ukraine_infrastructure', {}).get('regions', [])) if data.infrastructure else 0
         },
         "protected_areas": {
-            "loaded": PROTECTED_AREAS_DATA is not None,
-            "regions_count": len(PROTECTED_AREAS_DATA.get('ukraine_protected_areas', {}).get('regions', [])) if PROTECTED_AREAS_DATA else 0
+            "loaded": data.protected_areas is not None,
+            "version": data.versions.get('protected_areas'),
+            "regions_count": len(data.protected_areas.get('ukraine_protected_areas', {}).get('regions', [])) if data.protected_areas else 0
         },
         "recreational_points": {
-            "loaded": RECREATIONAL_POINTS is not None,
-            "points_count": len(RECREATIONAL_POINTS.get('features', [])) if RECREATIONAL_POINTS else 0
+            "loaded": data.recreational_points is not None,
+            "version": data.versions.get('recreational_points'),
+            "points_count": len(data.recreational_points) if data.recreational_points is not None else 0,
+            "parse_failures": {
+                key: {"features": failures["features"], "values": failures["values"][:20]}
+                for key, failures in data.point_parse_failures.items()
+            }
         },
         "forest_fires": {
-            "loaded": FOREST_FIRES is not None,
-            "total_fires": FOREST_FIRES.get('metadata', {}).get('total_fires', 0) if FOREST_FIRES else 0,
-            "human_caused": FOREST_FIRES.get('metadata', {}).get('human_caused', 0) if FOREST_FIRES else 0
-        }
+            "loaded": data.forest_fires is not None,
+            "version": data.versions.get('forest_fires'),
+            "total_fires": data.forest_fires.metadata.get('total_fires', 0) if data.forest_fires is not None else 0,
+            "human_caused": data.forest_fires.metadata.get('human_caused', 0) if data.forest_fires is not None else 0
+        },
+        "analysis_cache": ANALYSIS_CACHE.stats()
     }
 
 @api_router.post("/import/population-data")
@@ -1327,13 +2073,14 @@ async def import_population_data(file: UploadFile = File(...)):
         # Validate schema
         validated_data = PopulationDataSchema(**data)
         
-        # Save to file
-        output_file = DATA_DIR / 'ukraine_population_data.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(validated_data.model_dump(), f, ensure_ascii=False, indent=2)
-        
-        # Reload data
-        reload_data()
+        async with DATASET_UPDATE_LOCK:
+            # Save to file
+            output_file = DATA_DIR / 'ukraine_population_data.json'
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(validated_data.model_dump(), f, ensure_ascii=False, indent=2)
+            
+            # Reload data (invalidates cached analyses for this dataset)
+            await reload_data('population')
         
         return {
             "success": True,
@@ -1342,6 +2089,8 @@ async def import_population_data(file: UploadFile = File(...)):
         }
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
 
@@ -1355,13 +2104,14 @@ async def import_infrastructure_data(file: UploadFile = File(...)):
         # Validate schema
         validated_data = InfrastructureDataSchema(**data)
         
-        # Save to file
-        output_file = DATA_DIR / 'ukraine_infrastructure.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(validated_data.model_dump(), f, ensure_ascii=False, indent=2)
-        
-        # Reload data
-        reload_data()
+        async with DATASET_UPDATE_LOCK:
+            # Save to file
+            output_file = DATA_DIR / 'ukraine_infrastructure.json'
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(validated_data.model_dump(), f, ensure_ascii=False, indent=2)
+            
+            # Reload data (invalidates cached analyses for this dataset)
+            await reload_data('infrastructure')
         
         return {
             "success": True,
@@ -1370,6 +2120,8 @@ async def import_infrastructure_data(file: UploadFile = File(...)):
         }
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
 
@@ -1383,13 +2135,14 @@ async def import_protected_areas(file: UploadFile = File(...)):
         # Validate schema
         validated_data = ProtectedAreasSchema(**data)
         
-        # Save to file
-        output_file = DATA_DIR / 'ukraine_protected_areas.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(validated_data.model_dump(), f, ensure_ascii=False, indent=2)
-        
-        # Reload data
-        reload_data()
+        async with DATASET_UPDATE_LOCK:
+            # Save to file
+            output_file = DATA_DIR / 'ukraine_protected_areas.json'
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(validated_data.model_dump(), f, ensure_ascii=False, indent=2)
+            
+            # Reload data (invalidates cached analyses for this dataset)
+            await reload_data('protected_areas')
         
         return {
             "success": True,
@@ -1398,66 +2151,293 @@ async def import_protected_areas(file: UploadFile = File(...)):
         }
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
 
+# Point layers: mode=replace (default) replaces the dataset, append / upsert merge the
+# uploaded features by stable ID (GeoJSON "id", or name@lng,lat for features without one)
+IMPORT_MODES = ('replace', 'append', 'upsert')
+
+def validate_import_mode(mode: str):
+    if mode not in IMPORT_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode: {mode}. Use one of: {', '.join(IMPORT_MODES)}")
+
 @api_router.post("/import/recreational-points")
-async def import_recreational_points(file: UploadFile = File(...)):
-    """Import recreational points (GeoJSON)"""
+async def import_recreational_points(file: UploadFile = File(...), mode: str = Query("replace")):
+    """Import recreational points (GeoJSON, parsed and validated feature by feature)"""
+    validate_import_mode(mode)
     try:
-        content = await file.read()
-        data = json.loads(content.decode('utf-8'))
-        
-        # Validate schema
-        validated_data = RecreationalPointsSchema(**data)
-        
-        # Save to file
-        output_file = DATA_DIR / 'recreational_points_web.geojson'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(validated_data.model_dump(), f, ensure_ascii=False, indent=2)
+        await file.seek(0)
+        if mode != 'replace':
+            added = await COMPUTE_POOL.run(
+                read_feature_delta, file.file, RecreationalPointFeature, FeatureCollectionHeaderSchema
+            )
+            result, _ = await update_point_layer('recreational_points', mode, added=added)
+            return {
+                "success": True,
+                "message": f"Recreational points updated ({mode}): {result['added']} added, {result['updated']} updated, {result['total']} points",
+                "points_count": result['total'],
+                **result
+            }
         
-        # Reload data
-        reload_data()
+        async with DATASET_UPDATE_LOCK:
+            _, layer = await COMPUTE_POOL.run(
+                import_point_layer, 'recreational_points', file.file,
+                RecreationalPointFeature, RecreationalPointsHeaderSchema
+            )
+            
+            # Reload data (loads the freshly written snapshot, invalidates cached analyses)
+            snapshot = await reload_data('recreational_points')
         
         return {
             "success": True,
-            "message": f"Recreational points imported successfully: {len(validated_data.features)} points",
-            "points_count": len(validated_data.features)
+            "message": f"Recreational points imported successfully: {len(layer)} points",
+            "points_count": len(layer),
+            "region_assignment": snapshot.point_regions.summary(REGION_MISMATCH_TOLERANCE_KM)
         }
-    except json.JSONDecodeError as e:
+    except StreamParseError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
+
+@api_router.post("/import/recreational-points/delete")
+async def delete_recreational_points(request: DeleteFeaturesRequest):
+    """Delete recreational points by stable ID"""
+    try:
+        result, _ = await update_point_layer('recreational_points', 'delete', delete_ids=request.ids)
+        return {
+            "success": True,
+            "message": f"Recreational points deleted: {result['removed']} removed, {result['total']} points",
+            "points_count": result['total'],
+            **result
+        }
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
 
 @api_router.post("/import/fires")
-async def import_fires(file: UploadFile = File(...)):
-    """Import forest fires data (GeoJSON)"""
+async def import_fires(file: UploadFile = File(...), mode: str = Query("replace")):
+    """Import forest fires data (GeoJSON, parsed and validated feature by feature)"""
+    validate_import_mode(mode)
     try:
-        content = await file.read()
-        data = json.loads(content.decode('utf-8'))
-        
-        # Validate schema
-        validated_data = ForestFiresSchema(**data)
-        
-        # Save to file
-        output_file = DATA_DIR / 'forest_fires.geojson'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(validated_data.model_dump(), f, ensure_ascii=False, indent=2)
+        await file.seek(0)
+        if mode != 'replace':
+            added = await COMPUTE_POOL.run(
+                read_feature_delta, file.file, FireFeature, FeatureCollectionHeaderSchema
+            )
+            result, snapshot = await update_point_layer('forest_fires', mode, added=added)
+            metadata = snapshot.forest_fires.metadata
+            return {
+                "success": True,
+                "message": f"Forest fires data updated ({mode}): {result['added']} added, {result['updated']} updated, {metadata['total_fires']} fires ({metadata['human_caused']} human-caused)",
+                "total_fires": metadata['total_fires'],
+                "human_caused": metadata['human_caused'],
+                **result
+            }
         
-        # Reload data
-        reload_data()
+        async with DATASET_UPDATE_LOCK:
+            header, _ = await COMPUTE_POOL.run(
+                import_point_layer, 'forest_fires', file.file,
+                FireFeature, ForestFiresHeaderSchema
+            )
+            
+            # Reload data (loads the freshly written snapshot, invalidates cached analyses)
+            snapshot = await reload_data('forest_fires')
         
         return {
             "success": True,
-            "message": f"Forest fires data imported successfully: {validated_data.metadata.total_fires} fires ({validated_data.metadata.human_caused} human-caused)",
-            "total_fires": validated_data.metadata.total_fires,
-            "human_caused": validated_data.metadata.human_caused
+            "message": f"Forest fires data imported successfully: {header.metadata.total_fires} fires ({header.metadata.human_caused} human-caused)",
+            "total_fires": header.metadata.total_fires,
+            "human_caused": header.metadata.human_caused,
+            "region_assignment": snapshot.fire_regions.summary(REGION_MISMATCH_TOLERANCE_KM)
         }
-    except json.JSONDecodeError as e:
+    except StreamParseError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
 
+@api_router.post("/import/fires/delete")
+async def delete_fires(request: DeleteFeaturesRequest):
+    """Delete forest fires by stable ID"""
+    try:
+        result, snapshot = await update_point_layer('forest_fires', 'delete', delete_ids=request.ids)
+        metadata = snapshot.forest_fires.metadata
+        return {
+            "success": True,
+            "message": f"Forest fires deleted: {result['removed']} removed, {metadata['total_fires']} fires ({metadata['human_caused']} human-caused)",
+            "total_fires": metadata['total_fires'],
+            "human_caused": metadata['human_caused'],
+            **result
+        }
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
+
+def import_point_layer(name: str, stream, feature_model, header_model):
+    """
+    Stream an uploaded FeatureCollection into the dataset file and its snapshot
+    (CPU-bound, runs in COMPUTE_POOL); see geojson_import.import_feature_collection
+    """
+    filename = DATASET_FILES[name]
+    return import_feature_collection(
+        stream, DATA_DIR / filename, DATA_DIR / SNAPSHOT_DIRNAME / filename, feature_model, header_model
+    )
+
+def format_ids(ids: List[str], limit: int = 10) -> str:
+    shown = ', '.join(ids[:limit])
+    return shown if len(ids) <= limit else f"{shown} ... ({len(ids)} total)"
+
+async def update_point_layer(name: str, mode: str, added=None, delete_ids: Optional[List[Any]] = None):
+    """
+    Apply a delta to a loaded point layer without re-reading the dataset
+    
+    The layer is merged column by column (ColumnarLayer.apply_delta), the dataset file
+    and its snapshot are rewritten in COMPUTE_POOL; the spatial index is patched and
+    only analyses of the regions affected by the changed features are invalidated.
+    
+    Args:
+        name: 'recreational_points' or 'forest_fires'
+        mode: 'append' (IDs must be new), 'upsert' (features with the same ID are replaced)
+              or 'delete' (features with delete_ids are removed)
+        added: ColumnarLayer with uploaded features (append / upsert)
+    
+    Returns:
+        (result, published snapshot); result - dict with mode, added / updated / removed
+        counts, total, invalidated_regions (and not_found IDs for delete)
+    """
+    async with DATASET_UPDATE_LOCK:
+        snapshot = DATA.latest()
+        layer = getattr(snapshot, name)
+        if layer is None:
+            raise ValueError(f"{name} data is not loaded; import the full dataset first")
+        
+        existing_ids = layer.stable_ids()
+        existing = set(existing_ids)
+        result = {"mode": mode}
+        if mode == 'delete':
+            if not delete_ids:
+                raise ValueError("ids list cannot be empty")
+            removed = list(dict.fromkeys(str(i) for i in delete_ids))
+            result["not_found"] = [i for i in removed if i not in existing]
+            added = ColumnarLayerBuilder().build({"type": "FeatureCollection", "features": None})
+        else:
+            added_ids = added.stable_ids()
+            duplicates = [i for i, count in Counter(added_ids).items() if count > 1]
+            if duplicates:
+                raise ValueError(f"Duplicate feature IDs in upload: {format_ids(duplicates)}")
+            if mode == 'append':
+                conflicts = [i for i in added_ids if i in existing]
+                if conflicts:
+                    raise ValueError(f"Feature IDs already exist (use mode=upsert): {format_ids(conflicts)}")
+            removed = added_ids
+        
+        removed = set(removed)
+        keep = np.fromiter((i not in removed for i in existing_ids), dtype=bool, count=len(existing_ids))
+        removed_count = len(existing_ids) - int(keep.sum())
+        if mode == 'delete':
+            result.update(added=0, updated=0, removed=removed_count)
+        else:
+            result.update(added=len(added) - removed_count, updated=removed_count, removed=0)
+        
+        regions = []
+        if removed_count or len(added):
+            regions = await COMPUTE_POOL.run(delta_affected_regions, snapshot, name, keep, added)
+            snapshot = await COMPUTE_POOL.run(build_delta_snapshot, snapshot, name, keep, added, regions)
+            publish_snapshot(snapshot)
+            logging.info(f"{name}: delta applied, {len(regions)} region analyses invalidated")
+            
+            if MONGO_STORE is not None:
+                new_layer = getattr(snapshot, name)
+                regions_of_features = aggregation_regions(snapshot, name)
+                if regions_of_features is not None:
+                    regions_of_features = regions_of_features[len(new_layer) - len(added):]
+                added_documents = await COMPUTE_POOL.run(
+                    layer_documents, added, added.stable_ids(), 0, None, regions_of_features
+                )
+                await MONGO_STORE.apply_delta(
+                    name, [i for i in dict.fromkeys(existing_ids) if i in removed],
+                    added_documents, new_layer.top_level, new_layer.version
+                )
+        
+        result["total"] = len(getattr(snapshot, name))
+        result["invalidated_regions"] = regions
+        result["region_assignment"] = getattr(snapshot, REGION_ASSIGNMENT_FIELDS[name]).summary(REGION_MISMATCH_TOLERANCE_KM)
+        return result, snapshot
+
+def delta_affected_regions(snapshot: DatasetSnapshot, name: str, keep: np.ndarray, added) -> List[str]:
+    """
+    Regions whose analysis depends on the removed / added features:
+    the regions they are assigned to (see region_assignment_fields)
+    """
+    layer = getattr(snapshot, name)
+    removed = np.flatnonzero(~keep)
+    polygons = snapshot.region_polygons
+    if not polygon_regions(snapshot):
+        regions = {layer.property_value('region', int(i)) for i in removed}
+        regions.update(added.property_value('region', i) for i in range(len(added)))
+        return sorted(region for region in regions if region is not None)
+    
+    codes = set(getattr(snapshot, REGION_ASSIGNMENT_FIELDS[name]).codes[removed].tolist())
+    codes.update(RegionAssignment.compute(polygons, added, layer_points(added), True).codes.tolist())
+    return sorted(polygons.names[code] for code in codes if code >= 0)
+
+def write_point_layer_delta(name: str, layer, keep: np.ndarray, added):
+    """
+    Merge a delta into the layer and write the dataset file + snapshot
+    (CPU-bound, runs in COMPUTE_POOL); metadata counts are updated to match the features
+    """
+    new_layer = layer.apply_delta(keep, added)
+    metadata = dict(new_layer.metadata)
+    if name == 'forest_fires':
+        human_caused = int(np.count_nonzero(new_layer.equals_mask('cause_type', HUMAN_CAUSE)))
+        metadata.update(total_fires=len(new_layer), human_caused=human_caused, other_causes=len(new_layer) - human_caused)
+        if 'regions' in metadata and 'region' in new_layer.columns:
+            present = [region for region in new_layer.columns['region'].values if region is not None]
+            metadata['regions'] = (
+                [region for region in metadata['regions'] if region in present] +
+                [region for region in present if region not in metadata['regions']]
+            )
+    elif 'total' in metadata:
+        metadata['total'] = len(new_layer)
+    new_layer.top_level = [[key, metadata if key == 'metadata' else value] for key, value in new_layer.top_level]
+    
+    filename = DATASET_FILES[name]
+    return write_layer(new_layer, DATA_DIR / filename, DATA_DIR / SNAPSHOT_DIRNAME / filename)
+
+def build_delta_snapshot(previous: DatasetSnapshot, name: str, keep: np.ndarray, added, regions: List[str]) -> DatasetSnapshot:
+    """
+    Snapshot with a delta merged into a point layer (CPU-bound, runs in COMPUTE_POOL):
+    the spatial index is patched instead of rebuilt, the dataset version changes
+    only for the affected regions' analyses
+    """
+    layer = write_point_layer_delta(name, getattr(previous, name), keep, added)
+    added_points = GeoPoints(added.lat, added.lng)
+    if name == 'recreational_points':
+        fields = point_layer_fields(layer, previous.recreational_index.updated(keep, added_points))
+    else:
+        fields = fire_layer_fields(layer, previous.fires_index.updated(keep, added_points))
+    assignment = getattr(previous, REGION_ASSIGNMENT_FIELDS[name]).updated(
+        keep, RegionAssignment.compute(previous.region_polygons, added, added_points, USE_POLYGON_REGIONS)
+    )
+    
+    base_version, affected = previous.region_versions.get(name, (previous.versions.get(name), {}))
+    region_versions = dict(previous.region_versions)
+    region_versions[name] = (base_version, {**affected, **dict.fromkeys(regions, layer.version)})
+    snapshot = previous.replace(
+        versions={**previous.versions, name: layer.version},
+        region_versions=region_versions,
+        **fields
+    )
+    snapshot = snapshot.replace(**region_assignment_fields(snapshot, [name], {name: assignment}))
+    return with_region_tables(snapshot)
 
 # ===== DATA BACKUP ENDPOINTS =====
 from fastapi.responses import StreamingResponse
@@ -1580,6 +2560,9 @@ async def backup_info():
 # Include router
 app.include_router(api_router)
 
+# Each request reads one DatasetSnapshot from start to finish (see DATA)
+app.add_middleware(SnapshotPinningMiddleware, published=DATA)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -1596,4 +2579,10 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    if MONGO_SYNC_TASK is not None:
+        MONGO_SYNC_TASK.cancel()
+    MONGO.close()
+
+@app.on_event("shutdown")
+async def shutdown_compute_pool():
+    COMPUTE_POOL.shutdown()
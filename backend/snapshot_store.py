@@ -0,0 +1,546 @@
+"""
+Compiled columnar snapshots of the GeoJSON point layers
+A snapshot directory holds coordinates and property columns as .npy files
+(memory-mapped at startup) plus interned value tables per property, so the
+server does not json-parse the large GeoJSON files on every start/reload.
+Snapshots are recompiled from the JSON source when it changes.
+
+Layout of <DATA_DIR>/.snapshots/<source filename>/:
+    meta.json          - source fingerprint, top-level keys, column list
+    lng.npy, lat.npy   - float64 coordinates (NaN = no coordinates)
+    geometry.npy       - codes: -1 = Point(lng, lat), else index in geometries.json
+    schema.npy         - codes into schemas.json (property key order)
+    id.npy             - codes into id.json (GeoJSON feature id, null = none)
+    c<N>.npy           - float64 column or codes into c<N>.json
+Code arrays use the narrowest signed integer type that fits their table.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+SNAPSHOT_FORMAT_VERSION = 3
+
+# Код "значення відсутнє" у колонках кодів
+MISSING_CODE = -1
+
+
+def _intern_key(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def code_dtype(table_size: int) -> np.dtype:
+    """Найменший знаковий цілий тип для кодів таблиці такого розміру"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if table_size <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class Column:
+    """
+    Колонка властивості features
+
+    kind == 'float': data - float64 значення (всі значення колонки були float)
+    kind == 'values': data - цілі коди (int8/16/32 за розміром таблиці) в таблицю
+                      різних значень; кожен текст зберігається один раз, таблиця
+                      завантажується ліниво при першому зверненні
+    """
+
+    __slots__ = ('key', 'kind', 'data', '_values', '_values_path', '_codes')
+
+    def __init__(self, key: str, kind: str, data: np.ndarray, values: Optional[List[Any]] = None,
+                 values_path: Optional[Path] = None):
+        self.key = key
+        self.kind = kind
+        self.data = data
+        self._values = values
+        self._values_path = values_path
+        self._codes: Optional[Dict[str, int]] = None
+
+    @property
+    def values(self) -> List[Any]:
+        """Таблиця різних значень (для kind == 'values')"""
+        if self._values is None:
+            if self._values_path is None:
+                self._values = []
+            else:
+                with open(self._values_path, 'r', encoding='utf-8') as f:
+                    self._values = json.load(f)
+        return self._values
+
+    def value(self, idx: int) -> Any:
+        if self.kind == 'float':
+            return float(self.data[idx])
+        code = int(self.data[idx])
+        return None if code == MISSING_CODE else self.values[code]
+
+    def code_of(self, value: Any) -> int:
+        """Код значення в таблиці (MISSING_CODE, якщо значення немає)"""
+        if self._codes is None:
+            self._codes = {_intern_key(v): code for code, v in enumerate(self.values)}
+        return self._codes.get(_intern_key(value), MISSING_CODE)
+
+
+class ColumnarLayer:
+    """
+    Точковий шар у колонковому вигляді (struct-of-arrays)
+
+    Гарячі колонки (координати, коди region / cause_type) - компактні масиви
+    NumPy; холодні текстові властивості (description, amenities, cause, ...)
+    - коди в інтерновані таблиці, що читаються лише при запиті feature.
+    Дерева dict features не зберігаються: properties()/feature() будують
+    їх на вимогу, to_geojson() - тимчасово для серіалізації.
+    """
+
+    __slots__ = ('lng', 'lat', 'geometry_codes', 'geometries', 'schema_codes', 'schemas', 'columns',
+                 'ids', 'top_level', 'version')
+
+    def __init__(self, lng: np.ndarray, lat: np.ndarray, geometry_codes: np.ndarray, geometries: List[Any],
+                 schema_codes: np.ndarray, schemas: List[Optional[List[str]]], columns: Dict[str, Column],
+                 top_level: List[List[Any]], version: Optional[str] = None, ids: Optional[Column] = None):
+        self.lng = lng
+        self.lat = lat
+        self.geometry_codes = geometry_codes
+        self.geometries = geometries
+        self.schema_codes = schema_codes
+        self.schemas = schemas
+        self.columns = columns
+        # GeoJSON id кожної feature (None - без id)
+        self.ids = ids if ids is not None else _column_from_codes('id', np.zeros(len(lng), dtype=np.int64), [None])
+        # [[key, value], ...] у вихідному порядку; 'features' - без значення
+        self.top_level = top_level
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.lng)
+
+    @property
+    def metadata(self) -> dict:
+        """Поле metadata верхнього рівня FeatureCollection"""
+        for key, value in self.top_level:
+            if key == 'metadata':
+                return value or {}
+        return {}
+
+    def property_value(self, key: str, idx: int) -> Any:
+        """Значення властивості feature (None, якщо властивості немає)"""
+        schema = self.schemas[int(self.schema_codes[idx])]
+        if not schema or key not in schema:
+            return None
+        return self.columns[key].value(idx)
+
+    def equals_mask(self, key: str, value: Any) -> np.ndarray:
+        """Булева маска features з properties[key] == value (за кодами колонки)"""
+        column = self.columns.get(key)
+        if column is None:
+            return np.zeros(len(self), dtype=bool)
+        if column.kind == 'float':
+            return np.asarray(column.data) == value if type(value) is float else np.zeros(len(self), dtype=bool)
+        code = column.code_of(value)
+        if code == MISSING_CODE:
+            return np.zeros(len(self), dtype=bool)
+        return np.asarray(column.data) == code
+
+    def numeric_column(self, key: str, parse: Callable[[Any], Optional[float]],
+                       failed_value: float = np.nan) -> Tuple[np.ndarray, np.ndarray, List[Any]]:
+        """
+        Властивість як масив float64 (parse викликається раз на кожне різне значення)
+
+        Args:
+            parse: value -> float, або None якщо значення не вдалося розібрати
+            failed_value: Значення в масиві для нерозібраних значень
+
+        Returns:
+            (масив float64, маска features з нерозібраним значенням,
+             список різних значень, які не вдалося розібрати)
+        """
+        column = self.columns.get(key)
+        if column is None:
+            value = parse(None)
+            failed = np.full(len(self), value is None)
+            return np.full(len(self), failed_value if value is None else value), failed, []
+        if column.kind == 'float':
+            return np.array(column.data, dtype=np.float64), np.zeros(len(self), dtype=bool), []
+
+        parsed = [parse(v) for v in column.values]
+        failures = [v for v, number in zip(column.values, parsed) if number is None]
+        table = np.array([failed_value if number is None else number for number in parsed], dtype=np.float64)
+        failed_table = np.array([number is None for number in parsed], dtype=bool)
+        codes = np.asarray(column.data, dtype=np.int64)
+        return table[codes], failed_table[codes], failures
+
+    def properties(self, idx: int) -> Optional[dict]:
+        schema = self.schemas[int(self.schema_codes[idx])]
+        if schema is None:
+            return None
+        return {key: self.columns[key].value(idx) for key in schema}
+
+    def geometry(self, idx: int) -> Any:
+        code = int(self.geometry_codes[idx])
+        if code == MISSING_CODE:
+            return {"type": "Point", "coordinates": [float(self.lng[idx]), float(self.lat[idx])]}
+        return self.geometries[code]
+
+    def feature(self, idx: int) -> dict:
+        feature_id = self.ids.value(idx)
+        if feature_id is None:
+            return {"type": "Feature", "geometry": self.geometry(idx), "properties": self.properties(idx)}
+        return {"type": "Feature", "id": feature_id, "geometry": self.geometry(idx), "properties": self.properties(idx)}
+
+    def stable_ids(self) -> List[str]:
+        """
+        Стабільні ідентифікатори features для delta-імпорту:
+        GeoJSON id, якщо він є, інакше "назва@lng,lat"
+        """
+        result = []
+        for idx in range(len(self)):
+            feature_id = self.ids.value(idx)
+            if feature_id is not None:
+                result.append(str(feature_id))
+            else:
+                result.append(f"{self.property_value('name', idx)}@{float(self.lng[idx])!r},{float(self.lat[idx])!r}")
+        return result
+
+    def apply_delta(self, keep: np.ndarray, added: "ColumnarLayer", top_level: Optional[List[List[Any]]] = None,
+                    version: Optional[str] = None) -> "ColumnarLayer":
+        """
+        Новий шар: features цього шару з keep[i] == True, за ними - всі features added
+
+        Колонки зливаються на рівні кодів (таблиці значень об'єднуються,
+        невживані значення відкидаються) - features не відновлюються
+        і JSON не розбирається.
+
+        Args:
+            keep: Булева маска features, що залишаються
+            added: Шар з новими features
+            top_level: Ключі верхнього рівня результату (default - як у цього шару)
+        """
+        keep = np.asarray(keep, dtype=bool)
+        count, added_count = int(keep.sum()), len(added)
+
+        def merged(key, column_a, column_b, allow_float=True):
+            codes_a, table_a = _column_codes(column_a, len(self))
+            codes_b, table_b = _column_codes(column_b, added_count)
+            codes, table = _merge_codes(codes_a[keep], table_a, codes_b, table_b)
+            return _column_from_codes(key, codes, table, allow_float)
+
+        geometry_codes, geometries = _merge_codes(
+            np.asarray(self.geometry_codes, dtype=np.int64)[keep], self.geometries,
+            np.asarray(added.geometry_codes, dtype=np.int64), added.geometries
+        )
+        geometry_codes, geometries = _compact(geometry_codes, geometries)
+        schema_codes, schemas = _merge_codes(
+            np.asarray(self.schema_codes, dtype=np.int64)[keep], self.schemas,
+            np.asarray(added.schema_codes, dtype=np.int64), added.schemas
+        )
+        schema_codes, schemas = _compact(schema_codes, schemas)
+
+        columns = {}
+        for key in list(self.columns) + [k for k in added.columns if k not in self.columns]:
+            columns[key] = merged(key, self.columns.get(key), added.columns.get(key))
+        if count + added_count:
+            columns = {key: column for key, column in columns.items()
+                       if any(schema and key in schema for schema in schemas)}
+
+        return ColumnarLayer(
+            np.concatenate([np.asarray(self.lng)[keep], added.lng]),
+            np.concatenate([np.asarray(self.lat)[keep], added.lat]),
+            geometry_codes.astype(code_dtype(len(geometries))), geometries,
+            schema_codes.astype(code_dtype(len(schemas))), schemas,
+            columns,
+            top_level if top_level is not None else self.top_level,
+            version,
+            ids=merged('id', self.ids, added.ids, allow_float=False)
+        )
+
+    def to_geojson(self) -> dict:
+        """Відновити FeatureCollection з колонок"""
+        result = {}
+        for key, value in self.top_level:
+            result[key] = [self.feature(i) for i in range(len(self))] if key == 'features' else value
+        return result
+
+    @classmethod
+    def from_geojson(cls, geojson: dict, version: Optional[str] = None) -> "ColumnarLayer":
+        """Скомпілювати шар з GeoJSON FeatureCollection"""
+        builder = ColumnarLayerBuilder()
+        for feature in geojson.get('features') or []:
+            builder.add(feature)
+        return builder.build(geojson, version)
+
+
+class _InternedValues:
+    """Коди значень однієї властивості, що накопичуються по одній feature"""
+
+    __slots__ = ('codes', 'values', 'index')
+
+    def __init__(self, prefix_count: int = 0):
+        self.codes = array('q')
+        self.values: List[Any] = []
+        self.index: Dict[str, int] = {}
+        for _ in range(prefix_count):
+            self.append(None)
+
+    def append(self, value: Any):
+        key = _intern_key(value)
+        code = self.index.get(key)
+        if code is None:
+            code = self.index[key] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+
+class ColumnarLayerBuilder:
+    """
+    Інкрементна компіляція шару: features додаються по одній (add),
+    тож для побудови не потрібне дерево всього GeoJSON у пам'яті
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.lng = array('d')
+        self.lat = array('d')
+        self.geometry_codes = array('q')
+        self.geometries: List[Any] = []
+        self._geometry_index: Dict[str, int] = {}
+        self.schema_codes = array('q')
+        self.schemas: List[Optional[List[str]]] = []
+        self._schema_index: Dict[str, int] = {}
+        self.columns: Dict[str, _InternedValues] = {}
+        self.ids = _InternedValues()
+
+    def add(self, feature: dict):
+        self.ids.append(feature.get('id'))
+        geometry = feature.get('geometry')
+        coords = (geometry or {}).get('coordinates')
+        if isinstance(coords, list) and len(coords) >= 2 and all(isinstance(c, (int, float)) for c in coords[:2]):
+            self.lng.append(coords[0])
+            self.lat.append(coords[1])
+        else:
+            self.lng.append(np.nan)
+            self.lat.append(np.nan)
+
+        is_plain_point = (
+            isinstance(geometry, dict) and list(geometry) == ['type', 'coordinates']
+            and geometry['type'] == 'Point' and isinstance(coords, list) and len(coords) == 2
+            and all(type(c) is float for c in coords)
+        )
+        if is_plain_point:
+            self.geometry_codes.append(MISSING_CODE)
+        else:
+            key = _intern_key(geometry)
+            if key not in self._geometry_index:
+                self._geometry_index[key] = len(self.geometries)
+                self.geometries.append(geometry)
+            self.geometry_codes.append(self._geometry_index[key])
+
+        properties = feature.get('properties', {})
+        schema = list(properties) if isinstance(properties, dict) else None
+        schema_key = _intern_key(schema)
+        if schema_key not in self._schema_index:
+            self._schema_index[schema_key] = len(self.schemas)
+            self.schemas.append(schema)
+        self.schema_codes.append(self._schema_index[schema_key])
+
+        for key in schema or ():
+            if key not in self.columns:
+                self.columns[key] = _InternedValues(prefix_count=self.count)
+        for key, column in self.columns.items():
+            column.append(properties.get(key) if schema is not None else None)
+        self.count += 1
+
+    def build(self, top_level: dict, version: Optional[str] = None) -> ColumnarLayer:
+        """
+        Args:
+            top_level: Ключі верхнього рівня FeatureCollection у вихідному порядку
+                       (значення 'features' ігнорується)
+        """
+        columns = {
+            key: _column_from_codes(key, np.array(interned.codes, dtype=np.int64), interned.values)
+            for key, interned in self.columns.items()
+        }
+
+        return ColumnarLayer(
+            np.array(self.lng, dtype=np.float64), np.array(self.lat, dtype=np.float64),
+            np.array(self.geometry_codes, dtype=np.int64).astype(code_dtype(len(self.geometries))), self.geometries,
+            np.array(self.schema_codes, dtype=np.int64).astype(code_dtype(len(self.schemas))), self.schemas,
+            columns,
+            [[key, None if key == 'features' else value] for key, value in top_level.items()],
+            version,
+            ids=_column_from_codes('id', np.array(self.ids.codes, dtype=np.int64), self.ids.values, allow_float=False)
+        )
+
+
+def _column_codes(column: Optional[Column], count: int) -> Tuple[np.ndarray, List[Any]]:
+    """(коди int64, таблиця значень) колонки; float-колонка інтернується, відсутня - всі None"""
+    if column is None:
+        return np.zeros(count, dtype=np.int64), [None]
+    if column.kind == 'float':
+        table, codes = np.unique(np.asarray(column.data), return_inverse=True)
+        return codes.reshape(-1).astype(np.int64), table.tolist()
+    return np.asarray(column.data, dtype=np.int64), column.values
+
+
+def _merge_codes(codes_a: np.ndarray, table_a: List[Any], codes_b: np.ndarray,
+                 table_b: List[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Об'єднати дві закодовані послідовності: значення table_b додаються в кінець table_a"""
+    table = list(table_a)
+    index = {_intern_key(v): i for i, v in enumerate(table)}
+    mapping = np.empty(len(table_b), dtype=np.int64)
+    for j, value in enumerate(table_b):
+        key = _intern_key(value)
+        if key not in index:
+            index[key] = len(table)
+            table.append(value)
+        mapping[j] = index[key]
+    if len(codes_b) and len(mapping):
+        codes_b = np.where(codes_b == MISSING_CODE, MISSING_CODE, mapping[np.maximum(codes_b, 0)])
+    return np.concatenate([codes_a, codes_b]), table
+
+
+def _compact(codes: np.ndarray, table: List[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Відкинути значення таблиці, на які не посилається жоден код"""
+    used = np.unique(codes[codes != MISSING_CODE])
+    if len(used) == len(table):
+        return codes, table
+    mapping = np.full(len(table), MISSING_CODE, dtype=np.int64)
+    mapping[used] = np.arange(len(used))
+    codes = np.where(codes == MISSING_CODE, MISSING_CODE, mapping[np.maximum(codes, 0)])
+    return codes, [table[i] for i in used.tolist()]
+
+
+def _column_from_codes(key: str, codes: np.ndarray, table: List[Any], allow_float: bool = True) -> Column:
+    """Column з кодів: float64, якщо всі значення - float, інакше коди найменшого типу"""
+    codes, table = _compact(codes, table)
+    if allow_float and len(codes) and all(type(v) is float for v in table):
+        return Column(key, 'float', np.array(table, dtype=np.float64)[codes])
+    return Column(key, 'values', codes.astype(code_dtype(len(table))), values=table)
+
+
+def source_fingerprint(source_path: Path) -> Dict[str, int]:
+    stat = source_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_snapshot(layer: ColumnarLayer, directory: Path, fingerprint: Dict[str, int]):
+    """
+    Записати шар у каталог snapshot (атомарно: через тимчасовий каталог)
+    """
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = directory.with_name(f"{directory.name}.tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir()
+
+    np.save(tmp_dir / 'lng.npy', np.ascontiguousarray(layer.lng, dtype=np.float64))
+    np.save(tmp_dir / 'lat.npy', np.ascontiguousarray(layer.lat, dtype=np.float64))
+    np.save(tmp_dir / 'geometry.npy', np.ascontiguousarray(layer.geometry_codes))
+    np.save(tmp_dir / 'schema.npy', np.ascontiguousarray(layer.schema_codes))
+    with open(tmp_dir / 'geometries.json', 'w', encoding='utf-8') as f:
+        json.dump(layer.geometries, f, ensure_ascii=False)
+    with open(tmp_dir / 'schemas.json', 'w', encoding='utf-8') as f:
+        json.dump(layer.schemas, f, ensure_ascii=False)
+    np.save(tmp_dir / 'id.npy', np.ascontiguousarray(layer.ids.data))
+    with open(tmp_dir / 'id.json', 'w', encoding='utf-8') as f:
+        json.dump(layer.ids.values, f, ensure_ascii=False)
+
+    column_meta = []
+    for n, (key, column) in enumerate(layer.columns.items()):
+        np.save(tmp_dir / f'c{n}.npy', np.ascontiguousarray(column.data))
+        if column.kind == 'values':
+            with open(tmp_dir / f'c{n}.json', 'w', encoding='utf-8') as f:
+                json.dump(column.values, f, ensure_ascii=False)
+        column_meta.append({"key": key, "kind": column.kind, "file": f'c{n}'})
+
+    meta = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "source": fingerprint,
+        "version": layer.version,
+        "count": len(layer),
+        "top_level": layer.top_level,
+        "columns": column_meta,
+    }
+    with open(tmp_dir / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    if directory.exists():
+        shutil.rmtree(directory)
+    os.replace(tmp_dir, directory)
+
+
+def read_snapshot_meta(directory: Path) -> Optional[dict]:
+    try:
+        with open(directory / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return meta
+
+
+def load_snapshot(directory: Path, meta: Optional[dict] = None) -> ColumnarLayer:
+    """Завантажити snapshot (масиви - memory-mapped, таблиці значень - ліниво)"""
+    meta = meta or read_snapshot_meta(directory)
+    if meta is None:
+        raise ValueError(f"Invalid snapshot: {directory}")
+
+    def mmap(name):
+        return np.load(directory / f'{name}.npy', mmap_mode='r')
+
+    with open(directory / 'geometries.json', 'r', encoding='utf-8') as f:
+        geometries = json.load(f)
+    with open(directory / 'schemas.json', 'r', encoding='utf-8') as f:
+        schemas = json.load(f)
+
+    columns = {}
+    for column_meta in meta['columns']:
+        values_path = directory / f"{column_meta['file']}.json" if column_meta['kind'] == 'values' else None
+        columns[column_meta['key']] = Column(
+            column_meta['key'], column_meta['kind'], mmap(column_meta['file']), values_path=values_path
+        )
+
+    return ColumnarLayer(
+        mmap('lng'), mmap('lat'), mmap('geometry'), geometries,
+        mmap('schema'), schemas, columns, meta['top_level'], meta.get('version'),
+        ids=Column('id', 'values', mmap('id'), values_path=directory / 'id.json')
+    )
+
+
+def load_or_compile(source_path: Path, snapshot_dir: Path) -> Optional[ColumnarLayer]:
+    """
+    Завантажити шар зі snapshot або скомпілювати його з GeoJSON
+
+    Snapshot використовується, якщо розмір і mtime джерела збігаються
+    з тими, з яких він скомпільований. Інакше джерело читається,
+    компілюється і snapshot перезаписується (помилка запису не критична).
+
+    Returns:
+        ColumnarLayer з version = sha1 вмісту джерела, або None якщо джерела немає
+    """
+    if not source_path.exists():
+        return None
+
+    fingerprint = source_fingerprint(source_path)
+    meta = read_snapshot_meta(snapshot_dir)
+    if meta is not None and meta.get('source') == fingerprint:
+        try:
+            return load_snapshot(snapshot_dir, meta)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Snapshot {snapshot_dir} unreadable, recompiling: {e}")
+
+    raw = source_path.read_bytes()
+    layer = ColumnarLayer.from_geojson(json.loads(raw.decode('utf-8')), version=hashlib.sha1(raw).hexdigest())
+    try:
+        write_snapshot(layer, snapshot_dir, fingerprint)
+    except OSError as e:
+        logging.warning(f"Could not write snapshot {snapshot_dir}: {e}")
+    return layer
@@ -0,0 +1,188 @@
+"""
+Spatial Index for point layers (recreational points, forest fires)
+Grid bucket index over lat/lng cells - radius queries touch only nearby cells
+instead of scanning every feature of the layer
+"""
+import math
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from geodesic import EARTH_RADIUS_KM, GeoPoints, haversine_one_to_many
+
+
+# Розмір клітинки сітки в градусах (~28 км по широті)
+DEFAULT_CELL_SIZE_DEG = 0.25
+
+
+class GridIndex:
+    """
+    Сіткова просторова індексація точок
+
+    Кожна точка потрапляє в клітинку (row, col) розміром cell_size_deg.
+    Запит за радіусом обчислює консервативний bounding box навколо центру
+    і перевіряє формулою Haversine (одним викликом NumPy) лише точки
+    з клітинок цього box.
+    """
+
+    def __init__(self, points: GeoPoints, cell_size_deg: float = DEFAULT_CELL_SIZE_DEG):
+        """
+        Args:
+            points: Точки у порядку features; точки без координат (NaN)
+                    не індексуються
+            cell_size_deg: Розмір клітинки сітки в градусах
+        """
+        self.cell_size_deg = cell_size_deg
+        self.points = points
+        self.cells: Dict[Tuple[int, int], np.ndarray] = self._group_cells(np.flatnonzero(self.points.valid))
+
+    def _group_cells(self, indices: np.ndarray) -> Dict[Tuple[int, int], np.ndarray]:
+        """Згрупувати індекси точок (з координатами) за клітинками, всередині клітинки - за зростанням"""
+        if len(indices) == 0:
+            return {}
+
+        rows = np.floor(self.points.lat_deg[indices] / self.cell_size_deg).astype(np.int64)
+        cols = np.floor(self.points.lng_deg[indices] / self.cell_size_deg).astype(np.int64)
+
+        order = np.lexsort((indices, cols, rows))
+        rows, cols, indices = rows[order], cols[order], indices[order]
+        boundaries = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 0)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(indices)]))
+        return {
+            (int(rows[start]), int(cols[start])): indices[start:end]
+            for start, end in zip(starts.tolist(), ends.tolist())
+        }
+
+    def updated(self, keep: np.ndarray, added: GeoPoints) -> "GridIndex":
+        """
+        Новий індекс після видалення точок (keep[i] == False) і додавання
+        added у кінець - без повної перебудови: масиви клітинок лише
+        перенумеровуються, нові точки розкладаються по своїх клітинках
+
+        Args:
+            keep: Булева маска точок, що залишаються
+            added: Нові точки (індекси після всіх, що залишились)
+        """
+        keep = np.asarray(keep, dtype=bool)
+        kept_count = int(keep.sum())
+        index = GridIndex.__new__(GridIndex)
+        index.cell_size_deg = self.cell_size_deg
+        index.points = GeoPoints(
+            np.concatenate([self.points.lat_deg[keep], added.lat_deg]),
+            np.concatenate([self.points.lng_deg[keep], added.lng_deg])
+        )
+
+        if kept_count == len(self.points):
+            cells = dict(self.cells)
+        else:
+            new_positions = np.cumsum(keep) - 1
+            cells = {}
+            for cell, members in self.cells.items():
+                members = new_positions[members[keep[members]]]
+                if len(members):
+                    cells[cell] = members
+
+        new_indices = kept_count + np.flatnonzero(added.valid)
+        for cell, members in index._group_cells(new_indices).items():
+            cells[cell] = np.concatenate([cells[cell], members]) if cell in cells else members
+        index.cells = cells
+        return index
+
+    @classmethod
+    def from_coordinates(cls, coordinates: Sequence[Optional[Tuple[float, float]]], cell_size_deg: float = DEFAULT_CELL_SIZE_DEG) -> "GridIndex":
+        """Побудувати індекс зі списку (lat, lng) або None"""
+        return cls(GeoPoints.from_coordinates(coordinates), cell_size_deg=cell_size_deg)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_size_deg), math.floor(lng / self.cell_size_deg))
+
+    def _candidate_cells(self, lat: float, lng: float, radius_km: float) -> Iterable[Tuple[int, int]]:
+        """Клітинки, що перетинають bounding box кола радіусом radius_km"""
+        angular_radius = radius_km / EARTH_RADIUS_KM
+        dlat = math.degrees(angular_radius)
+
+        # Bounding box за довготою (Matuschek, "Finding Points Within a Distance")
+        min_lat, max_lat = lat - dlat, lat + dlat
+        if min_lat <= -90 or max_lat >= 90:
+            dlng = 180.0
+        else:
+            ratio = math.sin(angular_radius) / math.cos(math.radians(lat))
+            dlng = 180.0 if ratio >= 1 else math.degrees(math.asin(ratio))
+
+        if dlng >= 180.0 or lng - dlng < -180.0 or lng + dlng > 180.0:
+            # Коло охоплює полюс або перетинає антимеридіан - перевіряємо всі клітинки
+            return list(self.cells.keys())
+
+        return self._cells_in_box(min_lat, lng - dlng, max_lat, lng + dlng)
+
+    def _cells_in_box(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> Iterable[Tuple[int, int]]:
+        """Клітинки, що перетинають прямокутник у градусах"""
+        row_min, col_min = self._cell(min_lat, min_lng)
+        row_max, col_max = self._cell(max_lat, max_lng)
+
+        # Якщо box більший за кількість заповнених клітинок - простіше пройти по них
+        if (row_max - row_min + 1) * (col_max - col_min + 1) > len(self.cells):
+            return [
+                cell for cell in self.cells
+                if row_min <= cell[0] <= row_max and col_min <= cell[1] <= col_max
+            ]
+
+        return [
+            (row, col)
+            for row in range(row_min, row_max + 1)
+            for col in range(col_min, col_max + 1)
+        ]
+
+    def query_radius(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        """
+        Знайти всі точки в радіусі від заданих координат
+
+        Args:
+            lat, lng: Центр пошуку
+            radius_km: Радіус пошуку в км
+
+        Returns:
+            Відсортований масив індексів точок (позиції у вихідному списку)
+        """
+        buckets = [self.cells[cell] for cell in self._candidate_cells(lat, lng, radius_km) if cell in self.cells]
+        if not buckets:
+            return np.empty(0, dtype=np.int64)
+
+        candidates = np.concatenate(buckets)
+        distances = haversine_one_to_many(lat, lng, self.points, candidates)
+        return np.sort(candidates[distances <= radius_km])
+
+    def query_bbox(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> np.ndarray:
+        """
+        Знайти всі точки всередині прямокутника (межі включно)
+
+        Returns:
+            Відсортований масив індексів точок
+        """
+        if min_lat > max_lat or min_lng > max_lng:
+            return np.empty(0, dtype=np.int64)
+
+        buckets = [self.cells[cell] for cell in self._cells_in_box(min_lat, min_lng, max_lat, max_lng) if cell in self.cells]
+        if not buckets:
+            return np.empty(0, dtype=np.int64)
+
+        candidates = np.concatenate(buckets)
+        lat = self.points.lat_deg[candidates]
+        lng = self.points.lng_deg[candidates]
+        inside = (lat >= min_lat) & (lat <= max_lat) & (lng >= min_lng) & (lng <= max_lng)
+        return np.sort(candidates[inside])
+
+    def count_radius(self, lat: float, lng: float, radius_km: float) -> int:
+        """Кількість точок у радіусі від заданих координат"""
+        return len(self.query_radius(lat, lng, radius_km))
+
+
+def build_layer_index(layer, cell_size_deg: float = DEFAULT_CELL_SIZE_DEG) -> GridIndex:
+    """Побудувати GridIndex для колонкового шару (snapshot_store.ColumnarLayer) або None"""
+    if layer is None:
+        return GridIndex.from_coordinates([], cell_size_deg=cell_size_deg)
+    return GridIndex(GeoPoints(layer.lat, layer.lng), cell_size_deg=cell_size_deg)
@@ -0,0 +1,134 @@
+"""
+Pre-serialized payloads for large static GeoJSON endpoints
+Each dataset version is serialized to JSON once, stored pre-compressed
+(gzip, and Brotli when the optional `brotli` package is installed) and
+served with strong ETags and If-None-Match -> 304 handling
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional - gzip is always available
+    brotli = None
+
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+
+def serialize_json(content: Any) -> bytes:
+    """Serialize exactly like fastapi.responses.JSONResponse.render"""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class EncodedPayload:
+    """
+    JSON-тіло відповіді у всіх підтримуваних кодуваннях
+
+    Кожне кодування має власний strong ETag (різні байти = різні представлення),
+    але всі вони вважаються актуальними для If-None-Match.
+    """
+
+    def __init__(self, content: Any, media_type: str = "application/json"):
+        self.media_type = media_type
+        body = serialize_json(content)
+        digest = hashlib.sha1(body).hexdigest()
+
+        # encoding -> (bytes, etag); None = без стиснення
+        self.variants: Dict[Optional[str], Tuple[bytes, str]] = {
+            None: (body, f'"{digest}"'),
+            "gzip": (gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), f'"{digest}-gzip"'),
+        }
+        if brotli is not None:
+            self.variants["br"] = (brotli.compress(body, quality=BROTLI_QUALITY), f'"{digest}-br"')
+
+    @property
+    def etags(self) -> List[str]:
+        return [etag for _, etag in self.variants.values()]
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Обрати кодування за заголовком Accept-Encoding (br > gzip > identity)"""
+        accepted = set()
+        for item in accept_encoding.split(","):
+            parts = [p.strip() for p in item.split(";")]
+            coding = parts[0].lower()
+            qvalue = 1.0
+            for param in parts[1:]:
+                if param.startswith("q="):
+                    try:
+                        qvalue = float(param[2:])
+                    except ValueError:
+                        qvalue = 0.0
+            if coding and qvalue > 0:
+                accepted.add(coding)
+
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return None
+
+    def matches(self, if_none_match: str) -> bool:
+        """Чи збігається If-None-Match з будь-яким ETag цього payload (weak comparison)"""
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return any(etag in candidates for etag in self.etags)
+
+
+class PayloadCache:
+    """Кеш EncodedPayload по назві датасету, дійсний для однієї версії даних"""
+
+    def __init__(self):
+        self._payloads: Dict[str, Tuple[Optional[str], EncodedPayload]] = {}
+
+    def lookup(self, name: str, version: Optional[str]) -> Optional[EncodedPayload]:
+        entry = self._payloads.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        return None
+
+    def build(self, name: str, version: Optional[str], content_factory: Callable[[], Any],
+              media_type: str = "application/json") -> EncodedPayload:
+        """Серіалізувати й стиснути дані (CPU-bound) та зберегти для цієї версії"""
+        payload = EncodedPayload(content_factory(), media_type=media_type)
+        self._payloads[name] = (version, payload)
+        return payload
+
+    def clear(self):
+        self._payloads.clear()
+
+
+def payload_response(request: Request, payload: EncodedPayload) -> Response:
+    """
+    HTTP-відповідь для payload з урахуванням Accept-Encoding та If-None-Match
+
+    Returns:
+        304 Not Modified, якщо клієнт уже має актуальну версію; інакше 200
+        з тілом у найкращому підтримуваному кодуванні
+    """
+    encoding = payload.negotiate(request.headers.get("accept-encoding", ""))
+    body, etag = payload.variants[encoding]
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and payload.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=payload.media_type, headers=headers)
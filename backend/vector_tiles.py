@@ -0,0 +1,394 @@
+"""
+Mapbox Vector Tiles (MVT 2.1) cut from the in-memory datasets
+Point layers are selected through the grid spatial index, polygon layers are
+projected once, simplified per zoom level (Douglas-Peucker) and clipped to the
+buffered tile. Tiles are encoded with a minimal protobuf writer (no extra
+dependencies) and cached per dataset version
+"""
+import math
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from spatial_index import GridIndex
+
+
+EXTENT = 4096
+BUFFER = 64
+MAX_ZOOM = 22
+
+# Допуск спрощення полігонів - у пікселях тайла 256px
+SIMPLIFY_TOLERANCE_PX = 1.0
+
+MAX_MERCATOR_LAT = 85.0511287798
+
+GEOM_POINT = 1
+GEOM_POLYGON = 3
+
+CMD_MOVE_TO = 1
+CMD_LINE_TO = 2
+CMD_CLOSE_PATH = 7
+
+
+# ===== Protobuf encoding =====
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _field_varint(field: int, value: int) -> bytes:
+    return _key(field, 0) + _varint(value)
+
+
+def _field_bytes(field: int, data: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(data)) + data
+
+
+def _field_packed(field: int, values: Sequence[int]) -> bytes:
+    return _field_bytes(field, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    """Value message (string / double / uint64 / sint64 / bool)"""
+    if isinstance(value, bool):
+        return _field_varint(7, int(value))
+    if isinstance(value, int):
+        return _field_varint(5, value) if value >= 0 else _field_varint(6, _zigzag(value))
+    if isinstance(value, float):
+        return _key(3, 1) + np.float64(value).tobytes()
+    return _field_bytes(1, str(value).encode("utf-8"))
+
+
+def _command(command_id: int, count: int) -> int:
+    return (command_id & 0x7) | (count << 3)
+
+
+class LayerBuilder:
+    """Накопичує features одного шару тайла з таблицями keys/values"""
+
+    def __init__(self, name: str, extent: int = EXTENT):
+        self.name = name
+        self.extent = extent
+        self.keys: Dict[str, int] = {}
+        self.values: Dict[Tuple[str, Any], int] = {}
+        self.features: List[bytes] = []
+
+    def _tags(self, properties: Dict[str, Any]) -> List[int]:
+        tags = []
+        for key, value in properties.items():
+            if value is None or isinstance(value, (list, dict)):
+                continue
+            key_idx = self.keys.setdefault(key, len(self.keys))
+            value_idx = self.values.setdefault((type(value).__name__, value), len(self.values))
+            tags.extend((key_idx, value_idx))
+        return tags
+
+    def add_feature(self, geom_type: int, geometry: List[int], properties: Dict[str, Any], feature_id: Optional[int] = None):
+        if not geometry:
+            return
+        data = b""
+        if feature_id is not None:
+            data += _field_varint(1, feature_id)
+        tags = self._tags(properties)
+        if tags:
+            data += _field_packed(2, tags)
+        data += _field_varint(3, geom_type)
+        data += _field_packed(4, geometry)
+        self.features.append(data)
+
+    def encode(self) -> bytes:
+        """Layer message (порожній шар не кодується)"""
+        if not self.features:
+            return b""
+        data = _field_varint(15, 2) + _field_bytes(1, self.name.encode("utf-8"))
+        data += b"".join(_field_bytes(2, f) for f in self.features)
+        data += b"".join(_field_bytes(3, k.encode("utf-8")) for k in self.keys)
+        data += b"".join(_field_bytes(4, _encode_value(v)) for (_, v) in self.values)
+        data += _field_varint(5, self.extent)
+        return data
+
+
+def encode_tile(layers: Sequence[bytes]) -> bytes:
+    """Tile message з уже закодованих шарів"""
+    return b"".join(_field_bytes(3, layer) for layer in layers if layer)
+
+
+# ===== Projection (Web Mercator) =====
+def lnglat_to_world(lng, lat):
+    """Нормалізовані координати Web Mercator (0..1, y вниз)"""
+    lat = np.clip(lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    wx = (np.asarray(lng, dtype=np.float64) + 180.0) / 360.0
+    wy = (1.0 - np.arcsinh(np.tan(np.radians(lat))) / math.pi) / 2.0
+    return wx, wy
+
+
+def world_to_lnglat(wx: float, wy: float) -> Tuple[float, float]:
+    lng = wx * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1.0 - 2.0 * wy))))
+    return lng, lat
+
+
+def tile_is_valid(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_bounds(z: int, x: int, y: int, buffer: int = BUFFER) -> Tuple[float, float, float, float]:
+    """
+    Межі тайла (з буфером) у градусах
+
+    Returns:
+        (min_lng, min_lat, max_lng, max_lat)
+    """
+    n = 2 ** z
+    pad = buffer / EXTENT
+    min_lng, max_lat = world_to_lnglat(max(0.0, (x - pad) / n), max(0.0, (y - pad) / n))
+    max_lng, min_lat = world_to_lnglat(min(1.0, (x + 1 + pad) / n), min(1.0, (y + 1 + pad) / n))
+    return min_lng, min_lat, max_lng, max_lat
+
+
+# ===== Point layers =====
+def point_layer(name: str, source, index: GridIndex, z: int, x: int, y: int,
+                property_keys: Sequence[str]) -> bytes:
+    """
+    Закодований шар точок тайла (вибірка через GridIndex.query_bbox)
+
+    Args:
+        source: Колонковий шар (snapshot_store.ColumnarLayer) або None
+        property_keys: Властивості features, що потрапляють у тайл
+    """
+    if source is None or len(source) == 0:
+        return b""
+
+    min_lng, min_lat, max_lng, max_lat = tile_bounds(z, x, y)
+    indices = index.query_bbox(min_lat, min_lng, max_lat, max_lng)
+    if len(indices) == 0:
+        return b""
+
+    n = 2 ** z
+    wx, wy = lnglat_to_world(index.points.lng_deg[indices], index.points.lat_deg[indices])
+    tx = np.round((wx * n - x) * EXTENT).astype(np.int64).tolist()
+    ty = np.round((wy * n - y) * EXTENT).astype(np.int64).tolist()
+
+    layer = LayerBuilder(name)
+    for idx, px, py in zip(indices.tolist(), tx, ty):
+        layer.add_feature(
+            GEOM_POINT,
+            [_command(CMD_MOVE_TO, 1), _zigzag(px), _zigzag(py)],
+            {key: source.property_value(key, idx) for key in property_keys},
+            feature_id=idx
+        )
+    return layer.encode()
+
+
+# ===== Polygon layers =====
+def simplify_ring(ring: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker для замкненого кільця (перша точка = остання)"""
+    if len(ring) <= 4 or tolerance <= 0:
+        return ring
+
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(ring) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = ring[end] - ring[start]
+        points = ring[start + 1:end] - ring[start]
+        length = math.hypot(segment[0], segment[1])
+        if length == 0:
+            distances = np.hypot(points[:, 0], points[:, 1])
+        else:
+            distances = np.abs(segment[0] * points[:, 1] - segment[1] * points[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    simplified = ring[keep]
+    return simplified if len(simplified) >= 4 else ring
+
+
+def clip_ring(ring: List[Tuple[float, float]], min_v: float, max_v: float) -> List[Tuple[float, float]]:
+    """Sutherland-Hodgman: обрізати кільце квадратом [min_v, max_v]^2 (без замикаючої точки)"""
+    def clip(points, inside, intersect):
+        result = []
+        for i, current in enumerate(points):
+            previous = points[i - 1]
+            if inside(current):
+                if not inside(previous):
+                    result.append(intersect(previous, current))
+                result.append(current)
+            elif inside(previous):
+                result.append(intersect(previous, current))
+        return result
+
+    def at_x(v):
+        return lambda p, q: (v, p[1] + (q[1] - p[1]) * (v - p[0]) / (q[0] - p[0]))
+
+    def at_y(v):
+        return lambda p, q: (p[0] + (q[0] - p[0]) * (v - p[1]) / (q[1] - p[1]), v)
+
+    points = ring
+    for inside, intersect in (
+        (lambda p: p[0] >= min_v, at_x(min_v)),
+        (lambda p: p[0] <= max_v, at_x(max_v)),
+        (lambda p: p[1] >= min_v, at_y(min_v)),
+        (lambda p: p[1] <= max_v, at_y(max_v)),
+    ):
+        if not points:
+            break
+        points = clip(points, inside, intersect)
+    return points
+
+
+def _ring_area(points: List[Tuple[int, int]]) -> float:
+    """Подвоєна площа за формулою землеміра (у координатах тайла)"""
+    return sum(
+        points[i - 1][0] * points[i][1] - points[i][0] * points[i - 1][1]
+        for i in range(len(points))
+    )
+
+
+def _encode_ring(points: List[Tuple[int, int]], exterior: bool, cursor: List[int]) -> List[int]:
+    """Команди MoveTo/LineTo/ClosePath для кільця; cursor - поточна позиція пера"""
+    deduped = [p for i, p in enumerate(points) if i == 0 or p != points[i - 1]]
+    if len(deduped) > 1 and deduped[0] == deduped[-1]:
+        deduped.pop()
+    if len(deduped) < 3:
+        return []
+
+    area = _ring_area(deduped)
+    if area == 0:
+        return []
+    # Зовнішнє кільце - додатна площа, внутрішнє - від'ємна (MVT 2.1, 4.3.4.4)
+    if (area > 0) != exterior:
+        deduped.reverse()
+
+    geometry = [_command(CMD_MOVE_TO, 1)]
+    for i, (px, py) in enumerate(deduped):
+        if i == 1:
+            geometry.append(_command(CMD_LINE_TO, len(deduped) - 1))
+        geometry.extend((_zigzag(px - cursor[0]), _zigzag(py - cursor[1])))
+        cursor[0], cursor[1] = px, py
+    geometry.append(_command(CMD_CLOSE_PATH, 1))
+    return geometry
+
+
+class PolygonTileSource:
+    """
+    Джерело полігонального шару: проекція виконується один раз,
+    спрощення - один раз на рівень зуму
+    """
+
+    def __init__(self, name: str, geojson: Optional[dict], property_keys: Sequence[str]):
+        self.name = name
+        self.property_keys = tuple(property_keys)
+        # [(properties, [polygon: [ring: ndarray (n, 2) у world coords]])]
+        self.features: List[Tuple[Dict[str, Any], List[List[np.ndarray]]]] = []
+        self._by_zoom: Dict[int, List[Tuple[Dict[str, Any], List[List[np.ndarray]], Tuple[float, float, float, float]]]] = {}
+
+        for feature in (geojson or {}).get('features', []):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                continue
+
+            projected = []
+            for polygon in polygons:
+                rings = []
+                for ring in polygon:
+                    coords = np.asarray(ring, dtype=np.float64)
+                    wx, wy = lnglat_to_world(coords[:, 0], coords[:, 1])
+                    rings.append(np.column_stack([wx, wy]))
+                projected.append(rings)
+
+            properties = feature.get('properties', {})
+            self.features.append(({key: properties.get(key) for key in self.property_keys}, projected))
+
+    def _features_for_zoom(self, z: int):
+        if z not in self._by_zoom:
+            tolerance = SIMPLIFY_TOLERANCE_PX / 256.0 / (2 ** z)
+            simplified = []
+            for properties, polygons in self.features:
+                rings = [[simplify_ring(ring, tolerance) for ring in polygon] for polygon in polygons]
+                all_points = np.vstack([ring for polygon in rings for ring in polygon])
+                bbox = (all_points[:, 0].min(), all_points[:, 1].min(), all_points[:, 0].max(), all_points[:, 1].max())
+                simplified.append((properties, rings, bbox))
+            self._by_zoom[z] = simplified
+        return self._by_zoom[z]
+
+    def layer(self, z: int, x: int, y: int) -> bytes:
+        """Закодований шар полігонів тайла"""
+        n = 2 ** z
+        pad = BUFFER / EXTENT
+        tile_min_x, tile_min_y = (x - pad) / n, (y - pad) / n
+        tile_max_x, tile_max_y = (x + 1 + pad) / n, (y + 1 + pad) / n
+
+        layer = LayerBuilder(self.name)
+        for feature_id, (properties, polygons, bbox) in enumerate(self._features_for_zoom(z)):
+            if bbox[2] < tile_min_x or bbox[0] > tile_max_x or bbox[3] < tile_min_y or bbox[1] > tile_max_y:
+                continue
+
+            geometry: List[int] = []
+            cursor = [0, 0]
+            for polygon in polygons:
+                for ring_idx, ring in enumerate(polygon):
+                    local = (ring * n - np.array([x, y])) * EXTENT
+                    clipped = clip_ring([tuple(p) for p in local[:-1].tolist()], -BUFFER, EXTENT + BUFFER)
+                    quantized = [(int(round(px)), int(round(py))) for px, py in clipped]
+                    ring_geometry = _encode_ring(quantized, ring_idx == 0, cursor)
+                    if ring_idx == 0 and not ring_geometry:
+                        break  # зовнішнє кільце повністю поза тайлом
+                    geometry.extend(ring_geometry)
+
+            layer.add_feature(GEOM_POLYGON, geometry, properties, feature_id=feature_id)
+        return layer.encode()
+
+
+class TileCache:
+    """LRU-кеш закодованих тайлів (ключ містить версію датасету)"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._tiles: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+        return tile
+
+    def put(self, key: Hashable, tile: bytes) -> bytes:
+        self._tiles[key] = tile
+        self._tiles.move_to_end(key)
+        while len(self._tiles) > self.max_entries:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def clear(self):
+        self._tiles.clear()
+
+    def __len__(self) -> int:
+        return len(self._tiles)
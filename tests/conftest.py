@@ -0,0 +1,37 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+# Модулі backend імпортуються як top-level (from geodesic import ...)
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+# server.py читає налаштування MongoDB при імпорті
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+
+
+@pytest.fixture(scope='session')
+def client(tmp_path_factory):
+    """
+    API над копією каталогу даних (імпорти переписують файли датасетів); один
+    на сесію - зупинка застосунку закриває COMPUTE_POOL
+    """
+    from fastapi.testclient import TestClient
+
+    import server
+
+    data_dir = tmp_path_factory.mktemp('gis') / 'data'
+    shutil.copytree(
+        Path(server.ROOT_DIR) / 'data', data_dir, ignore=shutil.ignore_patterns(server.SNAPSHOT_DIRNAME, '.cache')
+    )
+    original_dir = server.DATA_DIR
+    server.DATA_DIR = data_dir
+    try:
+        with TestClient(server.app) as test_client:
+            yield test_client
+    finally:
+        server.DATA_DIR = original_dir
@@ -0,0 +1,109 @@
+"""
+Tests for the batched AHP evaluation (backend/ahp_calculator.py)
+"""
+import math
+
+import numpy as np
+import pytest
+
+from ahp_calculator import AHPCalculator, RANDOM_INDEX, batch_weights, evaluate_matrices
+
+
+SAATY_SCALE = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9], dtype=np.float64)
+
+
+def random_reciprocal_matrices(rng, count, n):
+    """Стек узгоджених за оберненістю матриць попарних порівнянь зі шкали Сааті"""
+    stack = np.ones((count, n, n))
+    for i in range(n):
+        for j in range(i + 1, n):
+            values = rng.choice(SAATY_SCALE, count)
+            values = np.where(rng.random(count) < 0.5, values, 1.0 / values)
+            stack[:, i, j] = values
+            stack[:, j, i] = 1.0 / values
+    return stack
+
+
+def test_builtin_matrix_matches_calculator():
+    calculator = AHPCalculator()
+    result = evaluate_matrices(calculator.pairwise_matrix)
+    weights = result["weights"][0]
+
+    # Геометричне середнє рядків, як до пакетного розрахунку
+    row_means = [math.prod(row) ** (1 / 7) for row in calculator.pairwise_matrix.tolist()]
+    assert weights.tolist() == pytest.approx([mean / sum(row_means) for mean in row_means], abs=1e-12)
+    assert calculator.calculate_weights() == {
+        name: round(float(weight), 4) for name, weight in zip(calculator.criteria_names, weights)
+    }
+
+    lambda_max = calculator.calculate_max_eigenvalue(weights.tolist())
+    ci, cr, is_consistent = calculator.calculate_consistency(weights.tolist())
+    assert result["lambda_max"][0] == pytest.approx(lambda_max, abs=1e-12)
+    assert result["ci"][0] == pytest.approx(ci, abs=1e-12)
+    assert result["cr"][0] == pytest.approx(cr, abs=1e-12)
+    assert is_consistent and bool(result["is_consistent"][0])
+
+
+def test_stack_rows_are_evaluated_independently():
+    calculator = AHPCalculator()
+    stack = random_reciprocal_matrices(np.random.default_rng(3), 4, 7)
+    stack[2] = calculator.pairwise_matrix
+    result = evaluate_matrices(stack)
+    single = evaluate_matrices(calculator.pairwise_matrix)
+    for key in ("weights", "lambda_max", "ci", "cr"):
+        np.testing.assert_allclose(result[key][2], single[key][0], rtol=0, atol=1e-15)
+
+
+@pytest.mark.parametrize('n', [3, 5, 7, 9])
+def test_eigenvector_method_matches_linalg_eig(n):
+    stack = random_reciprocal_matrices(np.random.default_rng(n), 50, n)
+    result = evaluate_matrices(stack, 'eigenvector')
+
+    eigenvalues, eigenvectors = np.linalg.eig(stack)
+    principal = np.argmax(eigenvalues.real, axis=1)
+    rows = np.arange(len(stack))
+    expected = np.abs(eigenvectors[rows, :, principal].real)
+    expected /= expected.sum(axis=1, keepdims=True)
+
+    np.testing.assert_allclose(result["weights"], expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(result["lambda_max"], eigenvalues.real[rows, principal], rtol=1e-9)
+    np.testing.assert_allclose(result["ci"], (result["lambda_max"] - n) / (n - 1), rtol=1e-12)
+    np.testing.assert_allclose(result["cr"], result["ci"] / RANDOM_INDEX[n], rtol=1e-12)
+
+
+def test_consistent_matrix_has_exact_weights():
+    # a[i, j] = w[i] / w[j] - обидва методи повертають w, λmax = n, CR = 0
+    w = np.array([0.4, 0.3, 0.2, 0.1])
+    matrix = w[:, np.newaxis] / w[np.newaxis, :]
+    for method in ('geometric', 'eigenvector'):
+        result = evaluate_matrices(matrix, method)
+        np.testing.assert_allclose(result["weights"][0], w, atol=1e-12)
+        assert result["lambda_max"][0] == pytest.approx(4.0)
+        assert result["cr"][0] == pytest.approx(0.0, abs=1e-12)
+
+
+@pytest.mark.parametrize('matrices', [
+    np.ones(3),
+    np.ones((3, 4)),
+    np.ones((2, 3, 4)),
+    np.ones((1, 2, 3, 3)),
+    np.ones((11, 11)),
+    [[1.0, 2.0], [0.5]],
+    [["a", "b"], ["c", "d"]],
+])
+def test_bad_shapes_raise_value_error(matrices):
+    with pytest.raises(ValueError):
+        evaluate_matrices(matrices)
+
+
+@pytest.mark.parametrize('value', [0.0, -2.0, np.nan, np.inf])
+def test_non_positive_or_non_finite_entries_raise_value_error(value):
+    matrix = np.ones((3, 3))
+    matrix[0, 1] = value
+    with pytest.raises(ValueError, match="positive finite"):
+        batch_weights(matrix)
+
+
+def test_unknown_method_raises_value_error():
+    with pytest.raises(ValueError, match="Unknown AHP method"):
+        batch_weights(np.ones((3, 3)), 'arithmetic')
@@ -0,0 +1,81 @@
+"""
+Tests for the versioned analysis cache and its SQLite store (backend/analysis_cache.py)
+"""
+import pytest
+
+import analysis_cache
+from analysis_cache import CacheBackend, SQLiteCacheBackend, VersionedCache
+
+
+class FakeClock:
+    """Керований time.time() модуля analysis_cache"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(analysis_cache.time, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def backend(tmp_path, clock):
+    return SQLiteCacheBackend(tmp_path / 'cache.sqlite3', ttl_seconds=60, max_entries=3)
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly(60, 10)
+
+
+def test_entry_expires_after_ttl(backend, clock):
+    backend.put('key', {"score": 1})
+    clock.now += 59
+    assert backend.get('key') == {"score": 1}
+    clock.now += 1
+    assert backend.get('key') is None
+
+
+def test_oldest_entries_are_evicted_by_size(backend, clock):
+    for idx in range(5):
+        backend.put(f'key{idx}', idx)
+        clock.now += 1
+    assert [backend.get(f'key{idx}') for idx in range(5)] == [None, None, 2, 3, 4]
+    assert backend.stats()["entries"] == 3
+
+
+def test_values_round_trip_through_json(backend):
+    value = {"region": "Київська область", "score": 78.5, "zones": [(50.4, 30.5)], "details": None}
+    backend.put('key', value)
+    assert backend.get('key') == {"region": "Київська область", "score": 78.5, "zones": [[50.4, 30.5]], "details": None}
+
+
+def test_persistent_entries_are_keyed_by_dataset_versions(backend):
+    key = ('analyze', 'Київська область')
+    VersionedCache(backend, {"version": 1}).put(key, {"points": "v1"}, {"score": 1})
+
+    # Новий процес з тим самим сховищем
+    cache = VersionedCache(backend, {"version": 1})
+    assert cache.get(key, {"points": "v2"}) is None
+    assert cache.get(key, {"points": "v1"}) == {"score": 1}
+    assert (cache.stats()["persistent_hits"], cache.stats()["misses"]) == (1, 1)
+    assert VersionedCache(backend, {"version": 2}).get(key, {"points": "v1"}) is None
+
+
+def test_invalidate_drops_only_dependent_entries():
+    cache = VersionedCache()
+    cache.put('points', {"points": "v1"}, 1)
+    cache.put('fires', {"fires": "v1"}, 2)
+    assert cache.invalidate('points') == 1
+    assert cache.get('points', {"points": "v1"}) is None
+    assert cache.get('fires', {"fires": "v1"}) == 2
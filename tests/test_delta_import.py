@@ -0,0 +1,86 @@
+"""
+Tests for the append / upsert / delete imports of point layers
+(server.update_point_layer, snapshot_store.ColumnarLayer.apply_delta)
+"""
+import json
+
+import server
+
+
+FIRES_FILE = server.DATASET_FILES['forest_fires']
+
+
+def feature_collection(*features) -> bytes:
+    return json.dumps({"type": "FeatureCollection", "features": list(features)}, ensure_ascii=False).encode('utf-8')
+
+
+def upload(client, mode, *features):
+    return client.post(f'/api/import/fires?mode={mode}', files={'file': ('fires.geojson', feature_collection(*features))})
+
+
+def fires_file() -> bytes:
+    return (server.DATA_DIR / FIRES_FILE).read_bytes()
+
+
+def new_fire(fire_id):
+    return {
+        "type": "Feature", "id": fire_id,
+        "geometry": {"type": "Point", "coordinates": [24.03, 49.84]},
+        "properties": {
+            "name": "Тестова пожежа", "region": "Львівська область", "area_ha": 1.5, "date": "01.05.2025",
+            "cause_type": "людський фактор", "cause": "вогнище", "description": "Тестова пожежа",
+        },
+    }
+
+
+def test_append_then_delete_restores_identical_file(client):
+    original = fires_file()
+    total = server.DATA.latest().forest_fires.metadata['total_fires']
+
+    response = upload(client, 'append', new_fire('fire-test-1'))
+    assert response.status_code == 200, response.text
+    assert (response.json()['added'], response.json()['total_fires']) == (1, total + 1)
+    assert fires_file() != original
+
+    response = client.post('/api/import/fires/delete', json={"ids": ["fire-test-1"]})
+    assert response.status_code == 200, response.text
+    assert (response.json()['removed'], response.json()['total_fires']) == (1, total)
+    assert fires_file() == original
+
+
+def test_append_rejects_existing_id(client):
+    assert upload(client, 'append', new_fire('fire-test-2')).status_code == 200
+    response = upload(client, 'append', new_fire('fire-test-2'))
+    assert response.status_code == 400
+    assert 'fire-test-2' in response.json()['detail']
+    client.post('/api/import/fires/delete', json={"ids": ["fire-test-2"]})
+
+
+def test_upsert_replaces_existing_feature(client):
+    layer = server.DATA.latest().forest_fires
+    feature = layer.feature(0)
+    feature_id = layer.stable_ids()[0]
+    feature['properties'] = dict(feature['properties'], area_ha=123.4)
+
+    response = upload(client, 'upsert', feature)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body['added'], body['updated'], body['total']) == (0, 1, len(layer))
+
+    updated = server.DATA.latest().forest_fires
+    idx = updated.stable_ids().index(feature_id)
+    assert updated.property_value('area_ha', idx) == 123.4
+    written = json.loads(fires_file())
+    assert written['features'][idx]['properties']['area_ha'] == 123.4
+
+
+def test_delete_reports_missing_ids(client):
+    before = fires_file()
+    total = len(server.DATA.latest().forest_fires)
+
+    response = client.post('/api/import/fires/delete', json={"ids": ["fire-does-not-exist"]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body['not_found'] == ["fire-does-not-exist"]
+    assert (body['removed'], body['total']) == (0, total)
+    assert fires_file() == before
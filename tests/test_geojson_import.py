@@ -0,0 +1,161 @@
+"""
+Tests for the streaming FeatureCollection parser and writer (backend/geojson_import.py)
+"""
+import io
+import json
+
+import pytest
+
+import geojson_import
+from geojson_import import (
+    FeatureValidationError, StreamParseError, import_feature_collection, iter_feature_collection,
+    iter_text_chunks, iter_validated_features, write_layer,
+)
+from schemas import FireFeature, ForestFiresHeaderSchema, ForestFiresSchema
+from snapshot_store import ColumnarLayer
+
+
+CHUNK_SIZES = (1, 2, 3, 5, 7, 64)
+
+DOCUMENT = """{
+  "type": "FeatureCollection",
+  "count": 12345,
+  "features": [
+    {"id": 1, "properties": {"name": "Пожежа біля Чорнобиля ☀", "area_ha": -1.25e-3}},
+    {"id": "b", "properties": {"name": "Ліс", "area_ha": 987654321, "flags": [true, false, null]}}
+  ],
+  "total": 0.5
+}"""
+
+
+def parse(chunks):
+    top_level = {}
+    features = list(iter_feature_collection(chunks, top_level))
+    return top_level, features
+
+
+def text_chunks(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+def byte_chunks(text, size):
+    """Фрагменти тексту з UTF-8 потоку, поділеного кожні size байт (посеред багатобайтових символів)"""
+    return iter_text_chunks(io.BytesIO(text.encode('utf-8')), size)
+
+
+class TrickleStream(io.BytesIO):
+    """Бінарний потік, що віддає не більше size байт за read()"""
+
+    def __init__(self, data, size=7):
+        super().__init__(data)
+        self.size = size
+
+    def read(self, size=-1):
+        return super().read(self.size if size < 0 else min(size, self.size))
+
+
+@pytest.mark.parametrize('size', CHUNK_SIZES)
+@pytest.mark.parametrize('split', [text_chunks, byte_chunks])
+def test_stream_matches_json_loads(split, size):
+    expected = json.loads(DOCUMENT)
+    top_level, features = parse(split(DOCUMENT, size))
+    assert [feature for _, feature in features] == expected['features']
+    assert [line for line, _ in features] == [5, 6]
+    assert top_level == {**expected, 'features': None}
+    assert list(top_level) == list(expected)
+
+
+@pytest.mark.parametrize('size', CHUNK_SIZES)
+def test_numbers_cut_at_buffer_end(size):
+    # Число в кінці фрагмента завершене лише після роздільника
+    text = '{"features": [12345, -6.0e+10, 7], "n": 98765}'
+    top_level, features = parse(text_chunks(text, size))
+    assert [feature for _, feature in features] == [12345, -6.0e+10, 7]
+    assert top_level == {"features": None, "n": 98765}
+
+
+@pytest.mark.parametrize('size', CHUNK_SIZES)
+def test_parse_error_reports_line(size):
+    text = '{\n  "type": "FeatureCollection",\n  "features": [\n    {"a": 1} {"b": 2}\n  ]\n}'
+    with pytest.raises(StreamParseError) as error:
+        parse(text_chunks(text, size))
+    assert error.value.line == 4
+    assert str(error.value) == "Expecting ',' delimiter: line 4"
+
+
+@pytest.mark.parametrize('size', CHUNK_SIZES)
+def test_truncated_document_is_an_error(size):
+    with pytest.raises(StreamParseError):
+        parse(text_chunks(DOCUMENT[:-20], size))
+
+
+def test_value_size_is_limited(monkeypatch):
+    monkeypatch.setattr(geojson_import, 'MAX_VALUE_CHARS', 40)
+    small = '{"features": [{"name": "' + 'x' * 20 + '"}]}'
+    assert parse(text_chunks(small, 3))[1] == [(1, {"name": 'x' * 20})]
+
+    large = '{"features": [{"name": "' + 'x' * 100 + '"}]}'
+    with pytest.raises(StreamParseError, match="Value exceeds 40 characters"):
+        parse(text_chunks(large, 3))
+
+
+def fire(name, area_ha=1.5, cause_type="людський фактор", fire_id=None):
+    feature = {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [24.03, 49.84]},
+        "properties": {
+            "name": name, "region": "Львівська область", "area_ha": area_ha, "date": "01.05.2025",
+            "cause_type": cause_type, "cause": "вогнище", "description": "Опис «пожежі»",
+        },
+    }
+    if fire_id is not None:
+        feature["id"] = fire_id
+    return feature
+
+
+FIRES = {
+    "type": "FeatureCollection",
+    "metadata": {
+        "total_fires": 3, "human_caused": 2, "other_causes": 1, "year": 2025,
+        "regions": ["Львівська область"], "note": "Тестові дані",
+    },
+    "features": [fire("Пожежа 1"), fire("Пожежа 2", 12, fire_id="fire-2"), fire("Пожежа 3", 0.25, "природні причини")],
+}
+
+
+def test_validation_errors_report_feature_and_line():
+    document = dict(FIRES, features=[fire("Пожежа 1"), fire("Пожежа 2", "багато"), fire("Пожежа 3", cause_type="?")])
+    text = json.dumps(document, ensure_ascii=False, indent=2)
+    lines = text.split("\n")
+    starts = [idx + 1 for idx, line in enumerate(lines) if line == "    {"]
+
+    with pytest.raises(FeatureValidationError) as error:
+        list(iter_validated_features(TrickleStream(text.encode('utf-8')), FireFeature, {}))
+    assert error.value.error_count == 2
+    assert [(e['feature'], e['line']) for e in error.value.errors] == [(2, starts[1]), (3, starts[2])]
+
+
+def expected_file(document) -> bytes:
+    """Вміст файлу, як його записував json.dump(schema.model_dump(), indent=2) до потокового імпорту"""
+    dumped = ForestFiresSchema.model_validate(document).model_dump()
+    for feature in dumped['features']:
+        if feature['id'] is None:
+            del feature['id']
+    return json.dumps(dumped, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def test_imported_file_is_identical_to_json_dump(tmp_path):
+    output = tmp_path / 'forest_fires.geojson'
+    stream = TrickleStream(json.dumps(FIRES, ensure_ascii=False).encode('utf-8'))
+    header, layer = import_feature_collection(stream, output, tmp_path / 'snapshot', FireFeature, ForestFiresHeaderSchema)
+
+    assert output.read_bytes() == expected_file(FIRES)
+    assert header.metadata.total_fires == 3
+    assert len(layer) == 3
+
+
+def test_written_layer_is_identical_to_json_dump(tmp_path):
+    output = tmp_path / 'forest_fires.geojson'
+    layer = ColumnarLayer.from_geojson(json.loads(expected_file(FIRES)))
+    write_layer(layer, output, tmp_path / 'snapshot')
+    assert output.read_bytes() == expected_file(FIRES)
@@ -0,0 +1,34 @@
+"""
+Tests for the MongoDB feature documents (backend/mongo_store.py)
+"""
+from mongo_store import layer_documents
+from snapshot_store import ColumnarLayer
+
+
+LAYER = ColumnarLayer.from_geojson({
+    "type": "FeatureCollection",
+    "features": [
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [25.7, 50.8]},
+         "properties": {"name": "A", "region": "Волинська область"}},
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [30.5, 50.4]},
+         "properties": {"name": "B", "region": "Київська область"}},
+    ],
+})
+
+
+def test_documents_are_grouped_by_declared_region_by_default():
+    documents = layer_documents(LAYER, LAYER.stable_ids())
+    assert [doc['region'] for doc in documents] == ["Волинська область", "Київська область"]
+    assert [doc['declared_region'] for doc in documents] == ["Волинська область", "Київська область"]
+    assert [doc['seq'] for doc in documents] == [0, 1]
+    assert documents[0]['location'] == {'type': 'Point', 'coordinates': [25.7, 50.8]}
+
+
+def test_documents_store_aggregation_region_next_to_declared_one():
+    regions = ["Рівненська область", "Київська область"]
+    documents = layer_documents(LAYER, LAYER.stable_ids(), 1, None, regions)
+    assert [(doc['seq'], doc['region'], doc['declared_region']) for doc in documents] == [
+        (1, "Київська область", "Київська область"),
+    ]
+    documents = layer_documents(LAYER, LAYER.stable_ids(), 0, 1, regions)
+    assert (documents[0]['region'], documents[0]['declared_region']) == ("Рівненська область", "Волинська область")
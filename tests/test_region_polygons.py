@@ -0,0 +1,135 @@
+"""
+Tests for the ray-casting region engine (backend/region_polygons.py)
+"""
+import numpy as np
+
+from geodesic import GeoPoints
+from region_polygons import NO_REGION, RegionAssignment, RegionPolygons
+from snapshot_store import ColumnarLayer
+
+
+def square(name, min_lng, min_lat, max_lng, max_lat):
+    ring = [[min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat], [min_lng, min_lat]]
+    return {"type": "Feature", "properties": {"name": name}, "geometry": {"type": "Polygon", "coordinates": [ring]}}
+
+
+# Дві суміжні області зі спільним ребром lng = 1 і область з отвором
+POLYGONS = RegionPolygons({
+    "type": "FeatureCollection",
+    "features": [
+        square("West", 0.0, 0.0, 1.0, 1.0),
+        square("East", 1.0, 0.0, 2.0, 1.0),
+        {
+            "type": "Feature",
+            "properties": {"name": "Ring"},
+            "geometry": {"type": "Polygon", "coordinates": [
+                [[10, 10], [14, 10], [14, 14], [10, 14], [10, 10]],
+                [[11, 11], [13, 11], [13, 13], [11, 13], [11, 11]],
+            ]},
+        },
+    ],
+})
+
+
+def points_layer(points):
+    """Колонковий шар з [(lng, lat, заявлений регіон), ...]"""
+    return ColumnarLayer.from_geojson({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "id": f"p{idx}", "properties": {"name": f"p{idx}", "region": region},
+             "geometry": {"type": "Point", "coordinates": [lng, lat]}}
+            for idx, (lng, lat, region) in enumerate(points)
+        ],
+    })
+
+
+def compute(layer, use_polygons=False):
+    return RegionAssignment.compute(POLYGONS, layer, GeoPoints(layer.lat, layer.lng), use_polygons)
+
+
+def test_contains_inside_outside_and_hole():
+    points = GeoPoints([0.5, 0.5, 1.5, 12.0, 10.5], [0.5, 1.5, 0.5, 12.0, 10.5])
+    assert POLYGONS.contains(POLYGONS.code("West"), points).tolist() == [True, False, False, False, False]
+    assert POLYGONS.contains(POLYGONS.code("Ring"), points).tolist() == [False, False, False, False, True]
+
+
+def test_point_on_shared_edge_belongs_to_exactly_one_region():
+    # (lng 1, lat 0.5) лежить на спільному ребрі West / East
+    points = GeoPoints([0.5], [1.0])
+    matrix = POLYGONS.membership(points)
+    assert matrix.sum() == 1
+    assert POLYGONS.assign(points)[0] != NO_REGION
+
+
+def test_points_without_coordinates_are_never_inside():
+    points = GeoPoints([np.nan], [np.nan])
+    assert not POLYGONS.membership(points).any()
+    assert POLYGONS.assign(points).tolist() == [NO_REGION]
+
+
+def test_declared_region_mismatch_is_flagged_but_declared_region_is_kept():
+    layer = points_layer([(0.5, 0.5, "West"), (1.5, 0.5, "West"), (1.5, 0.5, "Nowhere")])
+    assignment = compute(layer)
+    assert assignment.codes.tolist() == [POLYGONS.code("West"), POLYGONS.code("West"), NO_REGION]
+    assert assignment.mismatched().tolist() == [False, True, False]
+    assert assignment.summary() == {
+        "features": 3, "assigned": 2, "mismatched": 1, "near_boundary": 0, "outside_boundaries": 0,
+        "unknown_declared_region": 1, "mismatch_tolerance_km": 0.0,
+    }
+
+
+def test_polygon_regions_override_declared_region():
+    layer = points_layer([(0.5, 0.5, "West"), (1.5, 0.5, "West"), (1.5, 0.5, "Nowhere")])
+    assignment = compute(layer, use_polygons=True)
+    assert [POLYGONS.names[code] for code in assignment.codes] == ["West", "East", "East"]
+    assert assignment.mismatched().tolist() == [False, True, False]
+    assert assignment.summary()["assigned"] == 3
+
+
+def test_point_outside_every_polygon_keeps_declared_region():
+    layer = points_layer([(5.0, 5.0, "East"), (5.0, 5.0, "Nowhere")])
+    assignment = compute(layer, use_polygons=True)
+    assert assignment.outside.tolist() == [True, True]
+    assert assignment.codes.tolist() == [POLYGONS.code("East"), NO_REGION]
+    assert not assignment.mismatched().any()
+    assert assignment.flagged().tolist() == [True, True]
+
+
+def test_boundary_distance_to_declared_polygon():
+    # 0.5 градуса довготи на широті 0.5 - близько 55.6 км від ребра lng = 1
+    layer = points_layer([(0.5, 0.5, "West"), (1.5, 0.5, "West"), (1.5, 0.5, "Nowhere"), (np.nan, np.nan, "West")])
+    distances = compute(layer).boundary_km
+    assert distances[0] == 0.0
+    assert abs(distances[1] - 55.6) < 0.1
+    assert np.isnan(distances[2:]).all()
+
+
+def test_mismatch_within_tolerance_is_not_flagged():
+    # 11 км і 55 км за межею West у полігоні East; 11 км і 333 км поза всіма полігонами
+    layer = points_layer([(1.1, 0.5, "West"), (1.5, 0.5, "West"), (-0.1, 0.5, "West"), (5.0, 0.5, "East")])
+    assignment = compute(layer)
+    assert assignment.mismatched().tolist() == [True, True, False, False]
+    assert assignment.mismatched(25.0).tolist() == [False, True, False, False]
+    assert assignment.flagged(25.0).tolist() == [False, True, False, True]
+    summary = assignment.summary(25.0)
+    assert (summary["mismatched"], summary["near_boundary"], summary["outside_boundaries"]) == (1, 2, 2)
+
+
+def test_updated_after_delta_equals_full_recompute():
+    rng = np.random.default_rng(7)
+    regions = ["West", "East", "Ring", None]
+
+    def random_points(count):
+        lng = rng.uniform(-1.0, 15.0, count)
+        lat = rng.uniform(-1.0, 15.0, count)
+        return [(float(x), float(y), regions[rng.integers(len(regions))]) for x, y in zip(lng, lat)]
+
+    layer = points_layer(random_points(300))
+    added = points_layer(random_points(50))
+    keep = rng.random(len(layer)) > 0.2
+
+    for use_polygons in (False, True):
+        incremental = compute(layer, use_polygons).updated(keep, compute(added, use_polygons))
+        full = compute(layer.apply_delta(keep, added), use_polygons)
+        for slot in RegionAssignment.__slots__:
+            np.testing.assert_array_equal(getattr(incremental, slot), getattr(full, slot))
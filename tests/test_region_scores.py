@@ -0,0 +1,70 @@
+"""
+Regression test for the published per-region scores on the shipped datasets
+(backend/data): a change in any region's score must be deliberate
+"""
+from collections import Counter
+
+import pytest
+
+import server
+from scoring_engine import FACTOR_KEYS
+
+# Очікувані бали - для агрегації за заявленим properties.region (REGION_ASSIGNMENT=declared)
+pytestmark = pytest.mark.skipif(server.USE_POLYGON_REGIONS, reason="REGION_ASSIGNMENT=polygons")
+
+# Регіон: (пунктів, загальний бал, попит, ПЗФ, природа, транспорт, інфраструктура, пожежі, насиченість)
+EXPECTED_SCORES = {
+    'Київська область': (23, 78.5, 25, 16.0, 10.1, 14.5, 8.0, 5, 0),
+    'Львівська область': (3, 82.0, 25, 17.5, 12.2, 13.2, 9, 5, 0),
+    'Одеська область': (8, 70.8, 25, 14.5, 6.2, 11.6, 8.5, 5, 0),
+    'Харківська область': (10, 69.4, 25, 11.0, 7.3, 12.1, 9, 5, 0),
+    'Дніпропетровська область': (7, 67.8, 25, 11.0, 5.4, 12.4, 9, 5, 0),
+    'Донецька область': (0, 62.2, 25, 11.0, 1.9, 11.8, 7.5, 5, 0),
+    'Запорізька область': (4, 61.5, 25, 8.0, 5.1, 10.4, 8.0, 5, 0),
+    'Житомирська область': (88, 49.9, 0, 17.5, 15, 8.4, 7.0, 5, -3),
+    'Вінницька область': (21, 63.0, 25, 7.5, 7.9, 9.1, 8.5, 5, 0),
+    'Полтавська область': (53, 59.4, 20, 9.0, 6.8, 9.6, 9.0, 5, 0),
+    'Чернігівська область': (48, 43.4, 0, 14.5, 9.8, 8.1, 6.0, 5, 0),
+    'Черкаська область': (103, 31.6, 0, 12.0, 8.1, 8.0, 8.5, 5, -10),
+    'Сумська область': (42, 51.5, 10, 13.0, 8.9, 7.6, 7.0, 5, 0),
+    'Хмельницька область': (34, 64.2, 25, 9.5, 8.4, 7.8, 8.5, 5, 0),
+    'Рівненська область': (50, 61.0, 10, 19.5, 13.6, 8.4, 7.5, 5, -3),
+    'Волинська область': (125, 41.1, 0, 20.0, 12.8, 9.8, 8.5, 5, -15),
+    'Івано-Франківська область': (5, 72.5, 20, 17.0, 15, 8.0, 7.5, 5, 0),
+    'Тернопільська область': (6, 59.2, 25, 9.5, 4.1, 7.6, 8.0, 5, 0),
+    'Закарпатська область': (20, 80.8, 25, 20.0, 15, 8.3, 7.5, 5, 0),
+    'Чернівецька область': (106, 41.0, 10, 15.0, 11.7, 7.8, 6.5, 5, -15),
+    'Миколаївська область': (3, 62.3, 25, 11.0, 4.8, 9.0, 7.5, 5, 0),
+    'Херсонська область': (0, 63.3, 25, 14.5, 4.5, 8.3, 6.0, 5, 0),
+    'Кіровоградська область': (18, 55.2, 25, 7.5, 1.4, 8.8, 7.5, 5, 0),
+    'Луганська область': (0, 59.6, 25, 11.0, 3.3, 8.8, 6.5, 5, 0),
+}
+
+
+@pytest.fixture(scope='module')
+def snapshot():
+    return server.build_dataset_snapshot(server.DatasetSnapshot(), tuple(server.DATASET_FILES), True)
+
+
+def test_region_scores_are_unchanged(snapshot):
+    scores = snapshot.region_scores
+    actual = {}
+    for idx, region_name in enumerate(scores.names):
+        row = {key: column[idx] for key, column in scores.columns.items()}
+        actual[region_name] = (
+            len(snapshot.region_tables.point_indices(region_name)),
+            server.factor_score(row, 'total_score'),
+            *(server.factor_score(row, key) for key in FACTOR_KEYS),
+        )
+    assert actual == EXPECTED_SCORES
+
+
+def test_features_are_aggregated_by_declared_region(snapshot):
+    # Межі областей - грубі восьмикутники: розбіжності з полігонами лише позначаються
+    layer = snapshot.recreational_points
+    for region_name, indices in snapshot.region_tables.points.items():
+        assert {layer.property_value('region', int(idx)) for idx in indices} == {region_name}
+    assert snapshot.point_regions.summary()["mismatched"] > 0
+    fires = snapshot.forest_fires
+    declared = Counter(fires.property_value('region', idx) for idx in range(len(fires)))
+    assert {name: stats["total_fires"] for name, stats in snapshot.fire_stats.items() if stats["total_fires"]} == declared
@@ -0,0 +1,37 @@
+"""
+Tests for the vectorized scoring matrix (backend/scoring_engine.py)
+"""
+from scoring_engine import RegionIndicators, score_indicators
+from server import factor_score
+
+
+def anthropogenic(hospitals, gas_stations, mobile, internet, hotels, electricity):
+    return {"anthropogenic_infrastructure": {
+        "hospitals_per_100k": hospitals, "gas_stations_per_100km2": gas_stations, "mobile_coverage_percent": mobile,
+        "internet_coverage_percent": internet, "hotels_total": hotels, "electricity_reliability": electricity,
+    }}
+
+
+def score_row(population_data, infra_data):
+    scores = score_indicators(RegionIndicators.from_records([("Регіон", population_data, None, infra_data, 10, 500.0, 3)]))
+    return {key: column[0] for key, column in scores.columns.items()}
+
+
+def test_integer_scores_keep_int_type():
+    # Лісистість понад 40% обмежується 11 балами, інфраструктура - лише цілі доданки
+    row = score_row(
+        {"forest_coverage_percent": 60, "has_water_bodies": True},
+        anthropogenic(5.0, 1.0, 96, 90, 300, 'висока'),
+    )
+    assert type(factor_score(row, 'nature_score')) is int and factor_score(row, 'nature_score') == 15
+    assert type(factor_score(row, 'infrastructure_score')) is int and factor_score(row, 'infrastructure_score') == 10
+
+
+def test_fractional_terms_keep_float_type():
+    # 2 + 1.5 + 2 + 1 + 1 + 0.5 = 8.0 - ціле значення з дробових доданків залишається float
+    row = score_row(
+        {"forest_coverage_percent": 20, "has_water_bodies": False},
+        anthropogenic(4.5, 0.8, 97, 95, 300, 'середня'),
+    )
+    assert type(factor_score(row, 'nature_score')) is float and factor_score(row, 'nature_score') == 5.5
+    assert type(factor_score(row, 'infrastructure_score')) is float and factor_score(row, 'infrastructure_score') == 8.0
@@ -0,0 +1,83 @@
+"""
+Tests for the Monte Carlo weight sensitivity (backend/sensitivity.py, /api/sensitivity)
+"""
+import numpy as np
+import pytest
+
+from ahp_calculator import AHPCalculator
+from scoring_engine import FACTOR_MAXIMA
+from sensitivity import factor_levels, run_sensitivity, score_regions
+
+
+NAMES = [f"Регіон {idx}" for idx in range(8)]
+
+
+@pytest.fixture(scope='module')
+def factor_scores():
+    # Рівні факторів 0..1 (без однакових загальних балів)
+    levels = np.random.default_rng(11).uniform(0.0, 1.0, (len(NAMES), len(FACTOR_MAXIMA)))
+    return levels * FACTOR_MAXIMA
+
+
+def base_scores(factor_scores):
+    return score_regions(factor_levels(factor_scores), FACTOR_MAXIMA[np.newaxis, :])[0]
+
+
+def sensitivity(factor_scores, **kwargs):
+    return run_sensitivity(
+        NAMES, factor_scores, base_scores(factor_scores), AHPCalculator().pairwise_matrix, samples=500, seed=7, **kwargs
+    )
+
+
+@pytest.mark.parametrize('kwargs', [{"mode": 'judgments', "spread": 1.0}, {"mode": 'weights', "concentration": 1e12}])
+def test_without_perturbation_ranking_is_the_base_one(factor_scores, kwargs):
+    result = sensitivity(factor_scores, **kwargs)
+    for stats in result["factor_maxima"].values():
+        assert stats["mean"] == stats["base"]
+        assert stats["interval"] == [stats["base"]] * 2
+
+    scores = dict(zip(NAMES, base_scores(factor_scores)))
+    regions = result["regions"]
+    assert [region["base_rank"] for region in regions] == list(range(1, len(NAMES) + 1))
+    for region in regions:
+        assert region["score_std"] == 0.0
+        assert region["mean_score"] == pytest.approx(scores[region["region"]], abs=0.005)
+        assert region["mean_rank"] == region["base_rank"]
+        assert region["rank_interval"] == [region["base_rank"]] * 2
+        assert region["p_top_k"] == (1.0 if region["base_rank"] <= 5 else 0.0)
+        assert region["p_first"] == (1.0 if region["base_rank"] == 1 else 0.0)
+
+
+@pytest.mark.parametrize('mode', ['judgments', 'weights'])
+@pytest.mark.parametrize('top_k', [1, 3, 8, 20])
+def test_p_top_k_sums_to_top_k(factor_scores, mode, top_k):
+    regions = sensitivity(factor_scores, mode=mode, spread=3.0, concentration=20.0, top_k=top_k)["regions"]
+    assert sum(region["p_top_k"] for region in regions) == pytest.approx(min(top_k, len(NAMES)))
+    assert sum(region["p_first"] for region in regions) == pytest.approx(1.0)
+    assert any(region["score_std"] > 0 for region in regions)
+
+
+def test_seed_makes_results_reproducible(factor_scores):
+    assert sensitivity(factor_scores, spread=2.0) == sensitivity(factor_scores, spread=2.0)
+    other = run_sensitivity(NAMES, factor_scores, base_scores(factor_scores), AHPCalculator().pairwise_matrix,
+                            samples=500, spread=2.0, seed=8)
+    assert other["regions"] != sensitivity(factor_scores, spread=2.0)["regions"]
+
+
+def test_unknown_mode_raises_value_error(factor_scores):
+    with pytest.raises(ValueError, match="Unknown sensitivity mode"):
+        sensitivity(factor_scores, mode='scores')
+
+
+def test_sensitivity_endpoint(client):
+    params = {"samples": 300, "spread": 2.0, "top_k": 4, "seed": 5}
+    response = client.get('/api/sensitivity', params=params)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["mode"], body["top_k"], body["seed"]) == ("judgments", 4, 5)
+    assert len(body["regions"]) == 24
+    assert sum(region["p_top_k"] for region in body["regions"]) == pytest.approx(4)
+    assert client.get('/api/sensitivity', params=params).json()["regions"] == body["regions"]
+
+    assert client.get('/api/sensitivity', params={"spread": 1.0}).status_code == 422
+    assert client.get('/api/sensitivity', params={"mode": "scores"}).status_code == 400
@@ -0,0 +1,225 @@
+"""
+Round-trip tests for the Mapbox Vector Tile encoder (backend/vector_tiles.py):
+tiles are decoded with a minimal protobuf reader below
+"""
+import struct
+
+import numpy as np
+
+from geodesic import GeoPoints
+from snapshot_store import ColumnarLayer
+from spatial_index import GridIndex
+from vector_tiles import (
+    BUFFER, EXTENT, GEOM_POINT, GEOM_POLYGON, PolygonTileSource, clip_ring, encode_tile, point_layer,
+    simplify_ring, world_to_lnglat,
+)
+
+
+# Тайл над Києвом
+Z, X, Y = 8, 149, 86
+
+
+# ===== Мінімальний декодер protobuf / MVT =====
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def read_fields(data):
+    """(номер поля, значення) повідомлення: int для varint, bytes для інших типів"""
+    pos = 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == 2:
+            length, pos = read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        else:
+            raise AssertionError(f"Unexpected wire type {wire_type}")
+        yield field, value
+
+
+def read_packed(data):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_value(data):
+    (field, value), = read_fields(data)
+    return {
+        1: lambda: value.decode('utf-8'), 3: lambda: struct.unpack('<d', value)[0],
+        5: lambda: value, 6: lambda: unzigzag(value), 7: lambda: bool(value),
+    }[field]()
+
+
+def decode_geometry(commands):
+    """Частини геометрії (точки / кільця) в абсолютних координатах тайла"""
+    parts, x, y, idx = [], 0, 0, 0
+    while idx < len(commands):
+        command_id, count = commands[idx] & 0x7, commands[idx] >> 3
+        idx += 1
+        if command_id == 7:
+            continue
+        for _ in range(count):
+            x += unzigzag(commands[idx])
+            y += unzigzag(commands[idx + 1])
+            idx += 2
+            if command_id == 1:
+                parts.append([])
+            parts[-1].append((x, y))
+    return parts
+
+
+def decode_tile(tile):
+    """{назва шару: {"extent": ..., "version": ..., "features": [...]}}"""
+    layers = {}
+    for field, layer_data in read_fields(tile):
+        assert field == 3
+        layer = {"features": []}
+        keys, values, features = [], [], []
+        for layer_field, value in read_fields(layer_data):
+            if layer_field == 1:
+                layer["name"] = value.decode('utf-8')
+            elif layer_field == 2:
+                features.append(dict(read_fields(value)))
+            elif layer_field == 3:
+                keys.append(value.decode('utf-8'))
+            elif layer_field == 4:
+                values.append(decode_value(value))
+            elif layer_field == 5:
+                layer["extent"] = value
+            elif layer_field == 15:
+                layer["version"] = value
+        for feature in features:
+            tags = read_packed(feature.get(2, b""))
+            layer["features"].append({
+                "id": feature.get(1),
+                "type": feature[3],
+                "properties": {keys[tags[i]]: values[tags[i + 1]] for i in range(0, len(tags), 2)},
+                "geometry": decode_geometry(read_packed(feature[4])),
+            })
+        layers[layer["name"]] = layer
+    return layers
+
+
+def ring_area(points):
+    """Подвоєна площа кільця (додатна - зовнішнє кільце MVT)"""
+    return sum(points[i - 1][0] * points[i][1] - points[i][0] * points[i - 1][1] for i in range(len(points)))
+
+
+# ===== Дані =====
+def tile_lnglat(px, py):
+    """Градуси точки з координатами (px, py) тайла Z/X/Y"""
+    n = 2 ** Z
+    return list(world_to_lnglat((X + px / EXTENT) / n, (Y + py / EXTENT) / n))
+
+
+def polygon(name, *rings):
+    return {
+        "type": "Feature", "properties": {"name": name, "name_en": name.upper()},
+        "geometry": {"type": "Polygon", "coordinates": [[tile_lnglat(*p) for p in ring + [ring[0]]] for ring in rings]},
+    }
+
+
+def square(min_v, max_v):
+    return [(min_v, min_v), (max_v, min_v), (max_v, max_v), (min_v, max_v)]
+
+
+def polygon_tile(*features):
+    source = PolygonTileSource('regions', {"type": "FeatureCollection", "features": list(features)}, ('name', 'name_en'))
+    return decode_tile(encode_tile([source.layer(Z, X, Y)]))
+
+
+def test_polygon_with_hole_round_trip():
+    layers = polygon_tile(polygon("a", square(1000, 3000), square(1500, 2500)[::-1]))
+    layer = layers["regions"]
+    assert (layer["version"], layer["extent"]) == (2, EXTENT)
+    feature, = layer["features"]
+    assert feature["type"] == GEOM_POLYGON
+    assert feature["properties"] == {"name": "a", "name_en": "A"}
+    exterior, hole = feature["geometry"]
+    assert sorted(exterior) == sorted(square(1000, 3000))
+    assert sorted(hole) == sorted(square(1500, 2500))
+
+
+def test_ring_winding_does_not_depend_on_input_orientation():
+    for exterior, hole in ((square(1000, 3000), square(1500, 2500)), (square(1000, 3000)[::-1], square(1500, 2500)[::-1])):
+        feature, = polygon_tile(polygon("a", exterior, hole))["regions"]["features"]
+        outer, inner = feature["geometry"]
+        assert ring_area(outer) > 0
+        assert ring_area(inner) < 0
+
+
+def test_polygons_are_clipped_to_buffered_tile():
+    layers = polygon_tile(
+        polygon("cover", square(-3000, 7000)),
+        polygon("edge", [(3000, 1000), (6000, 2000), (3000, 3000)]),
+        polygon("outside", square(5000, 6000)),
+    )
+    features = {feature["properties"]["name"]: feature for feature in layers["regions"]["features"]}
+    assert set(features) == {"cover", "edge"}
+
+    cover, = features["cover"]["geometry"]
+    assert sorted(cover) == sorted(square(-BUFFER, EXTENT + BUFFER))
+    assert ring_area(cover) == 2 * (EXTENT + 2 * BUFFER) ** 2
+
+    edge, = features["edge"]["geometry"]
+    assert all(-BUFFER <= px <= EXTENT + BUFFER and -BUFFER <= py <= EXTENT + BUFFER for px, py in edge)
+    assert sorted(p for p in edge if p[0] == EXTENT + BUFFER) == [(EXTENT + BUFFER, 1387), (EXTENT + BUFFER, 2613)]
+
+
+def test_polygon_outside_tile_gives_empty_tile():
+    assert polygon_tile(polygon("outside", square(5000, 6000))) == {}
+
+
+def test_points_round_trip():
+    positions = [(100, 200), (4000, 3900), (2048, 2048), (9000, 2048)]
+    coordinates = [tile_lnglat(px, py) for px, py in positions]
+    source = ColumnarLayer.from_geojson({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": coords},
+             "properties": {"name": f"Точка {idx}", "area_ha": idx + 0.5, "count": -idx, "active": idx % 2 == 0}}
+            for idx, coords in enumerate(coordinates)
+        ],
+    })
+    index = GridIndex(GeoPoints([lat for _, lat in coordinates], [lng for lng, _ in coordinates]))
+    tile = encode_tile([point_layer('points', source, index, Z, X, Y, ('name', 'area_ha', 'count', 'active'))])
+
+    features = sorted(decode_tile(tile)["points"]["features"], key=lambda feature: feature["id"])
+    assert [feature["id"] for feature in features] == [0, 1, 2]
+    assert all(feature["type"] == GEOM_POINT for feature in features)
+    assert [feature["geometry"] for feature in features] == [[[position]] for position in positions[:3]]
+    assert features[1]["properties"] == {"name": "Точка 1", "area_ha": 1.5, "count": -1, "active": False}
+
+
+def test_simplify_ring_drops_collinear_points_and_keeps_closure():
+    ring = np.array([(0, 0), (1, 0), (2, 0), (2, 0.001), (2, 2), (1, 2.0005), (0, 2), (0, 0)], dtype=np.float64)
+    simplified = simplify_ring(ring, 0.01)
+    assert simplified.tolist() == [[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]
+    assert simplify_ring(ring, 0).tolist() == ring.tolist()
+
+
+def test_clip_ring_keeps_inside_points_and_adds_edge_intersections():
+    triangle = [(2.0, 2.0), (14.0, 6.0), (2.0, 10.0)]
+    assert clip_ring(triangle, 0.0, 20.0) == triangle
+    # Кут (8, 8) потрапляє двічі - повтори прибирає _encode_ring
+    assert clip_ring(triangle, 0.0, 8.0) == [(2.0, 8.0), (2.0, 2.0), (8.0, 4.0), (8.0, 8.0), (8.0, 8.0)]
+    assert clip_ring(triangle, 20.0, 30.0) == []